@@ -4,34 +4,129 @@ api_client.py - Reusable API client class
 """
 
 import requests
+import gzip
 import json
-from typing import Dict, Optional
+import logging
+import os
+import queue
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
 import time
+import zlib
+
+from http_transport import HTTPTransport, get_transport, last_pool_wait, reset_pool_wait
+from instrumentation import Instrumentation, normalize_endpoint
+import json_stream
+from singleflight import SingleFlight, request_key
+
+logger = logging.getLogger(__name__)
+
+def _batch_failures(reply, size: int) -> Dict[int, object]:
+    """
+    Map batch position -> error from a {"errors": [{"index", "error"}]} reply
+
+    Out-of-range indices are ignored and a repeated index counts once.
+
+    Raises:
+        ValueError: The errors entry is not a list of objects with an
+            integer index
+    """
+    errors = reply.get('errors') if isinstance(reply, dict) else None
+    if errors is None:
+        return {}
+    if not isinstance(errors, list):
+        raise ValueError(f"Malformed error reply: 'errors' is {type(errors).__name__}, not a list")
+    failed = {}
+    for err in errors:
+        index = err.get('index') if isinstance(err, dict) else None
+        if not isinstance(index, int) or isinstance(index, bool):
+            raise ValueError(f"Malformed error reply entry: {err!r}")
+        if 0 <= index < size and index not in failed:
+            failed[index] = err.get('error')
+    return failed
 
 class APIClient:
     """Generic API client with error handling and retries"""
 
-    def __init__(self, base_url: str, api_key: Optional[str] = None):
+    def __init__(self, base_url: str, api_key: Optional[str] = None,
+                 transport: Optional[HTTPTransport] = None,
+                 instrumentation: Optional[Instrumentation] = None,
+                 compress_threshold: Optional[int] = None,
+                 compression: str = 'gzip'):
         """
         Initialize API client
         
         Args:
             base_url: Base URL for API (e.g., 'https://api.example.com')
             api_key: Optional API key for authentication
+            transport: Pooled transport to use (defaults to the shared one)
+            instrumentation: Receives structured request/retry/timeout/error
+                events (no sinks attached by default)
+            compress_threshold: Compress request bodies of at least this many
+                bytes (None disables request compression)
+            compression: 'gzip' or 'deflate'
         """
+        if compression not in ('gzip', 'deflate'):
+            raise ValueError(f"Unsupported compression '{compression}'")
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
-        self.session = requests.Session()
+        self.transport = transport or get_transport()
+        self.session = self.transport.session
+        self.instrumentation = instrumentation or Instrumentation()
+        self.compress_threshold = compress_threshold
+        self.compression = compression
 
-        # Set default headers
-        self.session.headers.update({
+        # Default headers, sent with every request (the session is shared)
+        self.headers = {
             'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
             'User-Agent': 'Python-APIClient/1.0'
-        })
+        }
 
         # Add API key to headers if provided
         if self.api_key:
-            self.session.headers['Authorization'] = f'Bearer {api_key}'
+            self.headers['Authorization'] = f'Bearer {api_key}'
+
+        # Concurrent identical GETs share one request
+        self.inflight = SingleFlight()
+
+    def _send(self, method: str, endpoint: str, attempt: int,
+              extra_headers: Optional[Dict] = None, **kwargs):
+        """
+        Send one request attempt and emit a 'request' event for it
+
+        Retries made inside the transport (urllib3 retrying 429/5xx or
+        failed connects) are taken from the response's Retry history and
+        emitted as 'retry' events with layer='transport'. A streamed
+        response is not read here, so its response_bytes is only known
+        from Content-Length.
+        """
+        url = f"{self.base_url}{endpoint}"
+        headers = {**self.headers, **extra_headers} if extra_headers else self.headers
+        reset_pool_wait()
+        start = time.perf_counter()
+        response = self.session.request(method, url, headers=headers,
+                                        timeout=self.transport.timeout, **kwargs)
+        if self.instrumentation.sinks:
+            body = response.request.body
+            length = response.headers.get('Content-Length')
+            if length is None and not kwargs.get('stream'):
+                length = len(response.content)
+            self.instrumentation.emit(
+                'request', method=method, endpoint=normalize_endpoint(endpoint),
+                status=response.status_code, latency=time.perf_counter() - start,
+                pool_wait=last_pool_wait(), attempt=attempt,
+                request_bytes=len(body) if body else 0,
+                response_bytes=int(length) if length is not None else None,
+            )
+            retries = getattr(response.raw, 'retries', None)
+            for entry in retries.history if retries is not None else ():
+                self._event('retry', method, endpoint, attempt=attempt, layer='transport',
+                            status=entry.status, error=str(entry.error) if entry.error else None)
+        return response
+
+    def _event(self, event: str, method: str, endpoint: str, **fields):
+        self.instrumentation.emit(event, method=method, endpoint=normalize_endpoint(endpoint), **fields)
 
     def get(self, endpoint: str, params: Optional[Dict] = None, retries: int = 3):
         """
@@ -41,55 +136,240 @@ class APIClient:
             endpoint: API endpoint (e.g., '/users/123')
             params: Query parameters
             retries: Number of retry attempts
+
+        Concurrent calls with the same URL, params and credentials are
+        coalesced into one request and share its (read-only) result.
         """
         url = f"{self.base_url}{endpoint}"
+        key = request_key('GET', url, params, self.headers)
+        return self.inflight.do(key, self._get, endpoint, params, retries)
 
+    def _get(self, endpoint: str, params: Optional[Dict], retries: int):
+        """Perform GET with retries (uncoalesced)"""
         for attempt in range(retries):
             try:
-                response = self.session.get(url, params=params, timeout=10)
+                response = self._send('GET', endpoint, attempt, params=params)
                 response.raise_for_status()  # Raise error for bad responses
                 return response.json()
             
             except requests.exceptions.Timeout:
+                self._event('timeout', 'GET', endpoint, attempt=attempt)
                 if attempt < retries - 1:
                     wait_time = 2 ** attempt # Exponential backoff
-                    print(f"⏳ Timeout, retrying in {wait_time} seconds...")
+                    self._event('retry', 'GET', endpoint, attempt=attempt, wait=wait_time)
+                    logger.warning("Timeout on GET %s, retrying in %s seconds", endpoint, wait_time)
                     time.sleep(wait_time)
                 else:
-                    print("❌ Error: Request timed out after retries")
+                    logger.error("GET %s timed out after %d attempts", endpoint, retries)
                     return None
             
             except requests.exceptions.HTTPError as e:
-                print(f"❌ HTTP Error: {e}")
+                self._event('error', 'GET', endpoint, error=str(e))
+                logger.error("HTTP error on GET %s: %s", endpoint, e)
                 return None
             
             except Exception as e:
-                print(f"❌ Unexpected error: {e}")
+                self._event('error', 'GET', endpoint, error=str(e))
+                logger.error("Unexpected error on GET %s: %s", endpoint, e)
                 return None
             
-    def post(self, endpoint: str, data: Dict, retries: int = 3):
-        """Make POST request"""
-        url = f"{self.base_url}{endpoint}"
+    def stream_items(self, endpoint: str, path: str = '', params: Optional[Dict] = None,
+                     chunk_size: int = 64 * 1024, fast: bool = True) -> Iterator:
+        """
+        Stream the elements of a JSON array response one at a time
+
+        Args:
+            endpoint: API endpoint returning JSON
+            path: Dotted key path to the array (e.g., 'data.items');
+                empty when the response body is the array itself
+            params: Query parameters
+            chunk_size: Bytes read from the socket per chunk
+            fast: Use the ijson backend when it is installed
+
+        Unlike get(), errors are raised rather than printed, since records
+        may already have been yielded when the failure happens. The request
+        is made once (no client-level retries) and emits the same
+        instrumentation events as get().
+        """
+        with self._send('GET', endpoint, 0, params=params, stream=True) as response:
+            response.raise_for_status()
+
+            if fast and json_stream.ijson is not None:
+                response.raw.decode_content = True  # Undo gzip/deflate transparently
+                yield from json_stream.iter_array_items_binary(response.raw, path)
+                return
+
+            if response.encoding is None:
+                response.encoding = 'utf-8'
+            chunks = response.iter_content(chunk_size=chunk_size, decode_unicode=True)
+            yield from json_stream.iter_array_items(chunks, path)
+
+    def _encode_body(self, data):
+        """Serialize data to compact JSON, compressing it above the threshold"""
+        body = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        if self.compress_threshold is None or len(body) < self.compress_threshold:
+            return body, {}
+        if self.compression == 'gzip':
+            body = gzip.compress(body, compresslevel=6)
+        else:
+            body = zlib.compress(body, 6)  # HTTP 'deflate' is the zlib format
+        return body, {'Content-Encoding': self.compression}
 
+    def _post_body(self, endpoint: str, body: bytes, headers: Dict, retries: int):
+        """POST an encoded body with retries; raises the last error on failure"""
         for attempt in range(retries):
             try:
-                response = self.session.post(url, json=data, timeout=10)
+                response = self._send('POST', endpoint, attempt, extra_headers=headers, data=body)
                 response.raise_for_status()
-                return response.json()
+                return response.json() if response.content else None
             
             except Exception as e:
+                kind = 'timeout' if isinstance(e, requests.exceptions.Timeout) else 'error'
+                self._event(kind, 'POST', endpoint, attempt=attempt, error=str(e))
                 if attempt < retries - 1:
                     wait_time = 2 ** attempt
-                    print(f"⏳ Error occurred, retrying in {wait_time} seconds...")
+                    self._event('retry', 'POST', endpoint, attempt=attempt, wait=wait_time)
+                    logger.warning("Error on POST %s (%s), retrying in %s seconds", endpoint, e, wait_time)
                     time.sleep(wait_time)
                 else:
-                    print(f"❌ Unexpected error: {e}")
-                    return None
+                    raise
+
+    def post(self, endpoint: str, data: Dict, retries: int = 3):
+        """Make POST request"""
+        body, headers = self._encode_body(data)
+        try:
+            return self._post_body(endpoint, body, headers, retries)
+        except Exception as e:
+            logger.error("POST %s failed after %d attempts: %s", endpoint, retries, e)
+            return None
+
+    def post_batched(self, endpoint: str, records: Iterable[Dict], max_batch: int = 500,
+                     max_delay: float = 1.0, retries: int = 3) -> Dict:
+        """
+        POST records as JSON array payloads, flushing by size or age
+
+        Args:
+            endpoint: API endpoint accepting a JSON array of records
+            records: Records to send (any iterable, including slow generators)
+            max_batch: Maximum records per request
+            max_delay: Flush a partial batch once its oldest record has
+                waited this many seconds, even while the next record is
+                still being produced
+            retries: Retry attempts per batch
+
+        Returns:
+            Dictionary with 'sent', 'failed' (list of {'index', 'error'}
+            using each record's position in the input), 'requests' and
+            'bytes' (request bytes on the wire)
+
+        If a batch fails, every record in it is reported as failed. If the
+        server answers with {"errors": [{"index": i, "error": ...}]}, the
+        indices are taken relative to the batch and only those records fail;
+        an index reported more than once counts once.
+
+        A reply whose errors cannot be read (not a list of {"index": int}
+        entries) fails the whole batch, since which records were accepted
+        is unknown.
+
+        Records are pulled from a reader thread so the age limit is enforced
+        by a timer rather than on arrival. An exception raised by records is
+        re-raised here after the records read so far have been sent. If
+        sending raises, the reader is stopped before the error propagates.
+        """
+        result = {'sent': 0, 'failed': [], 'requests': 0, 'bytes': 0}
+        batch: List[Dict] = []
+        first_index = 0
+        batch_started = 0.0
+
+        def flush():
+            body, headers = self._encode_body(batch)
+            result['requests'] += 1
+            result['bytes'] += len(body)
+            try:
+                reply = self._post_body(endpoint, body, headers, retries)
+                failed = _batch_failures(reply, len(batch))
+            except Exception as e:
+                logger.error("Batch of %d records to %s failed: %s", len(batch), endpoint, e)
+                result['failed'].extend({'index': first_index + i, 'error': str(e)}
+                                        for i in range(len(batch)))
+                return
+
+            result['failed'].extend({'index': first_index + i, 'error': error}
+                                    for i, error in failed.items())
+            result['sent'] += len(batch) - len(failed)
+
+        pending = queue.Queue(maxsize=max_batch)
+        done = object()
+        stop = threading.Event()
+        reader_error = []
+
+        def put(item):
+            """Queue item unless post_batched has stopped consuming"""
+            while not stop.is_set():
+                try:
+                    pending.put(item, timeout=0.05)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def read_records():
+            try:
+                for record in records:
+                    if not put(record):
+                        return
+            except Exception as e:
+                reader_error.append(e)
+            finally:
+                put(done)
+
+        threading.Thread(target=read_records, name='post_batched-reader', daemon=True).start()
+
+        index = 0
+        try:
+            while True:
+                timeout = max(0.0, batch_started + max_delay - time.monotonic()) if batch else None
+                try:
+                    record = pending.get(timeout=timeout)
+                except queue.Empty:
+                    flush()  # The oldest record reached max_delay while waiting
+                    batch = []
+                    continue
+                if record is done:
+                    break
+                if not batch:
+                    first_index = index
+                    batch_started = time.monotonic()
+                batch.append(record)
+                index += 1
+                if len(batch) >= max_batch or time.monotonic() - batch_started >= max_delay:
+                    flush()
+                    batch = []
+
+            if batch:
+                flush()
+        finally:
+            # Stop the reader even when a flush raised, so it never blocks on a full queue
+            stop.set()
+            while True:
+                try:
+                    pending.get_nowait()
+                except queue.Empty:
+                    break
+        if reader_error:
+            raise reader_error[0]
+        return result
 
 # Example usage with public API
 if __name__ == "__main__":
-    # JSONPlaceholder - free fake API for testing
-    client = APIClient("https://jsonplaceholder.typicode.com")
+    from instrumentation import MemorySink
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    # JSONPlaceholder - free fake API for testing (API_BASE_URL overrides it)
+    metrics = MemorySink()
+    client = APIClient(os.getenv('API_BASE_URL', "https://jsonplaceholder.typicode.com"),
+                       instrumentation=Instrumentation([metrics]))
 
     # GET request example
     print("Fetching user data...")
@@ -106,6 +386,11 @@ if __name__ == "__main__":
         print(f"Found {len(posts)} posts")
         print(f"First post: {posts[0]['title']}")
 
+    # Streaming example: records are decoded one at a time
+    print("\nStreaming comments...")
+    comment_count = sum(1 for _ in client.stream_items("/comments"))
+    print(f"Streamed {comment_count} comments")
+
     # POST request example
     print("\nCreating a new post...")
     new_post = {
@@ -115,4 +400,7 @@ if __name__ == "__main__":
     }
     result = client.post("/posts", new_post)
     if result:
-        print(f"Created post ID: {result['id']}")
\ No newline at end of file
+        print(f"Created post ID: {result['id']}")
+
+    # Per-endpoint latency and retry summary
+    metrics.print_summary()
\ No newline at end of file
@@ -25,19 +25,43 @@ def write_file_safe(filename, content):
 # Custom context manager
 class Timer:
     """Context manager to time code execution"""
+
+    def __init__(self, name=None, verbose=True):
+        """
+        Args:
+            name: Optional label shown in messages
+            verbose: Print when the timer starts and stops
+        """
+        self.name = name
+        self.verbose = verbose
+        self.duration_ns = 0
+        self.duration = 0.0
     
     def __enter__(self):
         """Called when entering 'with' block"""
-        self.start = time.time()
-        print("⏱️  Timer started")
+        if self.verbose:
+            print(f"⏱️  Timer started{f' ({self.name})' if self.name else ''}")
+        self.start_ns = time.perf_counter_ns()  # Monotonic, nanosecond resolution
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Called when exiting 'with' block"""
-        self.end = time.time()
-        self.duration = self.end - self.start
-        print(f"⏱️  Timer stopped: {self.duration:.4f} seconds")
+        self.end_ns = time.perf_counter_ns()
+        self.duration_ns = self.end_ns - self.start_ns
+        self.duration = self.duration_ns / 1e9
+        if self.verbose:
+            print(f"⏱️  Timer stopped{f' ({self.name})' if self.name else ''}: {self.duration:.4f} seconds")
         return False  # Don't suppress exceptions
+    
+    @property
+    def start(self):
+        """Start time in seconds (perf_counter clock; alias of start_ns)"""
+        return self.start_ns / 1e9
+    
+    @property
+    def end(self):
+        """End time in seconds (perf_counter clock; alias of end_ns)"""
+        return self.end_ns / 1e9
 
 # Use timer context manager
 if __name__ == "__main__":
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+csv_engine.py - Shared expense CSV reader with selectable parse engines
+"""
+
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from profiling import span
+
+try:
+    import pyarrow  # noqa: F401  Optional: multi-threaded Arrow CSV parser
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Auto-selection thresholds (bytes). Below SMALL_FILE the csv module wins
+# because there is no parser setup; above LARGE_FILE Arrow's threads pay off.
+SMALL_FILE = 4 * 1024
+LARGE_FILE = 8 * 1024 * 1024
+
+# Field text read as missing by every engine (pandas' default na_values)
+NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None',
+    'n/a', 'nan', 'null',
+])
+
+# Columns parsed to a type; every other column stays as field text
+AMOUNT = 'Amount'
+DATE = 'Date'
+
+
+def _typed(df):
+    """Finish columns the parser could not type: bad amounts become NaN, bad dates NaT"""
+    if AMOUNT in df.columns and df[AMOUNT].dtype != 'float64':
+        df[AMOUNT] = pd.to_numeric(df[AMOUNT], errors='coerce').astype('float64')
+    if DATE in df.columns and not pd.api.types.is_datetime64_any_dtype(df[DATE]):
+        df[DATE] = pd.to_datetime(df[DATE], errors='coerce')
+    return df
+
+
+def _read_options(filename):
+    """read_csv keyword arguments typing Amount and Date and keeping the rest as text"""
+    header = pd.read_csv(filename, nrows=0).columns
+    return {
+        'dtype': {name: str for name in header if name not in (AMOUNT, DATE)},
+        'parse_dates': [DATE] if DATE in header else False,
+        'na_values': list(NA_VALUES),
+        'keep_default_na': False,
+    }
+
+
+def _read_python(filename):
+    """Pure-Python csv module parser"""
+    with open(filename, 'r', newline='') as f:
+        reader = csv.reader(f)
+        try:
+            header = next(reader)
+        except StopIteration:
+            raise pd.errors.EmptyDataError("No columns to parse from file")
+        except csv.Error as e:
+            raise pd.errors.ParserError(str(e))
+        columns = [[] for _ in header]
+        try:
+            for line, row in enumerate(reader, start=2):
+                if not row:
+                    continue
+                if len(row) > len(header):
+                    raise pd.errors.ParserError(
+                        f"Expected {len(header)} fields in line {line}, saw {len(row)}")
+                row += [''] * (len(header) - len(row))
+                for column, value in zip(columns, row):
+                    column.append(value)
+        except csv.Error as e:
+            raise pd.errors.ParserError(str(e))
+
+    # Empty fields and the NA markers ('NA', 'N/A', 'null', ...) become missing values
+    na_values = list(NA_VALUES)
+    frame = {}
+    for name, values in zip(header, columns):
+        values = np.array(values, dtype=object)
+        frame[name] = np.where(pd.Series(values).isin(na_values).to_numpy(), np.nan, values)
+    return _typed(pd.DataFrame(frame))
+
+
+def _read_c(filename):
+    """pandas' single-threaded C parser"""
+    return _typed(pd.read_csv(filename, **_read_options(filename)))
+
+
+def _read_pyarrow(filename):
+    """Arrow's multi-threaded parser (requires pyarrow)"""
+    return _typed(pd.read_csv(filename, engine='pyarrow', **_read_options(filename)))
+
+
+ENGINES = {
+    'python': _read_python,
+    'c': _read_c,
+}
+if HAS_PYARROW:
+    ENGINES['pyarrow'] = _read_pyarrow
+
+
+def choose_engine(filename):
+    """Pick the fastest available engine for a file of this size"""
+    size = os.path.getsize(filename)
+    if size < SMALL_FILE:
+        return 'python'
+    if size >= LARGE_FILE and 'pyarrow' in ENGINES:
+        return 'pyarrow'
+    return 'c'
+
+
+def read_csv(filename, engine='auto'):
+    """
+    Read an expense CSV with typed Amount and Date columns
+
+    All engines return the same data: Amount as float64 and Date as
+    datetime64, parsed by the engine itself, with values that do not
+    parse as NaN / NaT. Every other column is object field text. Empty
+    fields and the NA_VALUES markers are missing in every column, so
+    callers count bad amounts or dates with isna().
+
+    Args:
+        filename: CSV file path
+        engine: 'auto', 'python', 'c' or 'pyarrow'
+
+    Raises:
+        ValueError: Unknown or unavailable engine
+        pandas.errors.EmptyDataError / ParserError: As pd.read_csv would
+    """
+    if engine == 'auto':
+        engine = choose_engine(filename)
+    if engine not in ENGINES:
+        raise ValueError(f"CSV engine '{engine}' is not available (have: {', '.join(ENGINES)})")
+
+    with span(f'parse:{engine}'):
+        return ENGINES[engine](filename)
+
+
+def benchmark(filename, engines=None, repeat=3):
+    """
+    Time each engine on a file (best of repeat)
+
+    Returns:
+        {engine: {'seconds', 'rows', 'rows_per_s', 'mb_per_s'}}
+    """
+    size_mb = os.path.getsize(filename) / 1e6
+    results = {}
+    for engine in engines or ENGINES:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            df = read_csv(filename, engine=engine)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[engine] = {
+            'seconds': best,
+            'rows': len(df),
+            'rows_per_s': len(df) / best,
+            'mb_per_s': size_mb / best,
+        }
+    return results
+
+
+def print_benchmark(filename, results):
+    """Print per-engine parse throughput"""
+    print("\n" + "=" * 60)
+    print(f"CSV PARSE THROUGHPUT: {filename} (auto: {choose_engine(filename)})")
+    print("=" * 60)
+    print(f"{'ENGINE':10} {'SECONDS':>10} {'ROWS/S':>14} {'MB/S':>10}")
+    for engine, r in sorted(results.items(), key=lambda item: item[1]['seconds']):
+        print(f"{engine:10} {r['seconds']:10.4f} {r['rows_per_s']:14,.0f} {r['mb_per_s']:10.1f}")
+    print("=" * 60)
+
+
+# Benchmark every available engine on a file
+if __name__ == "__main__":
+    filename = sys.argv[1] if len(sys.argv) > 1 else 'data/expenses.csv'
+    print_benchmark(filename, benchmark(filename))
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+currency.py - As-of exchange rate conversion for multi-currency expense files
+"""
+
+import logging
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Rate files quote every currency against this one: 1 EUR = Rate units
+REFERENCE_CURRENCY = 'EUR'
+
+CURRENCY_SYMBOLS = {
+    'EUR': '€', 'USD': '$', 'GBP': '£', 'JPY': '¥', 'CHF': 'CHF ', 'SEK': 'kr ',
+    'NOK': 'kr ', 'DKK': 'kr ', 'PLN': 'zł ', 'CZK': 'Kč ', 'HUF': 'Ft ', 'CAD': 'C$',
+    'AUD': 'A$', 'CNY': '¥', 'INR': '₹',
+}
+
+
+def currency_symbol(code):
+    """Symbol used in reports ('USD' -> '$'); unknown codes print as 'XYZ '"""
+    return CURRENCY_SYMBOLS.get(code, f"{code} ")
+
+
+def _cache_path(filename):
+    path = Path(filename)
+    return path.with_name(f".{path.name}.npz")
+
+
+def _read_rates_csv(filename):
+    rates = pd.read_csv(filename, usecols=['Date', 'Currency', 'Rate'])
+    rates['Date'] = pd.to_datetime(rates['Date'], errors='coerce')
+    rates['Currency'] = rates['Currency'].astype(str).str.strip().str.upper()
+    rates['Rate'] = pd.to_numeric(rates['Rate'], errors='coerce')
+    return rates.dropna().query('Rate > 0')
+
+
+def load_rates(filename):
+    """
+    Load a rate table (Date, Currency, Rate; 1 EUR = Rate units of Currency)
+
+    The parsed table is cached next to the CSV as a compact columnar .npz
+    (day number, currency code, rate) and reused until the CSV changes.
+    A cache that cannot be written (read-only directory, full disk) is
+    logged and skipped.
+
+    Returns:
+        DataFrame with Date, Currency (categorical) and Rate, sorted by Date
+    """
+    stat = os.stat(filename)
+    cache = _cache_path(filename)
+    if cache.exists():
+        with np.load(cache, allow_pickle=False) as data:
+            if int(data['mtime_ns']) == stat.st_mtime_ns and int(data['size']) == stat.st_size:
+                return pd.DataFrame({
+                    'Date': data['day'].astype('datetime64[D]').astype('datetime64[ns]'),
+                    'Currency': pd.Categorical.from_codes(data['code'], data['currencies']),
+                    'Rate': data['rate'],
+                })
+
+    rates = _read_rates_csv(filename).sort_values('Date', kind='stable')
+    currency = pd.Categorical(rates['Currency'])
+    day = rates['Date'].to_numpy().astype('datetime64[D]')
+    tmp = cache.with_name(cache.name + '.tmp')
+    try:
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(
+                f, day=day.astype(np.int32), code=currency.codes.astype(np.int16),
+                currencies=np.asarray(currency.categories, dtype=str), rate=rates['Rate'].to_numpy(),
+                mtime_ns=np.int64(stat.st_mtime_ns), size=np.int64(stat.st_size))
+        os.replace(tmp, cache)
+    except OSError as e:
+        logger.warning("Could not write rate cache %s: %s", cache, e)
+        tmp.unlink(missing_ok=True)
+    return pd.DataFrame({'Date': day.astype('datetime64[ns]'), 'Currency': currency,
+                         'Rate': rates['Rate'].to_numpy()})
+
+
+def _normalize_codes(series):
+    """Upper-cased, stripped currency codes, computed once per distinct value"""
+    codes, uniques = pd.factorize(series.fillna('').astype(str))
+    cleaned = np.asarray(pd.Series(uniques, dtype=object).str.strip().str.upper(), dtype=object)
+    return np.append(cleaned, '')[codes]  # Code -1 (missing) -> ''
+
+
+def _rates_asof(dates, currencies, rates):
+    """
+    Latest rate on or before each date for each currency (NaN if none)
+
+    Currencies are joined as integer codes, which keeps merge_asof's 'by'
+    matching cheap.
+    """
+    categories = rates['Currency'].cat.categories
+    left = pd.DataFrame({
+        'Date': dates,
+        'code': pd.Categorical(currencies, categories=categories).codes,
+        'pos': np.arange(len(dates)),
+    }).sort_values('Date', kind='stable')
+    right = pd.DataFrame({'Date': rates['Date'], 'code': rates['Currency'].cat.codes,
+                          'Rate': rates['Rate']})
+    merged = pd.merge_asof(left, right, on='Date', by='code', direction='backward')
+    found = np.empty(len(dates))
+    found[merged['pos'].to_numpy()] = merged['Rate'].to_numpy()
+    return found  # Unknown currencies have code -1, which matches no rate
+
+
+def _base_rate_asof(dates, base, rates):
+    """As-of rate of a single currency: a binary search over its own dates"""
+    own = rates[rates['Currency'] == base]
+    idx = np.searchsorted(own['Date'].to_numpy(), dates, side='right') - 1
+    found = own['Rate'].to_numpy()[np.maximum(idx, 0)] if len(own) else np.full(len(dates), np.nan)
+    return np.where(idx >= 0, found, np.nan)
+
+
+def convert(df, rates=None, base=REFERENCE_CURRENCY, default_currency=REFERENCE_CURRENCY):
+    """
+    Convert Amount to the base currency using as-of rates
+
+    Rows without a Currency (or a blank one) are taken to be in
+    default_currency. The original values are kept in OriginalAmount and
+    OriginalCurrency. Rows whose currency has no rate on or before their
+    date get a NaN Amount, for the caller to report and drop.
+
+    Args:
+        df: Expense DataFrame with Date (datetime64) and Amount
+        rates: Rate table from load_rates (None if everything is in base)
+        base: Currency to report in
+        default_currency: Currency of rows that don't name one
+    """
+    if 'Currency' in df.columns:
+        currency = _normalize_codes(df['Currency'])
+        currency[currency == ''] = default_currency
+    else:
+        currency = np.full(len(df), default_currency, dtype=object)
+
+    df = df.copy()
+    df['OriginalAmount'] = df['Amount']
+    df['OriginalCurrency'] = currency
+    foreign = currency != base
+    if not foreign.any():
+        df['Currency'] = base
+        return df
+
+    factor = np.ones(len(df))
+    if rates is None:
+        factor[foreign] = np.nan
+    else:
+        dates = df['Date'].to_numpy()[foreign]
+        codes = currency[foreign]
+        # Rates are quoted per EUR: amount / rate[from] * rate[to]
+        from_rate = np.where(codes == REFERENCE_CURRENCY, 1.0, _rates_asof(dates, codes, rates))
+        to_rate = 1.0 if base == REFERENCE_CURRENCY else _base_rate_asof(dates, base, rates)
+        factor[foreign] = to_rate / from_rate
+
+    df['Amount'] = df['Amount'].to_numpy() * factor
+    df['Currency'] = base
+    return df
+
+
+# Demo: convert a large multi-currency file and time the as-of join
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    rng = np.random.default_rng(0)
+    codes = ['USD', 'GBP', 'CHF', 'SEK', 'PLN', 'CZK', 'JPY', 'CAD', 'AUD', 'NOK']
+    days = pd.date_range('2016-01-01', '2025-12-31', freq='B')
+    rate_table = pd.DataFrame({
+        'Date': np.repeat(days, len(codes)).strftime('%Y-%m-%d'),
+        'Currency': np.tile(codes, len(days)),
+        'Rate': np.round(np.tile(rng.uniform(0.5, 150, len(codes)), len(days))
+                         * rng.normal(1, 0.01, len(days) * len(codes)), 6),
+    })
+    rates_csv = Path(tempfile.mkdtemp(prefix='rates_')) / 'rates.csv'
+    rate_table.to_csv(rates_csv, index=False)
+
+    for label in ('CSV parse', 'cached'):
+        start = time.perf_counter()
+        rates = load_rates(rates_csv)
+        print(f"Load {len(rates):,} rates ({label}): {(time.perf_counter() - start) * 1000:.0f} ms")
+    print(f"CSV {rates_csv.stat().st_size / 1e6:.1f} MB, cache {_cache_path(rates_csv).stat().st_size / 1e6:.2f} MB")
+
+    df = pd.DataFrame({
+        'Date': pd.Timestamp('2016-01-01') + pd.to_timedelta(rng.integers(0, 3650, n_rows), unit='D'),
+        'Currency': rng.choice(codes + ['EUR'] * 5, n_rows),
+        'Amount': np.round(rng.gamma(3, 20, n_rows), 2),
+    })
+    for base in ('EUR', 'USD'):
+        start = time.perf_counter()
+        converted = convert(df, rates, base=base)
+        elapsed = time.perf_counter() - start
+        print(f"Convert {n_rows:,} rows to {base}: {elapsed:.2f}s, "
+              f"total {currency_symbol(base)}{converted['Amount'].sum():,.2f}")
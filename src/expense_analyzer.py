@@ -5,6 +5,10 @@ expense_analyzer.py - Analyze expense data
 
 import csv
 from collections import defaultdict
+
+from profiling import profiled, profiler
+
+@profiled('read')
 def read_expenses_basic(filename):
     """Read CSV file using basic Python (no pandas)"""
     expenses = []
@@ -21,6 +25,7 @@ def read_expenses_basic(filename):
 
     return expenses
 
+@profiled('aggregate')
 def analyze_expenses(expenses):
     """Calculate statistics from expenses"""
     # Total spent
@@ -41,6 +46,7 @@ def analyze_expenses(expenses):
         'count': len(expenses)
     }
 
+@profiled('report')
 def print_summary(stats):
     """Print formatted expense summary"""
     print("\n" + "=" * 50)
@@ -61,4 +67,8 @@ def print_summary(stats):
 if __name__ == "__main__":
     expenses = read_expenses_basic('data/expenses.csv')
     stats = analyze_expenses(expenses)
-    print_summary(stats)
\ No newline at end of file
+    print_summary(stats)
+
+    # Per-stage timings when run with PROFILE=1
+    if profiler.enabled:
+        profiler.print_report()
\ No newline at end of file
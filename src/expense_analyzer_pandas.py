@@ -5,16 +5,22 @@ expense_analyzer_pandas.py - Analyze expense data using pandas
 import pandas as pd
 from datetime import datetime
 
-def read_expenses_pandas(filename):
+from csv_engine import read_csv
+from profiling import profiled, profiler, span
+
+def read_expenses_pandas(filename, engine='auto'):
     """Read CSV file using pandas"""
-    # Read CSV
-    df = pd.read_csv(filename)
+    # Read CSV with the engine best suited to the file size
+    with span('read'):
+        df = read_csv(filename, engine=engine)
 
     # Convert 'Date' to datetime
-    df['Date'] = pd.to_datetime(df['Date'])
+    with span('validate'):
+        df['Date'] = pd.to_datetime(df['Date'])
 
     return df
 
+@profiled('report')
 def analyze_with_pandas(df):
     """Analyze expenses using pandas"""
     print("\n" + "=" * 50)
@@ -52,6 +58,7 @@ def analyze_with_pandas(df):
 
     print("=" * 50)
 
+@profiled('export')
 def export_summary(df, output_file='data/expense_summary.txt'):
     """Export summary to text file"""
     with open(output_file, 'w') as f:
@@ -74,4 +81,8 @@ def export_summary(df, output_file='data/expense_summary.txt'):
 if __name__ == "__main__":
     df = read_expenses_pandas('data/expenses.csv')
     analyze_with_pandas(df)
-    export_summary(df)
\ No newline at end of file
+    export_summary(df)
+
+    # Per-stage timings when run with PROFILE=1
+    if profiler.enabled:
+        profiler.print_report()
\ No newline at end of file
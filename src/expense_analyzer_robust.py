@@ -3,10 +3,19 @@
 expense_analyzer_robust.py - Expense analyzer with error handling
 """
 
+import argparse
 import pandas as pd
 import sys
 from pathlib import Path
 
+from csv_engine import read_csv
+from currency import REFERENCE_CURRENCY, convert, currency_symbol, load_rates
+from expense_anomaly import DEFAULT_WINDOW, MIN_PERIODS, print_anomalies, rolling_scores
+from expense_categorizer import DEFAULT_RULES, Categorizer, apply_categories
+from expense_dedup import HashIndex, drop_duplicates, find_duplicates, print_duplicate_report, row_hashes
+from memory_profile import memory
+from profiling import profiled, profiler, span
+
 def validate_file(filename):
     """
     Validate file exists and is readable
@@ -30,10 +39,15 @@ def validate_file(filename):
     
     return filepath
 
-def read_expenses_safe(filename):
+@profiled('read')
+def read_expenses_safe(filename, engine='auto'):
     """
     Safely read expense CSV with error handling
     
+    Args:
+        filename: CSV file path
+        engine: CSV parse engine ('auto', 'python', 'c' or 'pyarrow')
+    
     Returns:
         DataFrame if successful, None otherwise
     """
@@ -44,7 +58,9 @@ def read_expenses_safe(filename):
     
     try:
         # Attempt to read CSV
-        df = pd.read_csv(filepath)
+        with memory.stage('read_csv'):
+            df = read_csv(filepath, engine=engine)
+        memory.checkpoint('after_read_csv', df)
         
         # Validate required columns exist
         required_columns = ['Date', 'Category', 'Description', 'Amount']
@@ -55,24 +71,30 @@ def read_expenses_safe(filename):
             print(f"   Found columns: {', '.join(df.columns)}")
             return None
         
-        # Convert Amount to numeric, handle errors
-        df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce')
+        with span('validate'):
+            # Convert Amount to numeric, handle errors
+            with memory.stage('to_numeric'):
+                df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce')
         
-        # Check for invalid amounts
-        invalid_rows = df[df['Amount'].isna()]
-        if len(invalid_rows) > 0:
-            print(f"⚠️  Warning: Found {len(invalid_rows)} rows with invalid amounts")
-            print("   These rows will be excluded from analysis")
-            df = df.dropna(subset=['Amount'])
+            # Check for invalid amounts
+            invalid_rows = df[df['Amount'].isna()]
+            if len(invalid_rows) > 0:
+                print(f"⚠️  Warning: Found {len(invalid_rows)} rows with invalid amounts")
+                print("   These rows will be excluded from analysis")
+                with memory.stage('dropna_amount'):
+                    df = df.dropna(subset=['Amount'])
         
-        # Convert dates
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+            # Convert dates
+            with memory.stage('to_datetime'):
+                df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
         
-        # Check for invalid dates
-        invalid_dates = df[df['Date'].isna()]
-        if len(invalid_dates) > 0:
-            print(f"⚠️  Warning: Found {len(invalid_dates)} rows with invalid dates")
-            df = df.dropna(subset=['Date'])
+            # Check for invalid dates
+            invalid_dates = df[df['Date'].isna()]
+            if len(invalid_dates) > 0:
+                print(f"⚠️  Warning: Found {len(invalid_dates)} rows with invalid dates")
+                with memory.stage('dropna_date'):
+                    df = df.dropna(subset=['Date'])
+            memory.checkpoint('after_validation', df)
         
         if len(df) == 0:
             print("❌ Error: No valid data rows after validation")
@@ -94,64 +116,197 @@ def read_expenses_safe(filename):
         print(f"❌ Unexpected error reading file: {e}")
         return None
 
-def analyze_expenses(df):
-    """Analyze expenses with error handling"""
+@profiled('aggregate')
+def analyze_expenses(df, currency=REFERENCE_CURRENCY):
+    """Analyze expenses with error handling (amounts in the given currency)"""
     if df is None or len(df) == 0:
         print("❌ Error: No data to analyze")
         return None
     
     try:
-        stats = {
-            'total': df['Amount'].sum(),
-            'count': len(df),
-            'average': df['Amount'].mean(),
-            'by_category': df.groupby('Category')['Amount'].sum().to_dict()
-        }
+        with memory.stage('groupby'):
+            stats = {
+                'total': df['Amount'].sum(),
+                'count': len(df),
+                'average': df['Amount'].mean(),
+                'by_category': df.groupby('Category')['Amount'].sum().to_dict(),
+                'currency': currency
+            }
         return stats
         
     except Exception as e:
         print(f"❌ Error during analysis: {e}")
         return None
 
+@profiled('report')
 def print_report(stats):
     """Print expense report"""
     if stats is None:
         return
     
+    symbol = currency_symbol(stats.get('currency', REFERENCE_CURRENCY))
+    
     print("\n" + "=" * 50)
     print("EXPENSE ANALYSIS REPORT")
     print("=" * 50)
-    print(f"\nTotal Expenses: €{stats['total']:.2f}")
+    print(f"\nTotal Expenses: {symbol}{stats['total']:.2f}")
     print(f"Number of Transactions: {stats['count']}")
-    print(f"Average Transaction: €{stats['average']:.2f}")
+    print(f"Average Transaction: {symbol}{stats['average']:.2f}")
     
     print("\nSpending by Category:")
     for category, amount in sorted(stats['by_category'].items(), key=lambda x: x[1], reverse=True):
         percentage = (amount / stats['total']) * 100
-        print(f"  {category:15} €{amount:8.2f} ({percentage:5.1f}%)")
+        print(f"  {category:15} {symbol}{amount:8.2f} ({percentage:5.1f}%)")
     
     print("=" * 50)
 
-def main():
+@profiled('dedup')
+def deduplicate(df, args):
+    """Report or drop duplicate transactions, against a persistent index if given"""
+    index = HashIndex(args.dedup_index) if args.dedup_index else None
+    hashes = row_hashes(df)
+    kinds = find_duplicates(df, index=index, fuzzy_days=args.fuzzy_days, hashes=hashes)
+    print_duplicate_report(df, kinds)
+    
+    if args.dedup != 'drop':
+        return df
+    
+    kept = kinds.isna() if args.fuzzy_days is not None else kinds != 'exact'
+    if index is not None:
+        index.add(hashes[kept.to_numpy()])
+        index.save()
+    df = drop_duplicates(df, kinds, include_fuzzy=args.fuzzy_days is not None)
+    print(f"✅ Dropped {int((~kept).sum())} duplicate rows, {len(df)} remain")
+    return df
+
+@profiled('currency')
+def convert_currency(df, args):
+    """Convert every amount to the base currency with as-of exchange rates"""
+    rates = None
+    if args.rates:
+        try:
+            rates = load_rates(args.rates)
+        except (OSError, ValueError) as e:
+            print(f"❌ Error: Could not load exchange rates from '{args.rates}': {e}")
+            return None
+    
+    df = convert(df, rates, base=args.base_currency)
+    missing = df['Amount'].isna()
+    if missing.any():
+        unknown = ', '.join(sorted(df.loc[missing, 'OriginalCurrency'].unique()))
+        if rates is None:
+            print(f"❌ Error: Found {int(missing.sum())} rows in {unknown}; pass --rates FILE to convert them")
+            return None
+        print(f"⚠️  Warning: No exchange rate on or before the date of {int(missing.sum())} rows ({unknown})")
+        print("   These rows will be excluded from analysis")
+        df = df[~missing]
+    converted = int((df['OriginalCurrency'] != args.base_currency).sum())
+    if converted:
+        print(f"✅ Converted {converted} rows to {args.base_currency}")
+    return df
+
+@profiled('categorize')
+def categorize(df, rules_file):
+    """Fill blank or generic categories from description keyword rules"""
+    try:
+        categorizer = Categorizer.from_file(rules_file) if rules_file else Categorizer(DEFAULT_RULES)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: Could not load rules from '{rules_file}': {e}")
+        return None
+    df, filled = apply_categories(df, categorizer)
+    if filled:
+        print(f"✅ Categorized {filled} rows from their descriptions")
+    return df
+
+@profiled('anomalies')
+def report_anomalies(df, args):
+    """Flag expenses far above their category's recent spending"""
+    try:
+        scores = rolling_scores(df, window=args.window, method=args.anomalies,
+                                min_periods=args.min_periods, threshold=args.threshold)
+    except ValueError as e:
+        print(f"❌ Error: Anomaly detection failed: {e}")
+        return
+    print_anomalies(df, scores, currency=args.base_currency)
+
+def parse_args(argv=None):
+    """Parse command-line arguments"""
+    parser = argparse.ArgumentParser(description="Analyze an expense CSV file")
+    parser.add_argument('filenames', nargs='*', default=['data/expenses.csv'], metavar='FILE',
+                        help="Expense CSV files (overlapping exports are combined)")
+    parser.add_argument('--engine', default='auto', choices=['auto', 'python', 'c', 'pyarrow'],
+                        help="CSV parse engine (auto picks by file size)")
+    parser.add_argument('--dedup', choices=['report', 'drop'], help="Check for duplicate transactions")
+    parser.add_argument('--dedup-index', metavar='FILE',
+                        help="Persistent hash index of ingested rows (.npy); updated when dropping")
+    parser.add_argument('--fuzzy-days', type=int, metavar='N',
+                        help="Also flag same-amount rows within N days (dropped only with --dedup drop)")
+    parser.add_argument('--rates', metavar='FILE',
+                        help="Exchange rate CSV (Date, Currency, Rate; 1 EUR = Rate units) "
+                             "for files with a Currency column")
+    parser.add_argument('--base-currency', default=REFERENCE_CURRENCY, type=str.upper, metavar='CODE',
+                        help="Currency to report totals in")
+    parser.add_argument('--rules', nargs='?', const='', metavar='FILE',
+                        help="Fill blank/generic categories from keyword rules "
+                             "(JSON {category: [keywords]}; built-in rules if no file)")
+    parser.add_argument('--anomalies', nargs='?', const='zscore', choices=['zscore', 'mad'],
+                        help="Report unusually high expenses per category (default method: zscore)")
+    parser.add_argument('--window', default=DEFAULT_WINDOW, help="Rolling window for --anomalies (e.g. 30D)")
+    parser.add_argument('--min-periods', type=int, default=MIN_PERIODS,
+                        help="Earlier expenses in the window needed before scoring")
+    parser.add_argument('--threshold', type=float, help="Score that counts as unusual")
+    parser.add_argument('--profile', action='store_true', help="Print per-stage timings")
+    parser.add_argument('--trace', metavar='FILE', help="Write a Chrome trace-event JSON file")
+    parser.add_argument('--memory', action='store_true', help="Print per-stage memory usage")
+    parser.add_argument('--memory-json', metavar='FILE', help="Write the memory summary as JSON")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main function with command-line argument handling"""
-    # Get filename from command line or use default
-    if len(sys.argv) > 1:
-        filename = sys.argv[1]
-    else:
-        filename = 'data/expenses.csv'
+    args = parse_args(argv)
+    if args.profile or args.trace:
+        profiler.enable(trace=bool(args.trace))
+    if args.memory or args.memory_json:
+        memory.enable()
     
-    print(f"Analyzing expenses from: {filename}")
+    print(f"Analyzing expenses from: {', '.join(args.filenames)}")
     
     # Process with error handling
-    df = read_expenses_safe(filename)
-    
-    if df is not None:
-        stats = analyze_expenses(df)
-        print_report(stats)
-        return 0  # Success
-    else:
-        print("\n❌ Analysis failed")
-        return 1  # Error
+    with span('main'):
+        frames = [read_expenses_safe(filename, engine=args.engine) for filename in args.filenames]
+        frames = [df for df in frames if df is not None]
+        df = pd.concat(frames, ignore_index=True) if frames else None
+        
+        if df is not None and (args.dedup or args.dedup_index):
+            df = deduplicate(df, args)
+        
+        if df is not None and (args.rates or 'Currency' in df.columns
+                               or args.base_currency != REFERENCE_CURRENCY):
+            df = convert_currency(df, args)
+        
+        if df is not None and args.rules is not None:
+            df = categorize(df, args.rules)
+        
+        if df is not None and args.anomalies:
+            report_anomalies(df, args)
+        
+        if df is not None:
+            stats = analyze_expenses(df, currency=args.base_currency)
+            print_report(stats)
+            exit_code = 0  # Success
+        else:
+            print("\n❌ Analysis failed")
+            exit_code = 1  # Error
+
+    if args.profile:
+        profiler.print_report()
+    if args.trace:
+        profiler.write_chrome_trace(args.trace)
+    if args.memory:
+        memory.print_report()
+    if args.memory_json:
+        memory.write_json(args.memory_json)
+    return exit_code
 
 if __name__ == "__main__":
     exit_code = main()
@@ -7,6 +7,8 @@ import pandas as pd
 import logging
 from datetime import datetime
 
+from csv_engine import choose_engine, read_csv
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,8 +26,9 @@ def read_expenses(filename):
     logger.info(f"Starting to read file: {filename}")
     
     try:
-        df = pd.read_csv(filename)
-        logger.info(f"Successfully read {len(df)} rows from {filename}")
+        engine = choose_engine(filename)
+        df = read_csv(filename, engine=engine)
+        logger.info(f"Successfully read {len(df)} rows from {filename} ({engine} engine)")
         
         # Log data quality issues
         null_counts = df.isnull().sum()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+expense_anomaly.py - Per-category rolling outlier scores for expenses
+"""
+
+import bisect
+import sys
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from currency import currency_symbol
+
+DEFAULT_WINDOW = '30D'
+DEFAULT_THRESHOLDS = {'zscore': 3.0, 'mad': 3.5}
+MIN_PERIODS = 5
+# Spread floor as a fraction of the baseline, so a category that always
+# costs exactly €30 still flags a €120 row instead of dividing by zero
+MIN_RELATIVE_SPREAD = 0.05
+MAD_SCALE = 0.6745  # Makes MAD scores comparable to z-scores for normal data
+
+
+def _score(amount, baseline, spread):
+    floor = np.maximum(np.abs(baseline) * MIN_RELATIVE_SPREAD, 0.01)
+    return (amount - baseline) / np.maximum(spread, floor)
+
+
+def rolling_scores(df, window=DEFAULT_WINDOW, method='zscore', min_periods=MIN_PERIODS,
+                   threshold=None):
+    """
+    Score every expense against its category's recent history
+
+    Each row is compared with the same category's rows in the preceding
+    time window (closed='left', so a row never contributes to its own
+    baseline). 'zscore' uses the rolling mean and standard deviation;
+    'mad' uses the rolling median and a rolling median of absolute
+    deviations. The deviations are taken from each row's own rolling
+    median rather than the current one, which keeps the computation to two
+    grouped rolling passes and approximates the exact MAD.
+
+    Args:
+        df: Expense DataFrame with Date (datetime64), Category and Amount
+        window: Time window, e.g. '30D'
+        method: 'zscore' or 'mad'
+        min_periods: Rows needed in the window before a row is scored
+        threshold: Score at or above which a row is flagged (default per method)
+
+    Returns:
+        DataFrame aligned with df: baseline, spread, score, anomaly. Only
+        unusually high amounts are flagged.
+    """
+    if method not in DEFAULT_THRESHOLDS:
+        raise ValueError(f"Unknown method '{method}' (use zscore or mad)")
+    threshold = DEFAULT_THRESHOLDS[method] if threshold is None else threshold
+    window = pd.Timedelta(window)  # Raises ValueError for malformed windows
+
+    # Sorted the way groupby orders its output; the positional index maps
+    # results back to df's rows even if df's own index repeats
+    data = (df[['Date', 'Category', 'Amount']].reset_index(drop=True)
+            .sort_values(['Category', 'Date'], kind='stable', na_position='last'))
+    positions = data.index.to_numpy()
+
+    def rolling(column, how):
+        grouped = data.groupby('Category', sort=True, observed=True, dropna=False)
+        result = getattr(grouped.rolling(window, on='Date', closed='left',
+                                         min_periods=min_periods)[column], how)()
+        values = np.empty(len(df))
+        values[positions] = result.to_numpy()
+        return values
+
+    if method == 'zscore':
+        baseline = rolling('Amount', 'mean')
+        spread = rolling('Amount', 'std')
+    else:
+        baseline = rolling('Amount', 'median')
+        data['Deviation'] = np.abs(data['Amount'].to_numpy() - baseline[positions])
+        spread = rolling('Deviation', 'median') / MAD_SCALE
+
+    baseline = pd.Series(baseline, index=df.index)
+    spread = pd.Series(spread, index=df.index)
+    score = _score(df['Amount'], baseline, spread)
+    return pd.DataFrame({
+        'baseline': baseline,
+        'spread': spread,
+        'score': score,
+        'anomaly': score >= threshold,
+    }, index=df.index)
+
+
+class _CategoryWindow:
+    """Time window of one category's amounts with running sums and a sorted copy"""
+
+    def __init__(self):
+        self.entries = deque()  # (timestamp, amount), oldest first
+        self.sorted = []
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.pending_ts = None
+        self.pending = []  # Amounts at pending_ts, not yet part of the window
+
+    def commit(self):
+        for amount in self.pending:
+            self.entries.append((self.pending_ts, amount))
+            bisect.insort(self.sorted, amount)
+            self.total += amount
+            self.total_sq += amount * amount
+        self.pending = []
+
+    def evict(self, start):
+        while self.entries and self.entries[0][0] < start:
+            _, amount = self.entries.popleft()
+            del self.sorted[bisect.bisect_left(self.sorted, amount)]
+            self.total -= amount
+            self.total_sq -= amount * amount
+
+
+class StreamingDetector:
+    """
+    Incremental version of rolling_scores for time-ordered expense streams
+
+    Keeps only each category's window of amounts. Rows with the same
+    timestamp do not see each other, matching closed='left'. The 'mad'
+    method computes the exact MAD of the window, so its scores can differ
+    slightly from the batch approximation.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW, method='zscore', min_periods=MIN_PERIODS,
+                 threshold=None):
+        if method not in DEFAULT_THRESHOLDS:
+            raise ValueError(f"Unknown method '{method}' (use zscore or mad)")
+        self.window = pd.Timedelta(window)
+        self.method = method
+        self.min_periods = min_periods
+        self.threshold = DEFAULT_THRESHOLDS[method] if threshold is None else threshold
+        self.categories = {}
+
+    def update(self, date, category, amount):
+        """
+        Score one expense, then add it to its category's window
+
+        Returns:
+            (score, is_anomaly); score is NaN until the window has
+            min_periods rows
+        """
+        ts = pd.Timestamp(date)
+        state = self.categories.get(category)
+        if state is None:
+            state = self.categories[category] = _CategoryWindow()
+        if state.pending_ts is not None and ts > state.pending_ts:
+            state.commit()
+        state.evict(ts - self.window)
+
+        n = len(state.entries)
+        score = float('nan')
+        if n >= self.min_periods:
+            if self.method == 'zscore':
+                baseline = state.total / n
+                variance = max(0.0, (state.total_sq - n * baseline * baseline) / (n - 1))
+                spread = variance ** 0.5
+            else:
+                values = np.asarray(state.sorted)
+                baseline = float(np.median(values))
+                spread = float(np.median(np.abs(values - baseline))) / MAD_SCALE
+            score = float(_score(amount, baseline, spread))
+
+        if state.pending_ts != ts:
+            state.pending_ts = ts
+        state.pending.append(amount)
+        return score, score >= self.threshold
+
+    def process(self, df):
+        """Score a time-sorted DataFrame row by row (returns a Series of scores)"""
+        scores = [self.update(date, category, amount)[0]
+                  for date, category, amount in zip(df['Date'], df['Category'], df['Amount'])]
+        return pd.Series(scores, index=df.index, name='score')
+
+
+def print_anomalies(df, scores, limit=20, currency='EUR'):
+    """Print flagged expenses, highest score first"""
+    symbol = currency_symbol(currency)
+    flagged = df.join(scores[['baseline', 'score']])[scores['anomaly']]
+    print("\n" + "=" * 78)
+    print(f"UNUSUAL EXPENSES ({len(flagged)} flagged)")
+    print("=" * 78)
+    for _, row in flagged.sort_values('score', ascending=False).head(limit).iterrows():
+        print(f"  {row['Date'].strftime('%Y-%m-%d')} {str(row['Category'])[:12]:12} "
+              f"{str(row['Description'])[:24]:24} {symbol}{row['Amount']:9.2f} "
+              f"(usual {symbol}{row['baseline']:.2f}, score {row['score']:.1f})")
+    print("=" * 78)
+
+
+# Demo: a year of synthetic expenses across many categories
+if __name__ == "__main__":
+    import time
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    n_categories = 2000
+    rng = np.random.default_rng(0)
+    categories = rng.integers(0, n_categories, n_rows)
+    df = pd.DataFrame({
+        'Date': pd.Timestamp('2025-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 365 * 86400, n_rows)), unit='s'),
+        'Category': pd.Categorical([f"Category {c}" for c in range(n_categories)])[categories],
+        'Description': 'Card payment',
+        'Amount': np.round(rng.gamma(4, 5 + categories % 50), 2),
+    })
+    spikes = rng.choice(n_rows, 50, replace=False)
+    df.loc[spikes, 'Amount'] *= 20
+
+    for method in ('zscore', 'mad'):
+        start = time.perf_counter()
+        scores = rolling_scores(df, method=method)
+        elapsed = time.perf_counter() - start
+        caught = scores['anomaly'].iloc[spikes].sum()
+        print(f"{method:6} {n_rows:,} rows, {n_categories:,} categories: {elapsed:.2f}s, "
+              f"{scores['anomaly'].sum():,} flagged ({caught} of {len(spikes)} injected spikes)")
+
+    sample = df.iloc[:200_000]
+    start = time.perf_counter()
+    streamed = StreamingDetector().process(sample)
+    elapsed = time.perf_counter() - start
+    batch = rolling_scores(sample)['score']
+    print(f"streaming {len(sample):,} rows: {elapsed:.2f}s, "
+          f"max difference from batch {np.nanmax(np.abs(streamed - batch)):.2e}")
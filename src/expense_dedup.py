@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+expense_dedup.py - Exact and fuzzy duplicate detection for expense records
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from currency import REFERENCE_CURRENCY
+
+KEY_COLUMNS = ['Date', 'Category', 'Description', 'Amount']
+
+
+def normalize(df):
+    """
+    Canonical form of the key columns used for hashing
+
+    Dates are truncated to the day, text is lowercased with whitespace
+    collapsed and amounts become integer cents, so '85.5' and '85.50 '
+    from two bank exports hash the same.
+    """
+    return pd.DataFrame({
+        'Date': pd.to_datetime(df['Date'], errors='coerce').dt.normalize(),
+        'Category': _normalize_text(df['Category']),
+        'Description': _normalize_text(df['Description']),
+        'Amount': amount_cents(df),
+    }, index=df.index)
+
+
+def _normalize_text(series):
+    """
+    Normalize each distinct value once and map back through codes
+
+    Bank exports repeat the same few thousand descriptions, so this is far
+    cheaper than string operations on every row. Categorical values hash
+    the same as the equivalent strings.
+    """
+    codes, uniques = pd.factorize(series.astype(str))
+    cleaned = pd.Series(uniques).str.strip().str.lower().str.replace(r'\s+', ' ', regex=True)
+    merged_codes, categories = pd.factorize(cleaned)
+    return pd.Categorical.from_codes(merged_codes[codes], categories)
+
+
+def amount_cents(df):
+    """Amounts as int64 cents"""
+    return np.round(pd.to_numeric(df['Amount'], errors='coerce').to_numpy(dtype=float) * 100).astype(np.int64)
+
+
+def currency_codes(df):
+    """Upper-cased currency per row; blank or missing means the reference currency"""
+    if 'Currency' not in df.columns:
+        return np.full(len(df), REFERENCE_CURRENCY, dtype=object)
+    codes, uniques = pd.factorize(df['Currency'].fillna('').astype(str))
+    cleaned = pd.Series(uniques, dtype=object).str.strip().str.upper().replace('', REFERENCE_CURRENCY)
+    return np.append(cleaned.to_numpy(dtype=object), REFERENCE_CURRENCY)[codes]
+
+
+def row_hashes(df):
+    """
+    64-bit hash per row over the normalized key columns (vectorized)
+
+    Rows in another currency than the reference one also hash their
+    currency, so 50 EUR and 50 USD differ. Reference-currency rows keep
+    the plain hash, which stays compatible with existing indexes.
+    """
+    hashes = pd.util.hash_pandas_object(normalize(df), index=False).to_numpy(dtype=np.uint64)
+    currency = currency_codes(df)
+    foreign = currency != REFERENCE_CURRENCY
+    if foreign.any():
+        mixed = pd.DataFrame({'hash': hashes[foreign], 'currency': currency[foreign]})
+        hashes[foreign] = pd.util.hash_pandas_object(mixed, index=False).to_numpy(dtype=np.uint64)
+    return hashes
+
+
+class HashIndex:
+    """
+    Sorted array of row hashes persisted as a .npy file
+
+    Membership is a binary search (searchsorted) per row, so checking a
+    batch costs O(n log m) with no per-row Python work.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        if self.path.exists():
+            self.hashes = np.load(self.path)
+        else:
+            self.hashes = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def contains(self, hashes):
+        """Boolean array: which hashes are already in the index"""
+        if len(self.hashes) == 0:
+            return np.zeros(len(hashes), dtype=bool)
+        pos = np.searchsorted(self.hashes, hashes)
+        pos[pos == len(self.hashes)] = 0
+        return self.hashes[pos] == hashes
+
+    def add(self, hashes):
+        """Merge new hashes into the index (kept sorted and unique)"""
+        self.hashes = np.union1d(self.hashes, np.asarray(hashes, dtype=np.uint64))
+
+    def save(self):
+        """Write the index atomically"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.save(f, self.hashes)
+        os.replace(tmp, self.path)
+
+
+def find_duplicates(df, index=None, fuzzy_days=None, hashes=None):
+    """
+    Flag duplicate rows
+
+    Exact duplicates repeat an earlier row of df or a hash already in
+    index. Fuzzy duplicates (when fuzzy_days is set) have the same amount
+    and currency as an earlier row with the same category or the same
+    description, dated at most fuzzy_days after it. Each group is anchored
+    on its first row and the next group starts at the first row past the
+    anchor's window, so recurring expenses don't chain into one group.
+    The anchor of each group is kept. An expense that recurs more often
+    than fuzzy_days (e.g. a daily ticket with fuzzy_days=1) still matches
+    its predecessor, so keep the window shorter than such periods.
+
+    Args:
+        df: Expense DataFrame with the KEY_COLUMNS
+        index: Optional HashIndex of previously ingested rows
+        fuzzy_days: Window in days for fuzzy matching (None disables it)
+        hashes: Precomputed row_hashes(df)
+
+    Returns:
+        Series aligned with df: None, 'exact' or 'fuzzy'
+    """
+    if hashes is None:
+        hashes = row_hashes(df)
+    exact = pd.Series(hashes).duplicated().to_numpy()
+    if index is not None:
+        exact |= index.contains(hashes)
+
+    kinds = np.full(len(df), None, dtype=object)
+    kinds[exact] = 'exact'
+
+    if fuzzy_days is not None:
+        candidates = np.flatnonzero(~exact & df['Date'].notna().to_numpy())
+        keys = normalize(df.iloc[candidates])
+        days = keys['Date'].to_numpy('datetime64[D]').astype(np.int64)
+        cents = keys['Amount'].to_numpy()
+        currency = pd.factorize(currency_codes(df)[candidates])[0]
+        fuzzy = np.zeros(len(candidates), dtype=bool)
+        for text in ('Category', 'Description'):
+            fuzzy |= ~_window_anchors(days, [cents, currency, keys[text].cat.codes.to_numpy()], fuzzy_days)
+        kinds[candidates[fuzzy]] = 'fuzzy'
+
+    return pd.Series(kinds, index=df.index, name='duplicate')
+
+
+def _window_anchors(days, keys, window):
+    """
+    Mark the rows that anchor a fuzzy group
+
+    Rows are sorted by the key arrays and then by day. Each run of equal
+    keys starts a group at its first row. The next group starts at the
+    first row more than `window` days after the current anchor. Every run
+    advances by one binary search per round, so the number of rounds is
+    the largest number of groups in any run.
+    """
+    n = len(days)
+    anchors = np.zeros(n, dtype=bool)
+    if n == 0:
+        return anchors
+    group = np.zeros(n, dtype=np.int64)
+    for key in keys:
+        codes, uniques = pd.factorize(key)
+        group = pd.factorize(group * len(uniques) + codes)[0]  # Compact ids can't overflow
+
+    # One sorted axis: runs are laid end to end, further apart than the window
+    span = days.max() - days.min() + window + 1
+    position = group * span + (days - days.min())
+    order = np.argsort(position, kind='stable')
+    position, run = position[order], group[order]
+
+    frontier = np.flatnonzero(np.r_[True, run[1:] != run[:-1]])
+    while len(frontier):
+        anchors[order[frontier]] = True
+        nxt = np.searchsorted(position, position[frontier] + window, side='right')
+        inside = nxt < n
+        frontier = nxt[inside][run[nxt[inside]] == run[frontier[inside]]]
+    return anchors
+
+
+def drop_duplicates(df, kinds, include_fuzzy=False):
+    """Return df without exact (and optionally fuzzy) duplicates"""
+    drop = kinds == 'exact'
+    if include_fuzzy:
+        drop |= kinds == 'fuzzy'
+    return df.loc[~drop]
+
+
+def print_duplicate_report(df, kinds, limit=10):
+    """Print duplicate counts and the first few flagged rows"""
+    counts = kinds.value_counts()
+    print("\n" + "=" * 50)
+    print("DUPLICATE CHECK")
+    print("=" * 50)
+    print(f"Rows checked:      {len(df):,}")
+    print(f"Exact duplicates:  {counts.get('exact', 0):,}")
+    print(f"Fuzzy duplicates:  {counts.get('fuzzy', 0):,}")
+    flagged = df.loc[kinds.notna(), KEY_COLUMNS].assign(Duplicate=kinds[kinds.notna()])
+    if len(flagged):
+        print(f"\nFirst {min(limit, len(flagged))} flagged rows:")
+        print(flagged.head(limit).to_string())
+    print("=" * 50)
+
+
+# Demo: overlapping exports plus a throughput check
+if __name__ == "__main__":
+    import time
+
+    base = pd.read_csv('data/expenses.csv')
+    overlap = base.iloc[5:].copy()
+    overlap['Description'] = overlap['Description'].str.upper() + '  '
+    overlap.loc[overlap.index[0], 'Date'] = '2025-10-11'  # Posted a day later
+    combined = pd.concat([base, overlap], ignore_index=True)
+    kinds = find_duplicates(combined, fuzzy_days=2)
+    print_duplicate_report(combined, kinds)
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    rng = np.random.default_rng(0)
+    big = pd.DataFrame({
+        'Date': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 1500, n_rows), unit='D'),
+        'Category': rng.choice(['Food', 'Transport', 'Office'], n_rows),
+        'Description': rng.choice([f'Merchant {i}' for i in range(500)], n_rows),
+        'Amount': rng.integers(100, 50_000, n_rows) / 100,
+    })
+    start = time.perf_counter()
+    kinds = find_duplicates(big, fuzzy_days=1)
+    elapsed = time.perf_counter() - start
+    print(f"\n{n_rows:,} rows checked in {elapsed:.2f}s "
+          f"({n_rows / elapsed / 1e6:.1f}M rows/s), {kinds.notna().sum():,} flagged")
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+expense_query.py - Filtered, grouped expense queries with column/predicate pushdown
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  Optional: Parquet caches with predicate pushdown
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+GROUPINGS = {None, 'category', 'day', 'month'}
+AGGREGATES = ('sum', 'count', 'mean', 'min', 'max')
+DEFAULT_CHUNKSIZE = 500_000
+
+
+class ExpenseQuery:
+    """Filters, grouping and aggregates for one expense question"""
+
+    def __init__(self, start=None, end=None, categories=None, min_amount=None,
+                 max_amount=None, group_by=None, aggs=('sum', 'count')):
+        """
+        Args:
+            start: First date included (e.g. '2025-10-01')
+            end: Last date included
+            categories: Iterable of categories to keep
+            min_amount: Smallest amount kept (inclusive)
+            max_amount: Largest amount kept (inclusive)
+            group_by: None, 'category', 'day' or 'month'
+            aggs: Aggregates over Amount, any of AGGREGATES
+        """
+        if group_by not in GROUPINGS:
+            raise ValueError("group_by must be one of: category, day, month")
+        unknown = set(aggs) - set(AGGREGATES)
+        if unknown:
+            raise ValueError(f"Unknown aggregates: {', '.join(sorted(unknown))}")
+
+        self.start = pd.Timestamp(start) if start is not None else None
+        self.end = pd.Timestamp(end) + pd.Timedelta(days=1) if end is not None else None
+        self.categories = set(categories) if categories else None
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+        self.group_by = group_by
+        self.aggs = tuple(aggs)
+
+    def columns(self):
+        """
+        Columns the query needs; everything else is never parsed
+
+        Date is always read: rows whose date does not parse are dropped,
+        as build_cache drops them, so the answer does not depend on
+        whether a cache exists.
+        """
+        needed = ['Amount', 'Date']
+        if self.categories or self.group_by == 'category':
+            needed.append('Category')
+        return needed
+
+    def uses_amount_filter(self):
+        return self.min_amount is not None or self.max_amount is not None
+
+    def filter(self, df):
+        """Apply the predicates cheapest first, parsing dates only for surviving rows"""
+        amount = pd.to_numeric(df['Amount'], errors='coerce')
+        mask = amount.notna()
+        if self.min_amount is not None:
+            mask &= amount >= self.min_amount
+        if self.max_amount is not None:
+            mask &= amount <= self.max_amount
+        if self.categories:
+            mask &= df['Category'].isin(self.categories)
+        df = df.loc[mask].assign(Amount=amount[mask])
+
+        if 'Date' in df.columns:
+            if not pd.api.types.is_datetime64_any_dtype(df['Date']):
+                df = df.assign(Date=pd.to_datetime(df['Date'], errors='coerce'))
+            mask = df['Date'].notna()
+            if self.start is not None:
+                mask &= df['Date'] >= self.start
+            if self.end is not None:
+                mask &= df['Date'] < self.end
+            df = df.loc[mask]
+        return df
+
+    def group_key(self, df):
+        """Series to group by (None means one overall group)"""
+        if self.group_by == 'category':
+            return df['Category']
+        if self.group_by == 'day':
+            return df['Date'].dt.to_period('D').rename('Day')
+        if self.group_by == 'month':
+            return df['Date'].dt.to_period('M').rename('Month')
+        return pd.Series('all', index=df.index, name='Group')
+
+
+def _partial(query, df):
+    """Combinable per-chunk aggregates: sum, count, min, max"""
+    grouped = df['Amount'].groupby(query.group_key(df), observed=True)
+    return grouped.agg(['sum', 'count', 'min', 'max'])
+
+
+def _finish(query, partials):
+    """Merge per-chunk partials and derive the requested aggregates"""
+    partials = [p for p in partials if len(p)]
+    if not partials:
+        return pd.DataFrame(columns=list(query.aggs))
+    combined = pd.concat(partials)
+    merged = combined.groupby(level=0, observed=True).agg(
+        {'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'})
+    merged['mean'] = merged['sum'] / merged['count']
+    return merged[list(query.aggs)].sort_index()
+
+
+# --- Caches -----------------------------------------------------------------
+
+def _cache_dir(filename):
+    path = Path(filename)
+    return path.parent / f".{path.name}.cache"
+
+
+def _cache_path(filename, name):
+    return _cache_dir(filename) / (f"{name}.parquet" if HAS_PYARROW else f"{name}.pkl")
+
+
+def _cache_is_fresh(filename):
+    """A cache is used only if it was built from the CSV as it is now"""
+    meta_path = _cache_dir(filename) / 'meta.json'
+    if not meta_path.exists():
+        return False
+    with open(meta_path, 'r') as f:
+        meta = json.load(f)
+    stat = os.stat(filename)
+    return meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size
+
+
+def _write_frame(df, path):
+    if HAS_PYARROW:
+        df.to_parquet(path, index=False)
+    else:
+        df.to_pickle(path)
+
+
+def _read_frame(path, columns=None, filters=None):
+    if HAS_PYARROW:
+        return pd.read_parquet(path, columns=columns, filters=filters)
+    df = pd.read_pickle(path)
+    return df[columns] if columns else df
+
+
+def build_cache(filename, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Write a typed columnar copy and a daily per-category rollup of a CSV
+
+    Uses Parquet when pyarrow is installed, pickled DataFrames otherwise.
+    """
+    cache_dir = _cache_dir(filename)
+    cache_dir.mkdir(exist_ok=True)
+
+    columns, rollups = [], []
+    everything = ExpenseQuery()
+    for chunk in pd.read_csv(filename, usecols=['Date', 'Category', 'Description', 'Amount'],
+                             chunksize=chunksize):
+        chunk = chunk.assign(Date=pd.to_datetime(chunk['Date'], errors='coerce'))
+        chunk = everything.filter(chunk)
+        columns.append(chunk)
+        # Keyed by calendar day; rows without a category stay in the ungrouped totals
+        rollups.append(chunk.groupby([chunk['Date'].dt.normalize(), 'Category'], dropna=False)['Amount']
+                       .agg(['sum', 'count', 'min', 'max']))
+
+    data = pd.concat(columns, ignore_index=True)
+    data['Category'] = data['Category'].astype('category')
+    rollup = (pd.concat(rollups).groupby(level=[0, 1], dropna=False)
+              .agg({'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'}).reset_index())
+
+    _write_frame(data, _cache_path(filename, 'columns'))
+    _write_frame(rollup, _cache_path(filename, 'rollup'))
+    stat = os.stat(filename)
+    with open(cache_dir / 'meta.json', 'w') as f:
+        json.dump({'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'rows': len(data)}, f)
+    print(f"✅ Cache built in {cache_dir} ({len(data):,} rows, {len(rollup):,} rollup rows)")
+
+
+def _query_rollup(query, filename):
+    rollup = _read_frame(_cache_path(filename, 'rollup'))
+    mask = pd.Series(True, index=rollup.index)
+    if query.start is not None:
+        mask &= rollup['Date'] >= query.start
+    if query.end is not None:
+        mask &= rollup['Date'] < query.end
+    if query.categories:
+        mask &= rollup['Category'].isin(query.categories)
+    rollup = rollup.loc[mask]
+
+    key = query.group_key(rollup)
+    merged = rollup.groupby(key, observed=True).agg(
+        {'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'})
+    merged['mean'] = merged['sum'] / merged['count']
+    return merged[list(query.aggs)].sort_index(), len(rollup)
+
+
+def _query_columnar(query, filename):
+    filters = []
+    if HAS_PYARROW:
+        if query.start is not None:
+            filters.append(('Date', '>=', query.start))
+        if query.end is not None:
+            filters.append(('Date', '<', query.end))
+        if query.categories:
+            filters.append(('Category', 'in', list(query.categories)))
+        if query.min_amount is not None:
+            filters.append(('Amount', '>=', query.min_amount))
+        if query.max_amount is not None:
+            filters.append(('Amount', '<=', query.max_amount))
+    df = _read_frame(_cache_path(filename, 'columns'), columns=query.columns(), filters=filters or None)
+    scanned = len(df)
+    df = query.filter(df)
+    return _finish(query, [_partial(query, df)]), scanned
+
+
+def _query_csv(query, filename, chunksize):
+    partials = []
+    rows_read = 0
+    for chunk in pd.read_csv(filename, usecols=query.columns(), chunksize=chunksize,
+                             dtype={'Category': str, 'Amount': str} if 'Category' in query.columns()
+                             else {'Amount': str}):
+        rows_read += len(chunk)
+        matched = query.filter(chunk)
+        if len(matched):
+            partials.append(_partial(query, matched))
+    return _finish(query, partials), rows_read
+
+
+def run_query(filename, query, chunksize=DEFAULT_CHUNKSIZE, use_cache=True):
+    """
+    Answer a query from the cheapest available source
+
+    The daily rollup is used when the query has no amount bounds; the
+    columnar copy when a fresh cache exists; otherwise the CSV is read in
+    chunks with only the needed columns.
+
+    Returns:
+        (result DataFrame, info dict with 'source' and 'rows_scanned')
+    """
+    if use_cache and _cache_is_fresh(filename):
+        if not query.uses_amount_filter():
+            result, scanned = _query_rollup(query, filename)
+            return result, {'source': 'rollup', 'rows_scanned': scanned}
+        result, scanned = _query_columnar(query, filename)
+        return result, {'source': 'columnar', 'rows_scanned': scanned}
+
+    result, scanned = _query_csv(query, filename, chunksize)
+    return result, {'source': 'csv', 'rows_scanned': scanned}
+
+
+def print_result(result, info):
+    """Print query results as a table"""
+    print("\n" + "=" * 60)
+    print(f"QUERY RESULT (source: {info['source']}, rows scanned: {info['rows_scanned']:,})")
+    print("=" * 60)
+    if len(result) == 0:
+        print("No matching expenses")
+    else:
+        formatters = {col: (lambda v: f"€{v:,.2f}") for col in result.columns if col != 'count'}
+        print(result.to_string(formatters=formatters))
+    print("=" * 60)
+
+
+def main(argv=None):
+    """Main function with command-line argument handling"""
+    parser = argparse.ArgumentParser(description="Query an expense CSV file")
+    parser.add_argument('filename', nargs='?', default='data/expenses.csv')
+    parser.add_argument('--start', help="First date (YYYY-MM-DD)")
+    parser.add_argument('--end', help="Last date, inclusive (YYYY-MM-DD)")
+    parser.add_argument('--category', action='append', help="Category to include (repeatable)")
+    parser.add_argument('--min', type=float, dest='min_amount', help="Minimum amount")
+    parser.add_argument('--max', type=float, dest='max_amount', help="Maximum amount")
+    parser.add_argument('--group-by', choices=['category', 'day', 'month'])
+    parser.add_argument('--agg', nargs='+', default=['sum', 'count'], choices=AGGREGATES)
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--build-cache', action='store_true', help="Build the columnar cache and rollup")
+    parser.add_argument('--no-cache', action='store_true', help="Always read the CSV")
+    args = parser.parse_args(argv)
+
+    if not Path(args.filename).is_file():
+        print(f"❌ Error: File '{args.filename}' not found")
+        return 1
+
+    if args.build_cache:
+        build_cache(args.filename, chunksize=args.chunksize)
+
+    query = ExpenseQuery(start=args.start, end=args.end, categories=args.category,
+                         min_amount=args.min_amount, max_amount=args.max_amount,
+                         group_by=args.group_by, aggs=args.agg)
+    result, info = run_query(args.filename, query, chunksize=args.chunksize,
+                             use_cache=not args.no_cache)
+    print_result(result, info)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+expense_store.py - Persistent SQLite store for validated expense rows
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from itertools import repeat
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from currency import REFERENCE_CURRENCY
+from expense_analyzer_robust import convert_currency, print_report, read_expenses_safe
+
+BATCH_SIZE = 50_000
+GROUPINGS = ('category', 'day', 'month')
+
+# sources records the size and mtime of each file and of the exchange rate
+# file its amounts were converted with, so a change to either re-ingests it.
+# expenses holds one row per (source file, data row). The two indexes carry
+# amount as a trailing column, so date- and category-sliced aggregates are
+# answered from the index alone. daily is a per-day, per-category rollup
+# rebuilt for the affected dates on every ingest; stats and totals read it,
+# so their cost depends on the number of days and not on the number of rows.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id          INTEGER PRIMARY KEY,
+    path        TEXT NOT NULL UNIQUE,
+    mtime_ns    INTEGER,
+    size        INTEGER,
+    rates_path  TEXT,
+    rates_mtime_ns INTEGER,
+    rows        INTEGER,
+    first_date  TEXT,
+    last_date   TEXT,
+    ingested_at TEXT
+);
+CREATE TABLE IF NOT EXISTS expenses (
+    source_id   INTEGER NOT NULL REFERENCES sources(id),
+    row_no      INTEGER NOT NULL,
+    date        TEXT NOT NULL,
+    category    TEXT,
+    description TEXT,
+    amount      REAL NOT NULL,
+    PRIMARY KEY (source_id, row_no)
+);
+CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses(date, category, amount);
+CREATE INDEX IF NOT EXISTS idx_expenses_category_date ON expenses(category, date, amount);
+CREATE TABLE IF NOT EXISTS daily (
+    date     TEXT NOT NULL,
+    category TEXT,
+    count    INTEGER NOT NULL,
+    total    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_daily_date ON daily(date, category);
+"""
+
+UPSERT = """
+INSERT INTO expenses (source_id, row_no, date, category, description, amount)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(source_id, row_no) DO UPDATE SET
+    date = excluded.date, category = excluded.category,
+    description = excluded.description, amount = excluded.amount
+WHERE (date, category, description, amount)
+      IS NOT (excluded.date, excluded.category, excluded.description, excluded.amount)
+"""
+
+
+def _where(start=None, end=None, categories=None):
+    """SQL filter and parameters for a date range and category list"""
+    clauses, params = [], []
+    if start is not None:
+        clauses.append("date >= ?")
+        params.append(pd.Timestamp(start).strftime('%Y-%m-%d'))
+    if end is not None:
+        clauses.append("date <= ?")
+        params.append(pd.Timestamp(end).strftime('%Y-%m-%d'))
+    if categories:
+        categories = list(categories)
+        clauses.append(f"category IN ({', '.join('?' * len(categories))})")
+        params.extend(categories)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def file_version(filename):
+    """(resolved path, mtime_ns) identifying one version of a file, or (None, None)"""
+    if filename is None:
+        return None, None
+    return str(Path(filename).resolve()), os.stat(filename).st_mtime_ns
+
+
+def _nullable(series):
+    """Column values as Python objects with None for missing"""
+    return series.astype(object).where(series.notna(), None).to_numpy()
+
+
+class ExpenseStore:
+    """
+    SQLite (WAL) store of expense rows, ingested idempotently per source row
+
+    WAL mode lets any number of readers query while one writer ingests:
+    readers see the last committed state and never block the writer.
+    """
+
+    def __init__(self, db_path='data/expenses.db', readonly=False):
+        """
+        Args:
+            db_path: SQLite database file
+            readonly: Open for queries only (the database must exist)
+        """
+        if readonly:
+            self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=30)
+        else:
+            self.conn = sqlite3.connect(db_path, timeout=30)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")  # Durable at checkpoints in WAL mode
+            self.conn.executescript(SCHEMA)
+            self._migrate()
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA cache_size=-262144")  # 256 MB page cache for bulk ingest
+
+    def close(self):
+        self.conn.close()
+
+    def _migrate(self):
+        """Add columns missing from databases created by older versions"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(sources)")}
+        for column, kind in (('rates_path', 'TEXT'), ('rates_mtime_ns', 'INTEGER')):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE sources ADD COLUMN {column} {kind}")
+
+    def _source(self, filename):
+        row = self.conn.execute(
+            "SELECT * FROM sources WHERE path = ?", (str(Path(filename).resolve()),)).fetchone()
+        return dict(row) if row else None
+
+    def is_current(self, filename, stat=None, rates=(None, None)):
+        """
+        True if the file was ingested and neither it nor its rates changed since
+
+        Args:
+            filename: Source file
+            stat: os.stat() result of the file (taken now if not given)
+            rates: file_version() of the exchange rate file used to convert it
+        """
+        source = self._source(filename)
+        stat = stat or os.stat(filename)
+        return (source is not None and source['mtime_ns'] == stat.st_mtime_ns
+                and source['size'] == stat.st_size
+                and (source['rates_path'], source['rates_mtime_ns']) == tuple(rates))
+
+    def ingest(self, df, filename, stat=None, rates=(None, None), batch_size=BATCH_SIZE):
+        """
+        Store validated rows from one source file
+
+        Rows are keyed by (source file, df index), so ingesting the same
+        file again changes nothing, rows edited in the file are updated and
+        rows that disappeared from it are deleted. Each file is written in
+        one transaction of executemany batches, inserted in date order to
+        keep the index writes sequential.
+
+        Args:
+            df: Expense DataFrame from read_expenses_safe (index = data row)
+            filename: Source file the rows were read from
+            stat: os.stat() result taken before the file was read, so a
+                write during the read leaves the source out of date
+                (taken now if not given)
+            rates: file_version() of the exchange rate file used to
+                convert the amounts
+
+        Returns:
+            Dictionary with inserted, updated, deleted and unchanged counts
+        """
+        path = str(Path(filename).resolve())
+        stat = stat or os.stat(filename)
+        now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+        day = df['Date'].to_numpy().astype('datetime64[D]')
+        order = np.argsort(day, kind='stable')
+        codes, uniques = pd.factorize(day[order])
+        dates = np.asarray(uniques.astype(str))[codes]  # Each distinct day is formatted once
+        row_no = df.index.to_numpy()[order]
+        category = _nullable(df['Category'])[order]
+        description = _nullable(df['Description'])[order]
+        amount = df['Amount'].to_numpy(dtype=float)[order]
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO sources (path, ingested_at) VALUES (?, ?) ON CONFLICT(path) DO NOTHING",
+                (path, now))
+            old = dict(self.conn.execute("SELECT * FROM sources WHERE path = ?", (path,)).fetchone())
+            before = old['rows'] or 0
+
+            changed = 0
+            for i in range(0, len(df), batch_size):
+                j = i + batch_size
+                cursor = self.conn.executemany(UPSERT, zip(
+                    repeat(old['id']), row_no[i:j].tolist(), dates[i:j].tolist(),
+                    category[i:j].tolist(), description[i:j].tolist(), amount[i:j].tolist()))
+                changed += cursor.rowcount
+
+            stored = self.conn.execute(
+                "SELECT COUNT(*) FROM expenses WHERE source_id = ?", (old['id'],)).fetchone()[0]
+            inserted = stored - before
+            deleted = 0
+            if stored > len(df):
+                self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep (row_no INTEGER PRIMARY KEY)")
+                self.conn.execute("DELETE FROM keep")
+                self.conn.executemany("INSERT INTO keep VALUES (?)", zip(row_no.tolist()))
+                deleted = self.conn.execute(
+                    "DELETE FROM expenses WHERE source_id = ? AND row_no NOT IN (SELECT row_no FROM keep)",
+                    (old['id'],)).rowcount
+
+            # Rows may have moved out of the file's old date range, so both ranges are refreshed
+            bounds = [d for d in (old['first_date'], old['last_date'], *dates[:1], *dates[-1:]) if d]
+            if bounds:
+                self._refresh_daily(min(bounds), max(bounds))
+            self.conn.execute(
+                """UPDATE sources SET mtime_ns = ?, size = ?, rates_path = ?, rates_mtime_ns = ?,
+                                      rows = ?, first_date = ?, last_date = ?, ingested_at = ?
+                   WHERE id = ?""",
+                (stat.st_mtime_ns, stat.st_size, *rates, len(df), dates[0] if len(dates) else None,
+                 dates[-1] if len(dates) else None, now, old['id']))
+
+        return {'inserted': inserted, 'updated': changed - inserted, 'deleted': deleted,
+                'unchanged': len(df) - changed}
+
+    def _refresh_daily(self, first, last):
+        """Rebuild the rollup for a date range (inside the ingest transaction)"""
+        self.conn.execute("DELETE FROM daily WHERE date BETWEEN ? AND ?", (first, last))
+        self.conn.execute(
+            """INSERT INTO daily (date, category, count, total)
+               SELECT date, category, COUNT(*), SUM(amount) FROM expenses
+               WHERE date BETWEEN ? AND ? GROUP BY date, category""", (first, last))
+
+    def sources(self):
+        """Return the ingested source files"""
+        return [dict(r) for r in self.conn.execute("SELECT * FROM sources ORDER BY path")]
+
+    def stats(self, start=None, end=None, categories=None):
+        """
+        Same statistics as analyze_expenses, from the daily rollup
+
+        Args:
+            start: First date included (e.g. '2025-10-01')
+            end: Last date included
+            categories: Iterable of categories to keep
+
+        Returns:
+            Dictionary with total, count, average, by_category and currency,
+            or None if nothing matches
+        """
+        where, params = _where(start, end, categories)
+        count, total = self.conn.execute(
+            f"SELECT COALESCE(SUM(count), 0), COALESCE(SUM(total), 0.0) FROM daily{where}",
+            params).fetchone()
+        if count == 0:
+            return None
+        by_category = self.conn.execute(
+            f"""SELECT category, SUM(total) FROM daily{where}
+                {'AND' if where else 'WHERE'} category IS NOT NULL GROUP BY category""", params)
+        return {
+            'total': total,
+            'count': count,
+            'average': total / count,
+            'by_category': dict(by_category.fetchall()),
+            'currency': REFERENCE_CURRENCY,
+        }
+
+    def totals(self, group_by='month', start=None, end=None, categories=None):
+        """Expense count and total per category, day or month (DataFrame)"""
+        if group_by not in GROUPINGS:
+            raise ValueError(f"group_by must be one of: {', '.join(GROUPINGS)}")
+        key = {'category': 'category', 'day': 'date', 'month': 'substr(date, 1, 7)'}[group_by]
+        where, params = _where(start, end, categories)
+        query = f"""SELECT {key} AS {group_by}, SUM(count) AS count, SUM(total) AS sum
+                    FROM daily{where} GROUP BY 1 ORDER BY 1"""
+        return pd.read_sql_query(query, self.conn, params=params, index_col=group_by)
+
+    def rows(self, start=None, end=None, categories=None, limit=None):
+        """Individual expenses in date order (DataFrame like read_expenses_safe's)"""
+        where, params = _where(start, end, categories)
+        query = f"""SELECT date AS Date, category AS Category, description AS Description,
+                           amount AS Amount FROM expenses{where} ORDER BY date"""
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return pd.read_sql_query(query, self.conn, params=params, parse_dates=['Date'])
+
+
+def ingest_files(store, args):
+    """Read, validate and store each file whose contents or rates changed since its last ingest"""
+    try:
+        rates = file_version(args.rates)
+    except OSError as e:
+        print(f"❌ Error: Could not read exchange rates '{args.rates}': {e}")
+        return len(args.filenames)
+
+    failed = 0
+    for filename in args.filenames:
+        # Stat before reading: a write during the read is then picked up next time
+        stat = os.stat(filename) if Path(filename).is_file() else None
+        if not args.force and stat is not None and store.is_current(filename, stat, rates):
+            print(f"✅ {filename}: unchanged since last ingest")
+            continue
+
+        df = read_expenses_safe(filename, engine=args.engine)
+        if df is not None and (args.rates or 'Currency' in df.columns):
+            df = convert_currency(df, args)  # Stored amounts are all in the reference currency
+        if df is None:
+            failed += 1
+            continue
+
+        counts = store.ingest(df, filename, stat=stat, rates=rates)
+        print(f"✅ {filename}: {counts['inserted']} inserted, {counts['updated']} updated, "
+              f"{counts['deleted']} deleted, {counts['unchanged']} unchanged")
+    return failed
+
+
+def print_sources(store):
+    """Print the ingested files"""
+    print(f"\n{'='*78}")
+    print("INGESTED FILES")
+    print(f"{'='*78}")
+    for source in store.sources():
+        print(f"  {source['path']}")
+        print(f"    {source['rows']:,} rows, {source['first_date']} to {source['last_date']}, "
+              f"ingested {source['ingested_at']}")
+    print(f"{'='*78}")
+
+
+def main(argv=None):
+    """Main function with command-line argument handling"""
+    parser = argparse.ArgumentParser(description="Persistent SQLite store for expense files")
+    parser.add_argument('command', choices=['ingest', 'report', 'totals', 'rows', 'sources'])
+    parser.add_argument('filenames', nargs='*', metavar='FILE', help="Expense CSV files to ingest")
+    parser.add_argument('--db', default='data/expenses.db', help="SQLite database path")
+    parser.add_argument('--engine', default='auto', choices=['auto', 'python', 'c', 'pyarrow'],
+                        help="CSV parse engine (auto picks by file size)")
+    parser.add_argument('--rates', metavar='FILE',
+                        help="Exchange rate CSV for files with a Currency column (stored in EUR)")
+    parser.add_argument('--force', action='store_true', help="Re-read files even if unchanged")
+    parser.add_argument('--start', help="First date (YYYY-MM-DD)")
+    parser.add_argument('--end', help="Last date, inclusive (YYYY-MM-DD)")
+    parser.add_argument('--category', action='append', help="Category to include (repeatable)")
+    parser.add_argument('--group-by', choices=GROUPINGS, default='month', help="Grouping for totals")
+    parser.add_argument('--limit', type=int, default=50, help="Rows to print for rows")
+    parser.set_defaults(base_currency=REFERENCE_CURRENCY)
+    args = parser.parse_args(argv)
+
+    if args.command != 'ingest' and not Path(args.db).is_file():
+        print(f"❌ Error: Database '{args.db}' not found (run ingest first)")
+        return 1
+
+    store = ExpenseStore(args.db, readonly=args.command != 'ingest')
+    try:
+        if args.command == 'ingest':
+            if not args.filenames:
+                print("❌ Error: No files to ingest")
+                return 1
+            return 1 if ingest_files(store, args) else 0
+
+        if args.command == 'sources':
+            print_sources(store)
+        elif args.command == 'report':
+            stats = store.stats(args.start, args.end, args.category)
+            if stats is None:
+                print("❌ Error: No data to analyze")
+                return 1
+            print_report(stats)
+        elif args.command == 'totals':
+            result = store.totals(args.group_by, args.start, args.end, args.category)
+            print(result.to_string(formatters={'sum': lambda v: f"€{v:,.2f}"})
+                  if len(result) else "No matching expenses")
+        else:
+            result = store.rows(args.start, args.end, args.category, limit=args.limit)
+            print(result.to_string(index=False, formatters={'Amount': lambda v: f"€{v:,.2f}"})
+                  if len(result) else "No matching expenses")
+        return 0
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
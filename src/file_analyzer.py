@@ -3,11 +3,14 @@
 file_analyzer.py - Analyze files in any directory
 """
 
+import argparse
 import os
 import sys
 from pathlib import Path
 from datetime import datetime
 
+from memory_profile import memory
+
 def analyze_directory(directory_path):
     """
     Analyze files in a directory and return statistics
@@ -94,17 +97,28 @@ def print_report(stats):
 
     print("=" * 60)
 
-def main():
+def main(argv=None):
     """Main function with command-line argument handling"""
-    # Check if directory argument is provided
-    if len(sys.argv) > 1:
-        directory = sys.argv[1]
-    else:
-        directory = os.path.expanduser("~/Downloads")
+    parser = argparse.ArgumentParser(description="Analyze files in a directory")
+    parser.add_argument('directory', nargs='?', default=os.path.expanduser("~/Downloads"),
+                        help="Directory to analyze")
+    parser.add_argument('--memory', action='store_true', help="Print per-stage memory usage")
+    parser.add_argument('--memory-json', metavar='FILE', help="Write the memory summary as JSON")
+    args = parser.parse_args(argv)
+    directory = args.directory
+    if args.memory or args.memory_json:
+        memory.enable()
 
     print(f"Analyzing directory: {directory}")
-    stats = analyze_directory(directory)
-    print_report(stats)
+    with memory.stage('scan'):
+        stats = analyze_directory(directory)
+    with memory.stage('report'):
+        print_report(stats)
+
+    if args.memory:
+        memory.print_report()
+    if args.memory_json:
+        memory.write_json(args.memory_json)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
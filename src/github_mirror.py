@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+github_mirror.py - Local SQLite mirror of GitHub users and repositories
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from github_stats import GitHubAPI, read_usernames
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    login        TEXT PRIMARY KEY,
+    name         TEXT,
+    public_repos INTEGER,
+    followers    INTEGER,
+    following    INTEGER,
+    created_at   TEXT,
+    updated_at   TEXT,
+    etag         TEXT,
+    repos_etag   TEXT,
+    fetched_at   TEXT
+);
+CREATE TABLE IF NOT EXISTS repos (
+    full_name   TEXT PRIMARY KEY,
+    owner       TEXT NOT NULL,
+    name        TEXT NOT NULL,
+    stars       INTEGER NOT NULL,
+    forks       INTEGER NOT NULL,
+    language    TEXT,
+    description TEXT,
+    updated_at  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_repos_owner ON repos(owner);
+CREATE INDEX IF NOT EXISTS idx_repos_stars ON repos(stars DESC);
+CREATE INDEX IF NOT EXISTS idx_repos_language ON repos(language, stars);
+"""
+
+REPOS_PER_PAGE = 100
+
+
+class GitHubMirror:
+    """SQLite mirror refreshed incrementally with ETags and updated_at"""
+
+    def __init__(self, db_path='data/github_mirror.db', api=None):
+        self.api = api or GitHubAPI()
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _canonical_login(self, username):
+        """Stored spelling of a login (GitHub logins are case-insensitive)"""
+        row = self.conn.execute(
+            "SELECT login FROM users WHERE login = ? COLLATE NOCASE", (username,)).fetchone()
+        return row['login'] if row else username
+
+    def _rename(self, old, new):
+        """Move a user's rows from a typed spelling to the canonical login"""
+        self.conn.execute("UPDATE users SET login = ? WHERE login = ?", (new, old))
+        self.conn.execute("UPDATE repos SET owner = ? WHERE owner = ?", (new, old))
+        return new
+
+    def _etags(self, login):
+        row = self.conn.execute(
+            "SELECT etag, repos_etag, public_repos FROM users WHERE login = ?", (login,)).fetchone()
+        return (row['etag'], row['repos_etag'], row['public_repos']) if row else (None, None, None)
+
+    def _fetch(self, login, etag, repos_etag, public_repos):
+        """Conditionally fetch one user and their repositories (runs in a worker thread)"""
+        user, etag = self.api.fetch_conditional(f"{self.api.base_url}/users/{login}", etag)
+        if user is not None:
+            public_repos = user['public_repos']
+        # An ETag covers only the first page, so longer lists are always fetched in full
+        paged = (public_repos or 0) > REPOS_PER_PAGE
+        repos, repos_etag = self.api.fetch_conditional(
+            f"{self.api.base_url}/users/{login}/repos?per_page={REPOS_PER_PAGE}",
+            None if paged else repos_etag)
+        return user, etag, repos, None if paged else repos_etag
+
+    def _store_user(self, login, user, etag, repos_etag, now):
+        if user is None:
+            self.conn.execute(
+                "UPDATE users SET repos_etag = ?, fetched_at = ? WHERE login = ?",
+                (repos_etag, now, login))
+            return
+        self.conn.execute(
+            """INSERT INTO users (login, name, public_repos, followers, following,
+                                  created_at, updated_at, etag, repos_etag, fetched_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(login) DO UPDATE SET
+                   name = excluded.name, public_repos = excluded.public_repos,
+                   followers = excluded.followers, following = excluded.following,
+                   updated_at = excluded.updated_at, etag = excluded.etag,
+                   repos_etag = excluded.repos_etag, fetched_at = excluded.fetched_at""",
+            (login, user.get('name'), user['public_repos'], user['followers'], user['following'],
+             user['created_at'], user.get('updated_at'), etag, repos_etag, now))
+
+    def _store_repos(self, login, repos):
+        """Upsert repositories whose updated_at changed; delete ones that disappeared"""
+        known = dict(self.conn.execute(
+            "SELECT full_name, updated_at FROM repos WHERE owner = ?", (login,)))
+        changed = [
+            (repo['full_name'], login, repo['name'], repo['stargazers_count'], repo['forks_count'],
+             repo['language'], repo.get('description'), repo.get('updated_at'))
+            for repo in repos
+            if known.get(repo['full_name'], '') != repo.get('updated_at')
+        ]
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO repos VALUES (?, ?, ?, ?, ?, ?, ?, ?)", changed)
+
+        removed = known.keys() - {repo['full_name'] for repo in repos}
+        self.conn.executemany("DELETE FROM repos WHERE full_name = ?", [(n,) for n in removed])
+        return len(changed), len(removed)
+
+    def refresh(self, usernames, max_workers=16):
+        """
+        Refresh users and repositories, fetching only what changed
+
+        Network requests run concurrently; database writes happen on the
+        calling thread in one transaction.
+
+        Returns:
+            Dictionary of refresh counters
+        """
+        counts = {'users_changed': 0, 'users_unchanged': 0, 'repos_upserted': 0,
+                  'repos_deleted': 0, 'failed': []}
+        logins = {}
+        for username in usernames:
+            logins.setdefault(username.lower(), self._canonical_login(username))
+        usernames = list(logins.values())
+        etags = {login: self._etags(login) for login in usernames}
+        now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {login: pool.submit(self._fetch, login, *etags[login]) for login in usernames}
+
+            with self.conn:
+                for login, future in futures.items():
+                    try:
+                        user, etag, repos, repos_etag = future.result()
+                    except Exception as e:
+                        print(f"❌ Error refreshing {login}: {e}")
+                        counts['failed'].append(login)
+                        continue
+
+                    if user is None and repos is None:
+                        counts['users_unchanged'] += 1
+                    else:
+                        counts['users_changed'] += 1
+                    if user is not None and user['login'] != login:
+                        login = self._rename(login, user['login'])  # Keyed by GitHub's spelling
+                    self._store_user(login, user, etag, repos_etag, now)
+                    if repos is not None:
+                        upserted, deleted = self._store_repos(login, repos)
+                        counts['repos_upserted'] += upserted
+                        counts['repos_deleted'] += deleted
+        return counts
+
+    def top_repos(self, limit=10, language=None):
+        """Return the most-starred mirrored repositories"""
+        if language:
+            query = "SELECT * FROM repos WHERE language = ? ORDER BY stars DESC LIMIT ?"
+            return [dict(r) for r in self.conn.execute(query, (language, limit))]
+        query = "SELECT * FROM repos ORDER BY stars DESC LIMIT ?"
+        return [dict(r) for r in self.conn.execute(query, (limit,))]
+
+    def language_breakdown(self):
+        """Return repository count, stars and forks per language"""
+        query = """SELECT COALESCE(language, 'Unknown') AS language, COUNT(*) AS repos,
+                          SUM(stars) AS stars, SUM(forks) AS forks
+                   FROM repos GROUP BY language ORDER BY repos DESC"""
+        return [dict(r) for r in self.conn.execute(query)]
+
+    def user_totals(self, login):
+        """Return star/fork totals for one user"""
+        row = self.conn.execute(
+            """SELECT COUNT(*) AS repos, COALESCE(SUM(stars), 0) AS stars,
+                      COALESCE(SUM(forks), 0) AS forks
+               FROM repos WHERE owner = ?""", (login,)).fetchone()
+        return dict(row)
+
+
+def print_report(mirror, limit=10):
+    """Print top repositories and the language breakdown from the mirror"""
+    print(f"\n{'='*60}")
+    print("TOP REPOSITORIES (by stars)")
+    print(f"{'='*60}")
+    for repo in mirror.top_repos(limit):
+        print(f"  ⭐ {repo['stars']:6}  🍴 {repo['forks']:5}  {repo['full_name']}")
+
+    print(f"\n{'='*60}")
+    print("LANGUAGES")
+    print(f"{'='*60}")
+    for row in mirror.language_breakdown():
+        print(f"  {row['language']:15} {row['repos']:6} repos  ⭐ {row['stars']:7}")
+    print(f"{'='*60}")
+
+
+def main():
+    """Main function with command-line argument handling"""
+    parser = argparse.ArgumentParser(description="Local SQLite mirror of GitHub data")
+    parser.add_argument('command', choices=['refresh', 'report'])
+    parser.add_argument('usernames', nargs='*', help="Usernames to refresh")
+    parser.add_argument('--file', help="File with one username per line")
+    parser.add_argument('--db', default='data/github_mirror.db', help="SQLite database path")
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--base-url', help="API base URL (default: $GITHUB_API_URL or api.github.com)")
+    args = parser.parse_args()
+
+    api = GitHubAPI(base_url=args.base_url, token=os.getenv('GITHUB_TOKEN'))
+    mirror = GitHubMirror(args.db, api)
+    try:
+        if args.command == 'refresh':
+            usernames = list(args.usernames)
+            if args.file:
+                usernames += read_usernames(args.file)
+            counts = mirror.refresh(usernames, max_workers=args.workers)
+            print(f"✅ Users changed: {counts['users_changed']}, unchanged: {counts['users_unchanged']}, "
+                  f"failed: {len(counts['failed'])}")
+            print(f"   Repos upserted: {counts['repos_upserted']}, deleted: {counts['repos_deleted']}")
+            return 1 if counts['failed'] else 0
+
+        print_report(mirror, args.limit)
+        return 0
+    finally:
+        mirror.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
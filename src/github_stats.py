@@ -3,40 +3,101 @@
 github_stats.py - Get GitHub repository statistics
 """
 
-import requests
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+from http_transport import get_transport
+from singleflight import SingleFlight, request_key
+
 class GitHubAPI:
     """Simple GitHub API client"""
 
-    def __init__(self):
-        self.base_url = "https://api.github.com"
-        self.session = requests.Session()
-        self.session.headers.update({
+    def __init__(self, base_url=None, token=None, transport=None):
+        # GITHUB_API_URL points the client at a mirror or the local mock server
+        self.base_url = (base_url or os.getenv('GITHUB_API_URL', "https://api.github.com")).rstrip('/')
+        self.transport = transport or get_transport()
+        self.session = self.transport.session
+        self.headers = {
             'Accept': 'application/vnd.github.v3+json',
             'User-Agent': 'Python-Learning-Script'
-        })
+        }
+        if token:
+            self.headers['Authorization'] = f'Bearer {token}'
+        # Concurrent lookups of the same URL share one request
+        self.inflight = SingleFlight()
+
+    def _get_json(self, url):
+        """GET a URL and decode JSON, coalescing identical in-flight requests"""
+        def fetch():
+            response = self.session.get(url, headers=self.headers, timeout=self.transport.timeout)
+            response.raise_for_status()
+            return response.json()
+
+        return self.inflight.do(request_key('GET', url, headers=self.headers), fetch)
+
+    def _get_all_pages(self, url):
+        """GET a paginated list, following 'next' links"""
+        def fetch():
+            items = []
+            next_url = f"{url}?per_page=100"
+            while next_url:
+                response = self.session.get(next_url, headers=self.headers, timeout=self.transport.timeout)
+                response.raise_for_status()
+                items.extend(response.json())
+                next_url = response.links.get('next', {}).get('url')
+            return items
+
+        return self.inflight.do(request_key('GET', url, headers=self.headers), fetch)
+
+    def fetch_conditional(self, url, etag=None):
+        """
+        GET a URL with If-None-Match, following 'next' links on a change
+
+        Returns:
+            (data, etag) where data is None when the server answered
+            304 Not Modified (conditional requests don't use rate limit)
+        """
+        headers = {**self.headers, 'If-None-Match': etag} if etag else self.headers
+        response = self.session.get(url, headers=headers, timeout=self.transport.timeout)
+        if response.status_code == 304:
+            return None, etag
+        response.raise_for_status()
+
+        data = response.json()
+        new_etag = response.headers.get('ETag')
+        next_url = response.links.get('next', {}).get('url')
+        while next_url:
+            page = self.session.get(next_url, headers=self.headers, timeout=self.transport.timeout)
+            page.raise_for_status()
+            data.extend(page.json())
+            next_url = page.links.get('next', {}).get('url')
+        return data, new_etag
+
+    def fetch_user(self, username):
+        """Get user information, raising on failure"""
+        return self._get_json(f"{self.base_url}/users/{username}")
+
+    def fetch_repos(self, username):
+        """Get all user repositories, raising on failure"""
+        return self._get_all_pages(f"{self.base_url}/users/{username}/repos")
     
     def get_user(self, username):
         """Get user information"""
-        url = f"{self.base_url}/users/{username}"
-        
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            return response.json()
+            return self.fetch_user(username)
         except Exception as e:
             print(f"❌ Error fetching user data: {e}")
             return None
         
     def get_repos(self, username):
         """Get user repositories"""
-        url = f"{self.base_url}/users/{username}/repos"
-        
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            return response.json()
+            return self.fetch_repos(username)
         except Exception as e:
             print(f"❌ Error fetching repositories: {e}")
             return None
@@ -74,25 +135,187 @@ class GitHubAPI:
             print(f"\n  📦 {repo['name']}")
             print(f"     ⭐ {repo['stargazers_count']} stars")
             print(f"     🍴 {repo['forks_count']} forks")
-            print(f"     📝 {repo.get('description', 'No description')[:120]}")
+            print(f"     📝 {(repo.get('description') or 'No description')[:120]}")
             if repo['language']:
                 print(f"     💻 {repo['language']}")
         
         # Statistics
-        total_stars = sum(repo['stargazers_count'] for repo in repos)
-        total_forks = sum(repo['forks_count'] for repo in repos)
-        languages = set(repo['language'] for repo in repos if repo['language'])
+        stats = summarize_user(user, repos)
         
         print(f"\n{'='*60}")
         print("OVERALL STATISTICS")
         print(f"{'='*60}")
-        print(f"Total Stars: {total_stars}")
-        print(f"Total Forks: {total_forks}")
-        print(f"Languages Used: {', '.join(sorted(languages))}")
+        print(f"Total Stars: {stats['total_stars']}")
+        print(f"Total Forks: {stats['total_forks']}")
+        print(f"Languages Used: {', '.join(sorted(stats['languages']))}")
         print(f"{'='*60}")
 
-if __name__ == "__main__":
-    api = GitHubAPI()
+    def collect_many(self, usernames, max_workers=16):
+        """
+        Fetch stats for many users concurrently
+
+        User and repository lookups for all users are scheduled on one
+        bounded thread pool sharing the pooled session.
+
+        Yields:
+            One stats dictionary per user, in completion order, keyed by
+            'username' as requested (successful rows also carry the
+            canonical 'login'). Failed users have an 'error' key instead
+            of statistics.
+        """
+        # Logins are case-insensitive: drop duplicates, keep the first spelling
+        unique = {}
+        for username in usernames:
+            unique.setdefault(username.lower(), username)
+
+        pending = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {}
+            for username in unique.values():
+                futures[pool.submit(self.fetch_user, username)] = (username, 'user')
+                futures[pool.submit(self.fetch_repos, username)] = (username, 'repos')
+
+            for future in as_completed(futures):
+                username, kind = futures[future]
+                parts = pending.setdefault(username, {})
+                try:
+                    parts[kind] = future.result()
+                except Exception as e:
+                    parts.setdefault('error', f"{kind}: {e}")
+                    parts[kind] = None
 
-    # Analyze your own GitHub profile
-    api.print_user_stats("schnstep")
\ No newline at end of file
+                if 'user' in parts and 'repos' in parts:
+                    del pending[username]
+                    if 'error' in parts:
+                        yield {'username': username, 'error': parts['error']}
+                    else:
+                        yield {'username': username, **summarize_user(parts['user'], parts['repos'])}
+
+
+def summarize_user(user, repos):
+    """Build a per-user stats dictionary from user and repository data"""
+    languages = Counter(repo['language'] for repo in repos if repo['language'])
+    top_repos = sorted(repos, key=lambda x: x['stargazers_count'], reverse=True)[:3]
+    return {
+        'login': user['login'],
+        'name': user.get('name'),
+        'public_repos': user['public_repos'],
+        'followers': user['followers'],
+        'following': user['following'],
+        'created_at': user['created_at'],
+        'total_stars': sum(repo['stargazers_count'] for repo in repos),
+        'total_forks': sum(repo['forks_count'] for repo in repos),
+        'languages': dict(languages),
+        'top_repos': [
+            {'name': repo['full_name'], 'stars': repo['stargazers_count'], 'forks': repo['forks_count']}
+            for repo in top_repos
+        ],
+    }
+
+
+class OrgRollup:
+    """Accumulate org-wide totals from per-user stats as they arrive"""
+
+    def __init__(self):
+        self.users = 0
+        self.failed = []
+        self.total_stars = 0
+        self.total_forks = 0
+        self.total_repos = 0
+        self.languages = Counter()
+        self.top_repos = []
+
+    def add(self, stats):
+        if 'error' in stats:
+            self.failed.append(stats['username'])
+            return
+        self.users += 1
+        self.total_stars += stats['total_stars']
+        self.total_forks += stats['total_forks']
+        self.total_repos += stats['public_repos']
+        self.languages.update(stats['languages'])
+        self.top_repos = sorted(self.top_repos + stats['top_repos'],
+                                key=lambda x: x['stars'], reverse=True)[:10]
+
+    def summary(self):
+        return {
+            'users': self.users,
+            'failed': self.failed,
+            'total_repos': self.total_repos,
+            'total_stars': self.total_stars,
+            'total_forks': self.total_forks,
+            'languages': dict(self.languages.most_common()),
+            'top_repos': self.top_repos,
+        }
+
+
+def print_rollup(summary):
+    """Print org-wide statistics"""
+    print(f"\n{'='*60}")
+    print("ORG-WIDE STATISTICS")
+    print(f"{'='*60}")
+    print(f"Users: {summary['users']} ({len(summary['failed'])} failed)")
+    print(f"Public Repos: {summary['total_repos']}")
+    print(f"Total Stars: {summary['total_stars']}")
+    print(f"Total Forks: {summary['total_forks']}")
+
+    print("\nLanguages (repositories):")
+    for language, count in list(summary['languages'].items())[:15]:
+        print(f"  {language:15} {count:6}")
+
+    print("\nTop Repositories (by stars):")
+    for repo in summary['top_repos']:
+        print(f"  ⭐ {repo['stars']:6}  {repo['name']}")
+    print(f"{'='*60}")
+
+
+def read_usernames(filename):
+    """Read one username per line, ignoring blanks and '#' comments"""
+    with open(filename, 'r') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def main():
+    """Main function with command-line argument handling"""
+    parser = argparse.ArgumentParser(description="GitHub user and repository statistics")
+    parser.add_argument('usernames', nargs='*', help="GitHub usernames")
+    parser.add_argument('--file', help="File with one username per line")
+    parser.add_argument('--workers', type=int, default=16, help="Concurrent requests")
+    parser.add_argument('--json', action='store_true', help="Emit JSON lines instead of text")
+    parser.add_argument('--base-url', help="API base URL (default: $GITHUB_API_URL or api.github.com)")
+    args = parser.parse_args()
+
+    usernames = list(args.usernames)
+    if args.file:
+        usernames += read_usernames(args.file)
+
+    api = GitHubAPI(base_url=args.base_url, token=os.getenv('GITHUB_TOKEN'))
+
+    # Single user: detailed profile report
+    if len(usernames) <= 1 and not args.json:
+        api.print_user_stats(usernames[0] if usernames else "schnstep")
+        return 0
+
+    # Batch mode: stream per-user results, then print the rollup
+    rollup = OrgRollup()
+    started = datetime.now()
+    for stats in api.collect_many(usernames, max_workers=args.workers):
+        rollup.add(stats)
+        if args.json:
+            print(json.dumps(stats), flush=True)
+        elif 'error' in stats:
+            print(f"❌ {stats['username']}: {stats['error']}", flush=True)
+        else:
+            print(f"✅ {stats['username']:25} ⭐ {stats['total_stars']:6}  "
+                  f"🍴 {stats['total_forks']:5}  📦 {stats['public_repos']:4}", flush=True)
+
+    summary = rollup.summary()
+    if args.json:
+        print(json.dumps({'rollup': summary}))
+    else:
+        print_rollup(summary)
+        print(f"Completed in {(datetime.now() - started).total_seconds():.1f}s")
+    return 0 if not summary['failed'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
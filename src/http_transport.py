@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+http_transport.py - Shared, pooled HTTP sessions for the API clients
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+try:
+    import httpx  # Optional: HTTP/2 backend
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401  Needed by httpx for HTTP/2 ('httpx[http2]')
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+DEFAULT_POOL_CONNECTIONS = 10   # Number of hosts kept in the pool manager
+DEFAULT_POOL_MAXSIZE = 32       # Keep-alive connections kept per host
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT = 10
+
+# Status codes worth retrying at the transport level (rate limits, gateways)
+RETRY_STATUSES = (429, 502, 503, 504)
+RETRY_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+RETRY_BACKOFF = 0.5
+
+
+_pool_wait = threading.local()
+
+
+class _TimedPoolMixin:
+    """Accumulate the time this thread spends waiting for a pooled connection"""
+
+    def _get_conn(self, timeout=None):
+        start = time.perf_counter()
+        try:
+            return super()._get_conn(timeout)
+        finally:
+            _pool_wait.seconds = getattr(_pool_wait, 'seconds', 0.0) + time.perf_counter() - start
+
+
+class _TimedHTTPConnectionPool(_TimedPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _TimedHTTPSConnectionPool(_TimedPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools record checkout wait time"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+
+def reset_pool_wait():
+    """Reset this thread's pool wait accumulator before a request"""
+    _pool_wait.seconds = 0.0
+
+
+def last_pool_wait() -> float:
+    """Seconds this thread waited for pooled connections since reset_pool_wait()"""
+    return getattr(_pool_wait, 'seconds', 0.0)
+
+
+def _requests_backend(transport):
+    """Build a requests.Session with a sized pool and a retry adapter"""
+    retry = Retry(
+        total=transport.retries,
+        connect=transport.retries,
+        read=False,  # Re-raise read timeouts so the clients' own retry/backoff handles them
+        status=transport.retries,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=RETRY_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = _TimedHTTPAdapter(
+        pool_connections=transport.pool_connections,
+        pool_maxsize=transport.pool_maxsize,
+        max_retries=retry,
+        pool_block=True,  # Threads wait for a free connection instead of opening throwaways
+    )
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['Connection'] = 'keep-alive'
+    return session
+
+
+@contextmanager
+def _requests_errors():
+    """Re-raise httpx exceptions as the requests exceptions the clients catch"""
+    try:
+        yield
+    except httpx.ConnectTimeout as e:
+        raise requests.exceptions.ConnectTimeout(str(e)) from e
+    except httpx.ReadTimeout as e:
+        raise requests.exceptions.ReadTimeout(str(e)) from e
+    except httpx.TimeoutException as e:
+        raise requests.exceptions.Timeout(str(e)) from e
+    except httpx.TooManyRedirects as e:
+        raise requests.exceptions.TooManyRedirects(str(e)) from e
+    except (httpx.InvalidURL, httpx.UnsupportedProtocol) as e:
+        raise requests.exceptions.InvalidURL(str(e)) from e
+    except httpx.TransportError as e:
+        raise requests.exceptions.ConnectionError(str(e)) from e
+    except httpx.HTTPError as e:
+        raise requests.exceptions.RequestException(str(e)) from e
+
+
+class _HttpxRaw:
+    """
+    File-like view of a streamed httpx body (already decompressed)
+
+    retries mimics urllib3's Retry: its history lists the status
+    retries made before this response.
+    """
+
+    decode_content = True
+
+    def __init__(self, response, history=()):
+        self.retries = SimpleNamespace(history=tuple(history))
+        self._chunks = response.iter_bytes()
+        self._buffer = b''
+
+    def read(self, size=-1):
+        with _requests_errors():
+            while size < 0 or len(self._buffer) < size:
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    break
+                self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class _HttpxResponse:
+    """requests.Response-like wrapper around an httpx.Response"""
+
+    def __init__(self, response, history=()):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.reason = response.reason_phrase
+        self.links = response.links
+        self.request = SimpleNamespace(method=response.request.method, url=self.url,
+                                       body=response.request.content or None)
+        self.raw = _HttpxRaw(response, history)
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def encoding(self):
+        return self._response.encoding
+
+    @encoding.setter
+    def encoding(self, value):
+        self._response.encoding = value
+
+    @property
+    def content(self):
+        with _requests_errors():
+            return self._response.read()
+
+    @property
+    def text(self):
+        with _requests_errors():
+            self._response.read()
+        return self._response.text
+
+    def json(self, **kwargs):
+        try:
+            return json.loads(self.content, **kwargs)
+        except json.JSONDecodeError as e:
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        chunks = (self._response.iter_text(chunk_size) if decode_unicode
+                  else self._response.iter_bytes(chunk_size))
+        with _requests_errors():
+            yield from chunks
+
+    def raise_for_status(self):
+        """Raise requests.exceptions.HTTPError for 4xx/5xx, like requests"""
+        if 400 <= self.status_code < 600:
+            kind = 'Client' if self.status_code < 500 else 'Server'
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} {kind} Error: {self.reason} for url: {self.url}", response=self)
+
+    def close(self):
+        self._response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _HttpxSession:
+    """
+    requests.Session-like facade over an httpx.Client
+
+    Accepts the requests keyword arguments the clients use (params, data,
+    json, headers, timeout, stream, allow_redirects, auth) and raises
+    requests exceptions, so the clients work unchanged on either backend.
+    Like the requests backend's Retry, idempotent requests answered with
+    a RETRY_STATUSES code are retried here, honouring Retry-After.
+    """
+
+    def __init__(self, client, retries):
+        self.client = client
+        self.retries = retries
+        self.headers = client.headers
+
+    @staticmethod
+    def _timeout(timeout):
+        """requests timeout (seconds or a (connect, read) tuple) as httpx.Timeout"""
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(read, connect=connect)
+        return httpx.Timeout(timeout)
+
+    def request(self, method, url, params=None, data=None, headers=None, json=None,
+                timeout=None, stream=False, allow_redirects=True, auth=None, **kwargs):
+        content = None
+        if isinstance(data, (bytes, str)):
+            content, data = data, None
+        history = []
+        with _requests_errors():
+            request = self.client.build_request(
+                method, url, params=params, content=content, data=data, json=json,
+                headers=headers, timeout=self._timeout(timeout), **kwargs)
+            while True:
+                response = self.client.send(request, stream=stream, auth=auth,
+                                            follow_redirects=allow_redirects)
+                if (request.method not in RETRY_METHODS or response.status_code not in RETRY_STATUSES
+                        or len(history) >= self.retries):
+                    break
+                response.close()
+                history.append(SimpleNamespace(status=response.status_code, error=None))
+                time.sleep(self._backoff(response, len(history)))
+        return _HttpxResponse(response, history)
+
+    @staticmethod
+    def _backoff(response, retry):
+        """Seconds before a status retry: Retry-After, else urllib3's backoff"""
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return int(retry_after)
+        return 0 if retry == 1 else RETRY_BACKOFF * 2 ** (retry - 1)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        self.client.close()
+
+
+def _httpx_backend(transport):
+    """
+    Build an httpx.Client behind a requests-compatible session
+
+    Speaks HTTP/2 when the 'h2' package is installed ('httpx[http2]'),
+    HTTP/1.1 otherwise. httpx retries failed connects; the session
+    retries 429/5xx.
+    """
+    limits = httpx.Limits(
+        max_connections=transport.pool_connections * transport.pool_maxsize,
+        max_keepalive_connections=transport.pool_maxsize,
+    )
+    pool = httpx.HTTPTransport(http2=HAS_H2, limits=limits, retries=transport.retries)
+    return _HttpxSession(httpx.Client(transport=pool, timeout=transport.timeout), transport.retries)
+
+
+BACKENDS: Dict[str, Callable] = {
+    'requests': _requests_backend,
+}
+if httpx is not None:
+    BACKENDS['httpx'] = _httpx_backend
+
+
+def register_backend(name: str, factory: Callable):
+    """
+    Register a session factory under a backend name
+
+    Args:
+        name: Backend name used in HTTPTransport(backend=...)
+        factory: Callable taking the HTTPTransport and returning a
+            session object with requests-style get/post/request methods,
+            responses and exceptions (the clients catch
+            requests.exceptions.*)
+    """
+    BACKENDS[name] = factory
+
+
+class HTTPTransport:
+    """
+    Pooled, keep-alive HTTP session shared by the API clients
+
+    The underlying connection pool is thread-safe, so one transport can be
+    used from a thread pool. Clients must pass per-client headers (such as
+    Authorization) with each request instead of mutating session.headers.
+    """
+
+    def __init__(self, pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 retries: int = DEFAULT_RETRIES,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 backend: str = 'requests'):
+        """
+        Initialize transport
+
+        Args:
+            pool_connections: Number of distinct hosts to keep pools for
+            pool_maxsize: Connections kept alive per host
+            retries: Transport-level retries for connect errors and 429/5xx
+            timeout: Default request timeout in seconds
+            backend: Name of a registered backend (see register_backend)
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown HTTP backend '{backend}'. Available: {', '.join(BACKENDS)}")
+
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.timeout = timeout
+        self.backend = backend
+        self.session = BACKENDS[backend](self)
+
+    def request(self, method: str, url: str, **kwargs):
+        """Send a request through the pooled session"""
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        """Send a GET request"""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        """Send a POST request"""
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+
+_default_transport: Optional[HTTPTransport] = None
+_default_lock = threading.Lock()
+
+
+def get_transport() -> HTTPTransport:
+    """Return the process-wide shared transport, creating it on first use"""
+    global _default_transport
+    if _default_transport is None:
+        with _default_lock:
+            if _default_transport is None:
+                _default_transport = HTTPTransport()
+    return _default_transport
+
+
+def configure_transport(**kwargs) -> HTTPTransport:
+    """
+    Replace the shared transport with a newly configured one
+
+    Accepts the same keyword arguments as HTTPTransport.
+    """
+    global _default_transport
+    with _default_lock:
+        old = _default_transport
+        _default_transport = HTTPTransport(**kwargs)
+    if old is not None:
+        old.close()
+    return _default_transport
+
+
+# Benchmark: fresh connection per request vs pooled keep-alive session
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    connections = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Required for keep-alive
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            connections.append(self.client_address)
+
+        def do_GET(self):
+            body = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/ping"
+    n_requests = 500
+
+    def run(label, fetch):
+        connections.clear()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: fetch(url).raise_for_status(), range(n_requests)))
+        elapsed = time.perf_counter() - start
+        print(f"{label:20} {elapsed:7.3f}s  {elapsed / n_requests * 1000:6.3f} ms/request  "
+              f"{len(connections):4} TCP connections")
+        return elapsed
+
+    print(f"{n_requests} GET requests, 8 threads")
+    print("=" * 70)
+    fresh = run("requests.get", lambda u: requests.get(u, timeout=10))
+    transport = HTTPTransport()
+    pooled = run("HTTPTransport", transport.get)
+    print("=" * 70)
+    print(f"Latency saved per request: {(fresh - pooled) / n_requests * 1000:.3f} ms")
+
+    transport.close()
+    server.shutdown()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+instrumentation.py - Structured request events with pluggable metric sinks
+"""
+
+import bisect
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+# Upper bounds in seconds; the last bucket catches everything slower
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+_ID_SEGMENT = re.compile(r'/(\d+|[0-9a-f]{16,}|[0-9a-f-]{36})(?=/|$)')
+
+
+def normalize_endpoint(endpoint: str) -> str:
+    """Collapse ID-like path segments so '/users/42' and '/users/7' share a label"""
+    return _ID_SEGMENT.sub('/{id}', endpoint.split('?', 1)[0])
+
+
+class Histogram:
+    """Fixed-bucket histogram with interpolated percentiles"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def percentile(self, q: float) -> float:
+        """Estimate the q-th percentile (0-100) by interpolating within a bucket"""
+        if self.count == 0:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if self.buckets[i] != float('inf') else lower * 2 or 1.0
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-2]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+
+class MemorySink:
+    """Aggregate events in memory into per-endpoint histograms and counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = defaultdict(Histogram)
+        self.pool_wait = defaultdict(Histogram)
+        self.status = defaultdict(lambda: defaultdict(int))
+        self.counters = defaultdict(lambda: defaultdict(int))
+
+    def emit(self, event: Dict):
+        key = (event.get('method', ''), event.get('endpoint', ''))
+        kind = event['event']
+        with self._lock:
+            counters = self.counters[key]
+            counters[kind] += 1
+            if kind == 'request':
+                self.latency[key].observe(event['latency'])
+                if event.get('pool_wait') is not None:
+                    self.pool_wait[key].observe(event['pool_wait'])
+                self.status[key][event.get('status')] += 1
+                counters['request_bytes'] += event.get('request_bytes') or 0
+                counters['response_bytes'] += event.get('response_bytes') or 0
+
+    def summary(self) -> Dict[str, Dict]:
+        """Return per-endpoint latency percentiles, status codes and counters"""
+        with self._lock:
+            result = {}
+            for (method, endpoint), counters in self.counters.items():
+                key = (method, endpoint)
+                result[f"{method} {endpoint}"] = {
+                    'latency': self.latency[key].summary(),
+                    'pool_wait': self.pool_wait[key].summary(),
+                    'status': dict(self.status[key]),
+                    **counters,
+                }
+            return result
+
+    def print_summary(self):
+        """Print a compact per-endpoint table"""
+        print("\n" + "=" * 78)
+        print(f"{'ENDPOINT':30} {'REQS':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'RETRY':>6} {'TMOUT':>6}")
+        print("=" * 78)
+        for name, stats in sorted(self.summary().items()):
+            latency = stats['latency']
+            print(f"{name[:30]:30} {latency['count']:6} {latency['p50'] * 1000:8.1f} "
+                  f"{latency['p95'] * 1000:8.1f} {latency['p99'] * 1000:8.1f} "
+                  f"{stats.get('retry', 0):6} {stats.get('timeout', 0):6}")
+        print("=" * 78)
+
+
+class JSONLinesSink:
+    """Append every event as one JSON line to a file"""
+
+    def __init__(self, filename: str):
+        self._lock = threading.Lock()
+        self._file = open(filename, 'a', buffering=1)  # Line-buffered
+
+    def emit(self, event: Dict):
+        line = json.dumps(event, default=str) + '\n'
+        with self._lock:
+            self._file.write(line)
+
+    def close(self):
+        self._file.close()
+
+
+class PrometheusSink(MemorySink):
+    """
+    In-memory aggregation exposed in Prometheus text format on a local port
+
+    Metrics are served at http://host:port/metrics from a daemon thread.
+    """
+
+    def __init__(self, port: int = 9108, host: str = '127.0.0.1'):
+        super().__init__()
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                body = sink.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.port = self.server.server_port
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @staticmethod
+    def _labels(method: str, endpoint: str, **extra) -> str:
+        labels = {'method': method, 'endpoint': endpoint, **extra}
+        return ','.join(f'{k}="{v}"' for k, v in labels.items())
+
+    def _render_histogram(self, lines: List[str], name: str, histograms):
+        lines.append(f"# TYPE {name} histogram")
+        for (method, endpoint), hist in histograms.items():
+            cumulative = 0
+            for bound, n in zip(hist.buckets, hist.counts):
+                cumulative += n
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{name}_bucket{{{self._labels(method, endpoint, le=le)}}} {cumulative}")
+            lines.append(f"{name}_sum{{{self._labels(method, endpoint)}}} {hist.total}")
+            lines.append(f"{name}_count{{{self._labels(method, endpoint)}}} {hist.count}")
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            self._render_histogram(lines, 'api_request_duration_seconds', self.latency)
+            self._render_histogram(lines, 'api_pool_wait_seconds', self.pool_wait)
+
+            lines.append("# TYPE api_responses_total counter")
+            for (method, endpoint), codes in self.status.items():
+                for code, n in codes.items():
+                    lines.append(f"api_responses_total{{{self._labels(method, endpoint, code=code)}}} {n}")
+
+            for counter in ('retry', 'timeout', 'error', 'request_bytes', 'response_bytes'):
+                lines.append(f"# TYPE api_{counter}_total counter")
+                for (method, endpoint), counters in self.counters.items():
+                    lines.append(f"api_{counter}_total{{{self._labels(method, endpoint)}}} {counters[counter]}")
+        return '\n'.join(lines) + '\n'
+
+    def close(self):
+        self.server.shutdown()
+
+
+class Instrumentation:
+    """
+    Fan structured events out to sinks
+
+    With no sinks attached, emit() returns immediately, so instrumented
+    code pays only for one attribute check per event.
+    """
+
+    def __init__(self, sinks: Optional[List] = None):
+        self.sinks = list(sinks or [])
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        return sink
+
+    def emit(self, event: str, **fields):
+        """Send one event (e.g. 'request', 'retry', 'timeout', 'error') to every sink"""
+        if not self.sinks:
+            return
+        fields['event'] = event
+        fields['ts'] = time.time()
+        for sink in self.sinks:
+            sink.emit(fields)
+
+
+# Benchmark: per-event overhead with and without sinks
+if __name__ == "__main__":
+    n_events = 200_000
+
+    def bench(label, instrumentation):
+        start = time.perf_counter()
+        for i in range(n_events):
+            instrumentation.emit('request', method='GET', endpoint='/users/{id}', status=200,
+                                 latency=0.012, pool_wait=0.0001,
+                                 request_bytes=0, response_bytes=512)
+        elapsed = time.perf_counter() - start
+        print(f"{label:20} {elapsed / n_events * 1e6:7.2f} µs/event")
+
+    print(f"Instrumentation overhead ({n_events} events)")
+    print("=" * 40)
+    bench("no sinks", Instrumentation())
+    memory = MemorySink()
+    bench("MemorySink", Instrumentation([memory]))
+    memory.print_summary()
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+job_runner.py - Run the automation scripts on a schedule in a warm process pool
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import multiprocessing
+import os
+import resource
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+HANG_GRACE = 30  # Seconds past a job's timeout before the pool is considered stuck
+
+# Modules imported by every worker before the first job
+DEFAULT_PRELOAD = ['pandas', 'numpy', 'requests', 'http_transport']
+
+JOB_DEFAULTS = {
+    'entry': 'main',
+    'args': [],
+    'interval': 3600,
+    'timeout': 300,
+    'max_memory_mb': None,
+    'max_cpu_seconds': None,
+}
+
+
+# Both derive from BaseException, like KeyboardInterrupt, so a job's own
+# broad 'except Exception' handlers can't swallow them
+class JobTimeout(BaseException):
+    """Raised inside a worker when a job exceeds its wall-clock timeout"""
+
+
+class JobCPULimit(BaseException):
+    """Raised inside a worker when a job exceeds its CPU time limit"""
+
+
+def load_spec(filename):
+    """
+    Read a job spec file
+
+    Format:
+        {"preload": ["pandas", ...],
+         "jobs": [{"name": "expenses", "module": "expense_analyzer_robust",
+                   "entry": "main", "args": ["data/expenses.csv"],
+                   "interval": 3600, "timeout": 60,
+                   "max_memory_mb": 512, "max_cpu_seconds": 30}]}
+
+    Returns:
+        (jobs, preload) with defaults filled in
+    """
+    with open(filename, 'r') as f:
+        spec = json.load(f)
+
+    jobs = []
+    for job in spec['jobs']:
+        missing = [key for key in ('name', 'module') if key not in job]
+        if missing:
+            raise ValueError(f"Job {job} is missing: {', '.join(missing)}")
+        jobs.append({**JOB_DEFAULTS, **job})
+
+    names = [job['name'] for job in jobs]
+    if len(names) != len(set(names)):
+        raise ValueError("Job names must be unique")
+
+    preload = spec.get('preload', DEFAULT_PRELOAD) + [job['module'] for job in jobs]
+    return jobs, list(dict.fromkeys(preload))
+
+
+# --- Worker side -------------------------------------------------------------
+
+def _raise_timeout(signum, frame):
+    raise JobTimeout()
+
+
+def _raise_cpu_limit(signum, frame):
+    raise JobCPULimit()
+
+
+def _init_worker(preload, pids=None):
+    """
+    Import modules and open the shared HTTP session once per worker
+
+    The worker's PID is reported on pids so the scheduler can kill it if
+    it gets stuck.
+    """
+    if pids is not None:
+        pids.put(os.getpid())
+    if SRC_DIR not in sys.path:
+        sys.path.insert(0, SRC_DIR)
+    signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.signal(signal.SIGXCPU, _raise_cpu_limit)
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"⚠️  Warning: Could not preload {name}: {e}", file=sys.stderr)
+    if 'http_transport' in sys.modules:
+        sys.modules['http_transport'].get_transport()
+
+
+def _reset_module_state():
+    """
+    Undo process-wide state a job may have left in the warm worker
+
+    The analyzers' --profile/--memory flags enable the shared profiler and
+    memory tracker (and tracemalloc), and weather_api caches a service
+    configured from the job's arguments. Each job starts from the state a
+    fresh interpreter would have.
+    """
+    memory_profile = sys.modules.get('memory_profile')
+    if memory_profile is not None:
+        memory_profile.memory.disable()
+        memory_profile.memory.reset()
+    profiling = sys.modules.get('profiling')
+    if profiling is not None:
+        profiling.profiler.reset()
+        profiling.profiler.disable()
+        if os.getenv('PROFILE') == '1':
+            profiling.profiler.enable()
+    weather_api = sys.modules.get('weather_api')
+    if weather_api is not None:
+        weather_api._service = None
+
+
+def _address_space():
+    """Current virtual memory size of this process in bytes"""
+    with open('/proc/self/statm', 'r') as f:
+        return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+
+
+@contextlib.contextmanager
+def _limits(job):
+    """
+    Apply a job's soft limits for its duration, restoring them afterwards
+
+    Both limits are relative to the warm worker: max_memory_mb is address
+    space on top of what the preloaded modules already use, and
+    max_cpu_seconds is CPU time on top of what the worker has used so far.
+    """
+    saved = {}
+    try:
+        if job['max_memory_mb']:
+            saved[resource.RLIMIT_AS] = resource.getrlimit(resource.RLIMIT_AS)
+            soft = _address_space() + job['max_memory_mb'] * 1024 * 1024
+            hard = saved[resource.RLIMIT_AS][1]
+            resource.setrlimit(resource.RLIMIT_AS, (soft if hard == resource.RLIM_INFINITY else min(soft, hard), hard))
+        if job['max_cpu_seconds']:
+            saved[resource.RLIMIT_CPU] = resource.getrlimit(resource.RLIMIT_CPU)
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            soft = int(usage.ru_utime + usage.ru_stime) + 1 + int(job['max_cpu_seconds'])
+            hard = saved[resource.RLIMIT_CPU][1]
+            resource.setrlimit(resource.RLIMIT_CPU, (soft if hard == resource.RLIM_INFINITY else min(soft, hard), hard))
+        if job['timeout']:
+            signal.setitimer(signal.ITIMER_REAL, job['timeout'])
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        for limit, value in saved.items():
+            resource.setrlimit(limit, value)
+
+
+def _run_job(job, log_dir):
+    """Run one job in a worker and describe how it went"""
+    result = {'job': job['name'], 'started': datetime.now().isoformat(timespec='seconds'),
+              'pid': os.getpid()}
+    saved_argv = sys.argv
+    sys.argv = [f"{job['module']}.py"] + [str(arg) for arg in job['args']]
+    log_path = Path(log_dir) / f"{job['name']}.log"
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+
+    try:
+        with open(log_path, 'a') as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            print(f"--- {result['started']} {' '.join(sys.argv)}")
+            try:
+                with _limits(job):
+                    entry = getattr(importlib.import_module(job['module']), job['entry'])
+                    code = entry()
+            except SystemExit as e:
+                code = e.code
+            code = 0 if code is None else code
+            result['outcome'] = 'ok' if code == 0 else 'failed'
+            result['exit_code'] = code
+    except JobTimeout:
+        result['outcome'] = 'timeout'
+    except JobCPULimit:
+        result['outcome'] = 'cpu_limit'
+    except MemoryError:
+        result['outcome'] = 'memory_limit'
+    except Exception as e:
+        result['outcome'] = 'error'
+        result['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        sys.argv = saved_argv
+        _reset_module_state()
+
+    result['duration'] = round(time.perf_counter() - start_wall, 4)
+    result['cpu_seconds'] = round(time.process_time() - start_cpu, 4)
+    return result
+
+
+# --- Scheduler side ----------------------------------------------------------
+
+class JobRunner:
+    """
+    Runs due jobs concurrently in a pool of warm worker processes
+
+    Workers import the job modules and open the shared HTTP session once,
+    so each run skips interpreter startup and import costs.
+    """
+
+    def __init__(self, spec_file, workers=None, log_file='data/job_runs.jsonl',
+                 log_dir='data/job_logs'):
+        """
+        Args:
+            spec_file: JSON job spec (see load_spec)
+            workers: Worker processes (default: one per job; most jobs wait on I/O)
+            log_file: JSON Lines file receiving one record per job run
+            log_dir: Directory for each job's captured output
+        """
+        self.jobs, self.preload = load_spec(spec_file)
+        self.workers = workers or len(self.jobs)
+        self.log_file = log_file
+        self.log_dir = log_dir
+        self.next_run = {job['name']: 0.0 for job in self.jobs}
+        self.pool = None
+        self.worker_pids = None  # Queue the workers report their PIDs on
+        Path(log_dir).mkdir(parents=True, exist_ok=True)
+
+    def _pool(self):
+        if self.pool is None:
+            self.worker_pids = multiprocessing.SimpleQueue()
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(self.preload, self.worker_pids))
+        return self.pool
+
+    def _reset_pool(self):
+        """Kill the workers (e.g. one is stuck in C code) and start fresh next cycle"""
+        if self.pool is not None:
+            pids = set()
+            while not self.worker_pids.empty():
+                pids.add(self.worker_pids.get())
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            for pid in pids:
+                with contextlib.suppress(ProcessLookupError):
+                    os.kill(pid, signal.SIGKILL)
+            self.worker_pids.close()
+            self.pool = self.worker_pids = None
+
+    def _record(self, result):
+        with open(self.log_file, 'a') as f:
+            f.write(json.dumps(result) + '\n')
+
+    def due(self, now=None):
+        """Jobs whose next run time has passed"""
+        now = time.time() if now is None else now
+        return [job for job in self.jobs if self.next_run[job['name']] <= now]
+
+    def run_cycle(self, jobs=None):
+        """
+        Run jobs (default: all due jobs) concurrently and wait for them
+
+        Returns:
+            List of per-job result dictionaries
+        """
+        jobs = self.due() if jobs is None else jobs
+        if not jobs:
+            return []
+
+        pool = self._pool()
+        started = time.time()
+        futures = {pool.submit(_run_job, job, self.log_dir): job for job in jobs}
+        deadline = max((job['timeout'] or 0) for job in jobs) + HANG_GRACE
+        done, pending = wait(futures, timeout=deadline if all(job['timeout'] for job in jobs) else None)
+
+        results = []
+        for future, job in futures.items():
+            self.next_run[job['name']] = started + job['interval']
+            if future in pending:
+                result = {'job': job['name'], 'outcome': 'hung'}
+            else:
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    result = {'job': job['name'], 'outcome': 'crashed'}
+            self._record(result)
+            results.append(result)
+
+        if pending or any(r['outcome'] == 'crashed' for r in results):
+            self._reset_pool()
+        return results
+
+    def run_forever(self):
+        """Run due jobs, then sleep until the next one is due"""
+        try:
+            while True:
+                for result in self.run_cycle():
+                    print_result(result)
+                time.sleep(max(0.0, min(self.next_run.values()) - time.time()))
+        except KeyboardInterrupt:
+            print("\nStopping job runner")
+        finally:
+            self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.worker_pids.close()
+            self.pool = self.worker_pids = None
+
+
+def print_result(result):
+    """Print one job outcome"""
+    icon = '✅' if result['outcome'] == 'ok' else '❌'
+    timing = (f"{result['duration']:7.2f}s wall {result['cpu_seconds']:7.2f}s cpu"
+              if 'duration' in result else '')
+    error = f"  {result['error']}" if 'error' in result else ''
+    print(f"{icon} {result['job']:20} {result['outcome']:12} {timing}{error}")
+
+
+def compare_cold(spec_file, cycles=3):
+    """
+    Compare CPU time per cycle: one fresh interpreter per job vs the warm pool
+
+    Returns:
+        (cold CPU seconds per cycle, warm CPU seconds per cycle)
+    """
+    import subprocess
+
+    jobs, _ = load_spec(spec_file)
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    for _ in range(cycles):
+        processes = [
+            subprocess.Popen([sys.executable, os.path.join(SRC_DIR, f"{job['module']}.py")]
+                             + [str(arg) for arg in job['args']],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            for job in jobs
+        ]
+        for process in processes:
+            process.wait()
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cold = (after.ru_utime + after.ru_stime - before.ru_utime - before.ru_stime) / cycles
+
+    runner = JobRunner(spec_file)
+    try:
+        runner.run_cycle(runner.jobs)  # Warm-up: starts workers and preloads modules
+        warm = sum(sum(r.get('cpu_seconds', 0) for r in runner.run_cycle(runner.jobs))
+                   for _ in range(cycles)) / cycles
+    finally:
+        runner.close()
+    return cold, warm
+
+
+def main(argv=None):
+    """Main function with command-line argument handling"""
+    parser = argparse.ArgumentParser(description="Run automation jobs in a warm process pool")
+    parser.add_argument('spec', nargs='?', default='data/jobs.json', help="Job spec JSON file")
+    parser.add_argument('--once', action='store_true', help="Run every job once and exit")
+    parser.add_argument('--workers', type=int, help="Worker processes")
+    parser.add_argument('--compare', action='store_true',
+                        help="Compare CPU time per cycle against one process per job")
+    args = parser.parse_args(argv)
+
+    if not Path(args.spec).is_file():
+        print(f"❌ Error: Job spec '{args.spec}' not found")
+        return 1
+
+    if args.compare:
+        cold, warm = compare_cold(args.spec)
+        print(f"CPU per cycle, one process per job: {cold:.2f}s")
+        print(f"CPU per cycle, warm pool:           {warm:.2f}s ({(1 - warm / cold) * 100:.0f}% less)")
+        return 0
+
+    runner = JobRunner(args.spec, workers=args.workers)
+    if args.once:
+        try:
+            results = runner.run_cycle(runner.jobs)
+        finally:
+            runner.close()
+        for result in results:
+            print_result(result)
+        return 0 if all(r['outcome'] == 'ok' for r in results) else 1
+
+    runner.run_forever()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
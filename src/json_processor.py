@@ -3,9 +3,41 @@
 json_processor.py - Work with JSON data
 """
 
+import argparse
 import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+import json_stream
+
+try:
+    import orjson  # Optional fast JSON encoder/decoder
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack  # Optional compact binary format
+except ImportError:
+    msgpack = None
+
+HOURLY_RATE = 30  # € per saved hour
+READ_CHUNK = 1024 * 1024
+WRITE_BUFFER = 1024 * 1024
+
+# Upper bounds (ROI %) of the buckets in the portfolio ROI distribution
+ROI_BUCKETS = (50, 100, 200, 500, float('inf'))
+
+# Batches handed to each worker by portfolio_rollup (more batches balance
+# uneven file sizes, fewer mean fewer partial results to pickle)
+BATCHES_PER_WORKER = 4
+MIN_BATCH_FILES = 16  # Smaller directories are not worth a process pool
+
 # Sample data (like API response)
 client_data = {
     "client_id": "ACME001",
@@ -31,17 +63,390 @@ client_data = {
     }
 }
 
-def save_json(data, filename):
-    """Save data to a JSON file"""
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=2)
+def _dump_fast(data):
+    if orjson is None:
+        return _dump_compact(data)
+    return orjson.dumps(data)
+
+def _dump_compact(data):
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def _dump_msgpack(data):
+    if msgpack is None:
+        raise ImportError("The 'msgpack' format needs: pip install msgpack")
+    return msgpack.packb(data, use_bin_type=True)
+
+# Format name -> function returning the encoded bytes
+SERIALIZERS = {
+    'pretty': lambda data: json.dumps(data, indent=2).encode('utf-8'),
+    'compact': _dump_compact,
+    'fast': _dump_fast,  # orjson when installed, compact JSON otherwise
+    'msgpack': _dump_msgpack,
+    'pickle': lambda data: pickle.dumps(data, protocol=5),
+}
+
+def save_json(data, filename, format='pretty'):
+    """
+    Save data to a file atomically
+
+    Args:
+        data: JSON-compatible data
+        filename: Destination path
+        format: One of SERIALIZERS: 'pretty' (human-readable JSON, the
+            default), 'compact', 'fast', 'msgpack' or 'pickle' (internal
+            use only)
+
+    The data is written to a temporary file in the same directory and
+    renamed over the destination, so readers never see a truncated file.
+    """
+    if format not in SERIALIZERS:
+        raise ValueError(f"Unknown format '{format}'. Available: {', '.join(SERIALIZERS)}")
+    payload = SERIALIZERS[format](data)
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(filename)}.", suffix='.tmp')
+    try:
+        with open(fd, 'wb', buffering=WRITE_BUFFER) as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600 files; keep the permissions a plain open() would give
+        mode = os.stat(filename).st_mode & 0o777 if os.path.exists(filename) else 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
     print(f"Data saved to {filename}")
 
-def load_json(filename):
-    """Load data from a JSON file"""
-    with open(filename, 'r') as f:
-        data = json.load(f)
-    return data
+# File extensions that name a format outright (anything else is sniffed)
+FORMAT_EXTENSIONS = {
+    '.json': 'json',
+    '.msgpack': 'msgpack',
+    '.mpk': 'msgpack',
+    '.pickle': 'pickle',
+    '.pkl': 'pickle',
+}
+
+def detect_format(payload, filename=None):
+    """
+    Guess the serialization format of file contents
+
+    A known extension (FORMAT_EXTENSIONS) decides; otherwise the leading
+    bytes are checked, which only recognizes MessagePack maps and arrays.
+    """
+    if filename is not None:
+        extension = os.path.splitext(str(filename))[1].lower()
+        if extension in FORMAT_EXTENSIONS:
+            return FORMAT_EXTENSIONS[extension]
+    if payload[:1] == b'\x80' and len(payload) > 1 and 2 <= payload[1] <= 5:
+        return 'pickle'  # PROTO opcode + protocol version
+    if payload[:1] and (0x80 <= payload[0] <= 0x9f or 0xdc <= payload[0] <= 0xdf):
+        return 'msgpack'  # Map or array header
+    return 'json'
+
+def load_json(filename, allow_pickle=False):
+    """
+    Load data from a file written by save_json (format detected from
+    the extension or the contents)
+
+    Args:
+        filename: Path to a JSON, MessagePack or pickle file
+        allow_pickle: Pickle can execute code on load; only enable it
+            for files this system wrote itself
+    """
+    with open(filename, 'rb', buffering=WRITE_BUFFER) as f:
+        payload = f.read()
+
+    file_format = detect_format(payload, filename)
+    if file_format == 'pickle':
+        if not allow_pickle:
+            raise ValueError(f"'{filename}' is a pickle file; pass allow_pickle=True to load it")
+        return pickle.loads(payload)
+    if file_format == 'msgpack':
+        if msgpack is None:
+            raise ImportError("Reading MessagePack files needs: pip install msgpack")
+        return msgpack.unpackb(payload, raw=False)
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+def benchmark_formats(data, repeat=5):
+    """Compare size and encode/decode speed of every available format"""
+    print("\n" + "=" * 60)
+    print(f"{'FORMAT':10} {'SIZE':>12} {'ENCODE ms':>12} {'DECODE ms':>12}")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in SERIALIZERS:
+            if name == 'msgpack' and msgpack is None:
+                print(f"{name:10} {'(not installed)':>12}")
+                continue
+            if name == 'fast' and orjson is None:
+                print(f"{name:10} {'(orjson not installed, same as compact)':>12}")
+                continue
+            path = os.path.join(tmp, f"data.{name}")
+            encode = decode = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                payload = SERIALIZERS[name](data)
+                encode = min(encode, time.perf_counter() - start)
+            with open(path, 'wb') as f:
+                f.write(payload)
+            for _ in range(repeat):
+                start = time.perf_counter()
+                load_json(path, allow_pickle=True)
+                decode = min(decode, time.perf_counter() - start)
+            print(f"{name:10} {len(payload):12,} {encode * 1000:12.1f} {decode * 1000:12.1f}")
+    print("=" * 60)
+
+def _read_chunks(f, size=READ_CHUNK):
+    """Yield fixed-size chunks from an open file"""
+    while True:
+        chunk = f.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+def iter_clients(filename, fast=True):
+    """
+    Yield client records one at a time without loading the whole file
+
+    Supports JSON Lines (one client per line), a top-level JSON array of
+    clients, and a single client object. Uses orjson/ijson when installed
+    and fast is True.
+    """
+    loads = orjson.loads if fast and orjson is not None else json.loads
+
+    with open(filename, 'r', encoding='utf-8') as f:
+        # Skip leading blank lines, then dispatch on the first non-blank one
+        for first_line in f:
+            if first_line.strip():
+                break
+        else:
+            return
+
+        if first_line.lstrip().startswith('['):
+            if fast and json_stream.ijson is not None:
+                with open(filename, 'rb') as raw:
+                    yield from json_stream.iter_array_items_binary(raw)
+                return
+            f.seek(0)
+            yield from json_stream.iter_array_items(_read_chunks(f))
+            return
+
+        try:
+            first = loads(first_line)
+        except ValueError:
+            # Pretty-printed single object spanning several lines
+            f.seek(0)
+            yield json.load(f)
+            return
+
+        yield first
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
+def summarize_client(data):
+    """Compute budget, hours saved, annual value and ROI for one client"""
+    total_budget = sum(p['budget'] for p in data['projects'])
+    total_hours_saved = sum(p['hours_saved_weekly'] for p in data['projects'])
+    annual_value = total_hours_saved * 52 * HOURLY_RATE
+    return {
+        'total_budget': total_budget,
+        'total_hours_saved': total_hours_saved,
+        'annual_value': annual_value,
+        'roi': annual_value / total_budget * 100 if total_budget else None,
+    }
+
+def _roi_bucket(roi):
+    """Label of the ROI distribution bucket for one client"""
+    if roi is None:
+        return 'n/a'
+    lower = 0
+    for upper in ROI_BUCKETS:
+        if roi < upper:
+            break
+        lower = upper
+    return f"{lower}%+" if upper == float('inf') else f"{lower}-{upper}%"
+
+class ROIAccumulator:
+    """Incrementally aggregate ROI figures over a stream of clients"""
+
+    def __init__(self):
+        self.clients = 0
+        self.projects = 0
+        self.total_budget = 0
+        self.total_hours_saved = 0
+        self.roi_distribution = defaultdict(int)
+        self.status_projects = defaultdict(int)
+        self.status_budget = defaultdict(int)
+        self.errors = []
+
+    def add(self, data):
+        """
+        Fold one client record into the running totals
+
+        The record is fully validated first, so a malformed one raises
+        without changing any total.
+        """
+        summary = summarize_client(data)
+        status_projects = defaultdict(int)
+        status_budget = defaultdict(int)
+        for project in data['projects']:
+            status_projects[project['status']] += 1
+            status_budget[project['status']] += project['budget']
+        bucket = _roi_bucket(summary['roi'])
+
+        self.clients += 1
+        self.projects += len(data['projects'])
+        self.total_budget += summary['total_budget']
+        self.total_hours_saved += summary['total_hours_saved']
+        self.roi_distribution[bucket] += 1
+        for status, count in status_projects.items():
+            self.status_projects[status] += count
+            self.status_budget[status] += status_budget[status]
+        return summary
+
+    def merge(self, other):
+        """Combine another accumulator's partial totals into this one"""
+        self.clients += other.clients
+        self.projects += other.projects
+        self.total_budget += other.total_budget
+        self.total_hours_saved += other.total_hours_saved
+        for target, source in ((self.roi_distribution, other.roi_distribution),
+                               (self.status_projects, other.status_projects),
+                               (self.status_budget, other.status_budget)):
+            for key, value in source.items():
+                target[key] += value
+        self.errors.extend(other.errors)
+        return self
+
+    def summary(self):
+        annual_value = self.total_hours_saved * 52 * HOURLY_RATE
+        return {
+            'clients': self.clients,
+            'projects': self.projects,
+            'total_budget': self.total_budget,
+            'total_hours_saved': self.total_hours_saved,
+            'annual_value': annual_value,
+            'roi': annual_value / self.total_budget * 100 if self.total_budget else None,
+            'roi_distribution': dict(self.roi_distribution),
+            'status': {
+                status: {'projects': count, 'budget': self.status_budget[status]}
+                for status, count in self.status_projects.items()
+            },
+            'errors': list(self.errors),
+        }
+
+def analyze_client_stream(filename, fast=True):
+    """Aggregate ROI over every client in a (possibly huge) file in constant memory"""
+    accumulator = ROIAccumulator()
+    for client in iter_clients(filename, fast=fast):
+        accumulator.add(client)
+    return accumulator.summary()
+
+def print_stream_summary(summary, filename):
+    """Print aggregate ROI figures for a client file"""
+    print("\n" + "=" * 50)
+    print(f"CLIENTS SUMMARY: {filename}")
+    print("=" * 50)
+    print(f"Clients: {summary['clients']:,} ({summary['projects']:,} projects)")
+    print(f"Total Investment: €{summary['total_budget']:,}")
+    print(f"Weekly Hours Saved: {summary['total_hours_saved']:,} hours")
+    print(f"Annual Value: €{summary['annual_value']:,}")
+    if summary['roi'] is not None:
+        print(f"ROI: {summary['roi']:.1f}%")
+    print("=" * 50)
+
+def _rollup_files(filenames):
+    """
+    Aggregate a batch of client files (runs in a worker process)
+
+    Each file is folded into its own accumulator and merged only once it
+    has been read completely, so a file that fails partway contributes
+    nothing but its error.
+    """
+    accumulator = ROIAccumulator()
+    for filename in filenames:
+        partial = ROIAccumulator()
+        try:
+            for client in iter_clients(filename):
+                partial.add(client)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            accumulator.errors.append(f"{filename}: {e}")
+        else:
+            accumulator.merge(partial)
+    return accumulator
+
+def _batch_size(file_count, workers):
+    """Files per batch giving each worker a few batches to balance uneven files"""
+    return max(MIN_BATCH_FILES, -(-file_count // (workers * BATCHES_PER_WORKER)))
+
+def portfolio_rollup(directory, workers=None, batch_size=None, suffixes=('.json', '.jsonl')):
+    """
+    Aggregate every client file in a directory using a process pool
+
+    Files are handed to workers in batches; each worker returns one
+    partial ROIAccumulator and the partials are merged here, so no
+    per-client data crosses process boundaries. batch_size defaults to
+    an even split giving each worker BATCHES_PER_WORKER batches of at
+    least MIN_BATCH_FILES files.
+
+    Returns:
+        Portfolio summary dictionary (see ROIAccumulator.summary)
+    """
+    filenames = sorted(
+        entry.path for entry in os.scandir(directory)
+        if entry.is_file() and entry.name.endswith(suffixes)
+    )
+    workers = workers or os.cpu_count() or 1
+    batch_size = batch_size or _batch_size(len(filenames), workers)
+    batches = [filenames[i:i + batch_size] for i in range(0, len(filenames), batch_size)]
+
+    total = ROIAccumulator()
+    if workers == 1 or len(batches) <= 1:
+        for batch in batches:
+            total.merge(_rollup_files(batch))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for partial in pool.map(_rollup_files, batches):
+                total.merge(partial)
+
+    summary = total.summary()
+    summary['files'] = len(filenames)
+    return summary
+
+def print_portfolio_summary(summary, directory):
+    """Print portfolio totals, ROI distribution and status breakdown"""
+    print("\n" + "=" * 50)
+    print(f"PORTFOLIO REPORT: {directory}")
+    print("=" * 50)
+    print(f"Files: {summary['files']:,}  Clients: {summary['clients']:,}  "
+          f"Projects: {summary['projects']:,}")
+    print(f"\nTotal Investment: €{summary['total_budget']:,}")
+    print(f"Weekly Hours Saved: {summary['total_hours_saved']:,} hours")
+    print(f"Annual Value: €{summary['annual_value']:,}")
+    if summary['roi'] is not None:
+        print(f"Portfolio ROI: {summary['roi']:.1f}%")
+
+    print("\nClient ROI Distribution:")
+    labels = [_roi_bucket(lower) for lower in (0,) + ROI_BUCKETS[:-1]] + ['n/a']
+    for label in labels:
+        count = summary['roi_distribution'].get(label, 0)
+        if count:
+            share = count / summary['clients'] * 100
+            print(f"  {label:10} {count:8,} clients ({share:5.1f}%)")
+
+    print("\nProjects by Status:")
+    for status, row in sorted(summary['status'].items(), key=lambda x: x[1]['projects'], reverse=True):
+        print(f"  {status:12} {row['projects']:8,} projects  €{row['budget']:,}")
+
+    if summary['errors']:
+        print(f"\n⚠️  {len(summary['errors'])} files could not be read:")
+        for error in summary['errors'][:5]:
+            print(f"   {error}")
+    print("=" * 50)
 
 def analyze_client_data(data):
     """Analyze client project data"""
@@ -49,14 +454,16 @@ def analyze_client_data(data):
     print(f"CLIENT REPORT: {data['name']}")
     print("=" * 50)
 
-    total_budget = sum(p['budget'] for p in data['projects'])
-    total_hours_saved = sum(p['hours_saved_weekly'] for p in data['projects'])
-    annual_value = total_hours_saved * 52 * 30  # Assuming €30/hour
+    summary = summarize_client(data)
+    total_budget = summary['total_budget']
+    total_hours_saved = summary['total_hours_saved']
+    annual_value = summary['annual_value']
 
     print(f"\nTotal Investment: €{total_budget:,}")
     print(f"Weekly Hours Saved: {total_hours_saved} hours")
     print(f"Annual Value: €{annual_value:,}")
-    print(f"ROI: {(annual_value / total_budget * 100):.1f}%")
+    if summary['roi'] is not None:
+        print(f"ROI: {summary['roi']:.1f}%")
 
     print("\nProjects:")
     for project in data['projects']:
@@ -69,8 +476,40 @@ def analyze_client_data(data):
     print(f" Email: {data['contact']['email']}")
     print("=" * 50)
 
-# Main execution
-if __name__ == "__main__":
+def main():
+    """Main function with command-line argument handling"""
+    parser = argparse.ArgumentParser(description="Client JSON processing")
+    subparsers = parser.add_subparsers(dest='command')
+    stream = subparsers.add_parser('stream', help="Aggregate a JSON Lines / JSON array client file")
+    stream.add_argument('filename')
+    stream.add_argument('--no-fast', action='store_true', help="Use only the standard json module")
+    portfolio = subparsers.add_parser('portfolio', help="Roll up a directory of client files")
+    portfolio.add_argument('directory')
+    portfolio.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    benchmark = subparsers.add_parser('benchmark', help="Compare serialization formats")
+    benchmark.add_argument('filename', nargs='?', help="Data file to benchmark (default: synthetic clients)")
+    args = parser.parse_args()
+
+    if args.command == 'benchmark':
+        if args.filename:
+            data = load_json(args.filename)
+        else:
+            # Independent copies, so pickle can't shrink the output by memoizing shared objects
+            template = json.dumps(client_data)
+            data = [dict(json.loads(template), client_id=f"C{i:05d}") for i in range(20000)]
+        benchmark_formats(data)
+        return 0
+
+    if args.command == 'portfolio':
+        summary = portfolio_rollup(args.directory, workers=args.workers)
+        print_portfolio_summary(summary, args.directory)
+        return 0
+
+    if args.command == 'stream':
+        summary = analyze_client_stream(args.filename, fast=not args.no_fast)
+        print_stream_summary(summary, args.filename)
+        return 0
+
     # Save sample data to JSON
     save_json(client_data, 'data/client_acme.json')
 
@@ -78,4 +517,9 @@ if __name__ == "__main__":
     loaded_data = load_json('data/client_acme.json')
 
     # Analyze loaded data
-    analyze_client_data(loaded_data)
\ No newline at end of file
+    analyze_client_data(loaded_data)
+    return 0
+
+# Main execution
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+json_stream.py - Decode JSON array elements incrementally from text chunks
+"""
+
+import json
+from typing import Iterable, Iterator, List
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = '0123456789+-.eE'
+
+try:
+    import ijson  # Optional fast streaming backend (C yajl2 when available)
+except ImportError:
+    ijson = None
+
+
+class _ChunkBuffer:
+    """Text buffer refilled from an iterator of chunks, compacted as it is consumed"""
+
+    def __init__(self, chunks: Iterable[str]):
+        self.chunks = iter(chunks)
+        self.text = ''
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self) -> bool:
+        """Append the next chunk; returns False when the input is exhausted"""
+        for chunk in self.chunks:
+            if chunk:
+                # Drop consumed text so the buffer stays bounded by one value
+                self.text = self.text[self.pos:] + chunk
+                self.pos = 0
+                return True
+        self.exhausted = True
+        return False
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at EOF)"""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str):
+        """Consume one expected structural character"""
+        found = self.peek()
+        if found != char:
+            raise json.JSONDecodeError(f"Expected '{char}'", self.text, self.pos)
+        self.pos += 1
+
+    def decode(self, decoder: json.JSONDecoder):
+        """Decode one complete JSON value, reading more chunks as needed"""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                # Probably truncated mid-value: read more and retry
+                if not self.fill():
+                    raise
+                continue
+            # Numbers and literals may continue into the next chunk; a number
+            # cut inside its fraction or exponent ('6.' + '5e3') decodes
+            # early, leaving only number characters up to the buffer's end
+            tail = end
+            while tail < len(self.text) and self.text[tail] in _NUMBER_CHARS:
+                tail += 1
+            if tail == len(self.text) and not self.exhausted and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _split_path(path: str) -> List[str]:
+    return [key for key in path.split('.') if key] if path else []
+
+
+def _seek_path(buf: _ChunkBuffer, keys: List[str], decoder: json.JSONDecoder):
+    """Advance the buffer to the opening '[' of the array at the dotted key path"""
+    for key in keys:
+        buf.expect('{')
+        while True:
+            if buf.peek() == '}':
+                raise KeyError(f"Key '{key}' not found in JSON object")
+            name = buf.decode(decoder)
+            buf.expect(':')
+            if name == key:
+                break
+            buf.decode(decoder)  # Skip the value of a non-matching key
+            if buf.peek() == ',':
+                buf.pos += 1
+    buf.expect('[')
+
+
+def iter_array_items(chunks: Iterable[str], path: str = '') -> Iterator:
+    """
+    Yield the elements of a JSON array one at a time
+
+    Args:
+        chunks: Iterable of text chunks making up one JSON document
+        path: Dotted key path to the array (e.g., 'data.items');
+            empty for a top-level array
+
+    Memory stays bounded by one element plus one chunk. Values of keys that
+    precede the target array are decoded and discarded while seeking.
+    """
+    decoder = json.JSONDecoder()
+    buf = _ChunkBuffer(chunks)
+    _seek_path(buf, _split_path(path), decoder)
+
+    if buf.peek() == ']':
+        return
+    while True:
+        yield buf.decode(decoder)
+        separator = buf.peek()
+        buf.pos += 1
+        if separator == ']':
+            return
+        if separator != ',':
+            raise json.JSONDecodeError("Expected ',' or ']'", buf.text, buf.pos - 1)
+
+
+def iter_array_items_binary(stream, path: str = '') -> Iterator:
+    """
+    Yield array elements from a binary file-like object using ijson
+
+    Only available when the optional 'ijson' package is installed.
+    """
+    if ijson is None:
+        raise ImportError("Fast streaming needs: pip install ijson")
+    prefix = '.'.join(_split_path(path) + ['item'])
+    return ijson.items(stream, prefix, use_float=True)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+load_test.py - Drive the API clients against the mock server and report throughput
+"""
+
+import argparse
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from api_client import APIClient
+from github_stats import GitHubAPI
+from http_transport import HTTPTransport
+from mock_server import MockServer
+from weather_api import WeatherService
+
+
+def _api_client(base_url, transport):
+    client = APIClient(base_url, transport=transport)
+
+    def call(i):
+        if client.get(f"/users/user{i}") is None:  # get() logs and returns None on failure
+            raise RuntimeError("GET failed")
+    return call
+
+
+def _github(base_url, transport):
+    api = GitHubAPI(base_url=base_url, transport=transport)
+    return lambda i: api.fetch_user(f"user{i}")
+
+
+def _weather(base_url, transport):
+    # The per-host rate limiter would dominate the numbers, so it is opened wide
+    service = WeatherService(base_url=base_url, transport=transport, rate_per_host=1e6)
+    return lambda i: service.fetch(f"City{i}")
+
+
+# Each call makes exactly one logical request with a unique URL, so nothing
+# is coalesced or cached and extra server requests are retries.
+CLIENTS = {
+    'api': _api_client,
+    'github': _github,
+    'weather': _weather,
+}
+
+
+def percentile(ordered, q):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def server_stats(base_url, reset=False):
+    """Read (or reset) the mock server's request counters"""
+    response = requests.get(f"{base_url}/__reset" if reset else f"{base_url}/__stats", timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+
+def run_load(name, base_url, total=1000, concurrency=16):
+    """
+    Call one client total times from concurrency threads
+
+    Returns:
+        Dictionary with calls, errors, rps and latency percentiles (ms),
+        plus server-side request, retry and status counts
+    """
+    transport = HTTPTransport(pool_maxsize=max(concurrency, 10))
+    call = CLIENTS[name](base_url, transport)
+    server_stats(base_url, reset=True)
+
+    def timed(i):
+        start = time.perf_counter()
+        try:
+            call(i)
+            ok = True
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(timed, range(total)))
+    elapsed = time.perf_counter() - started
+    transport.close()
+
+    stats = server_stats(base_url)
+    latencies = sorted(latency * 1000 for latency, _ in outcomes)
+    return {
+        'client': name,
+        'calls': total,
+        'errors': sum(1 for _, ok in outcomes if not ok),
+        'seconds': elapsed,
+        'rps': total / elapsed,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': latencies[-1] if latencies else 0.0,
+        'server_requests': stats.get('requests', 0),
+        'retries': max(0, stats.get('requests', 0) - total),
+        'status': {k[len('status_'):]: v for k, v in stats.items() if k.startswith('status_')},
+    }
+
+
+def print_results(results, concurrency):
+    """Print one row per client"""
+    print("\n" + "=" * 96)
+    print(f"LOAD TEST (concurrency {concurrency})")
+    print("=" * 96)
+    print(f"{'CLIENT':8} {'CALLS':>6} {'ERRORS':>6} {'RPS':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'MAX ms':>8} {'SERVER REQ':>10} {'RETRIES':>7}  STATUS")
+    for r in results:
+        status = ' '.join(f"{code}:{count}" for code, count in sorted(r['status'].items()))
+        print(f"{r['client']:8} {r['calls']:6} {r['errors']:6} {r['rps']:8.0f} {r['p50_ms']:8.2f} "
+              f"{r['p95_ms']:8.2f} {r['p99_ms']:8.2f} {r['max_ms']:8.2f} {r['server_requests']:10} "
+              f"{r['retries']:7}  {status}")
+    print("=" * 96)
+
+
+def main(argv=None):
+    """Main function with command-line argument handling"""
+    parser = argparse.ArgumentParser(description="Load-test the API clients against the mock server")
+    parser.add_argument('--clients', nargs='+', choices=list(CLIENTS), default=list(CLIENTS))
+    parser.add_argument('--requests', type=int, default=1000, help="Calls per client")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--url', help="Use an already running mock server instead of starting one")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Extra random latency (seconds)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of 503 responses")
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="Fraction of 429 responses")
+    parser.add_argument('--retry-after', type=int, default=1, help="Retry-After seconds on 429")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.CRITICAL)  # Injected failures are expected
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server = MockServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                            rate_limit=args.rate_limit, retry_after=args.retry_after,
+                            seed=args.seed).start()
+        base_url = server.url
+
+    try:
+        results = [run_load(name, base_url, total=args.requests, concurrency=args.concurrency)
+                   for name in args.clients]
+    finally:
+        if server is not None:
+            server.stop()
+    print_results(results, args.concurrency)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
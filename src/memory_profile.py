@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+memory_profile.py - Opt-in per-stage memory accounting (RSS and tracemalloc)
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_NULL_STAGE = nullcontext()
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss():
+    """Resident set size of this process in bytes (None if unavailable)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes (None if unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Linux reports KiB
+
+
+def format_bytes(bytes_value):
+    """Convert bytes to human-readable format"""
+    if bytes_value is None:
+        return 'n/a'
+    sign = '-' if bytes_value < 0 else ''
+    bytes_value = abs(bytes_value)
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if bytes_value < 1024.0:
+            return f"{sign}{bytes_value:.1f} {unit}"
+        bytes_value /= 1024.0
+    return f"{sign}{bytes_value:.1f} TB"
+
+
+class _Stage:
+    """One measured stage; nested stages fold their peak into the parent"""
+
+    def __init__(self, tracker, name):
+        self.tracker = tracker
+        self.name = name
+        self.max_peak = 0
+
+    def __enter__(self):
+        stack = self.tracker._stack
+        if stack:
+            # tracemalloc has one global peak: bank the parent's before resetting it
+            stack[-1].max_peak = max(stack[-1].max_peak, tracemalloc.get_traced_memory()[1])
+        stack.append(self)
+        self.start_traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        self.start_rss = current_rss()
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        traced, peak = tracemalloc.get_traced_memory()
+        self.max_peak = max(self.max_peak, peak)
+        end_rss = current_rss()
+        stack = self.tracker._stack
+        stack.pop()
+        if stack:
+            stack[-1].max_peak = max(stack[-1].max_peak, self.max_peak)
+
+        self.tracker.stages.append({
+            'stage': '/'.join([s.name for s in stack] + [self.name]),
+            'seconds': time.perf_counter() - self.start_time,
+            'alloc_delta': traced - self.start_traced,
+            'alloc_peak': self.max_peak - self.start_traced,
+            'rss_before': self.start_rss,
+            'rss_after': end_rss,
+            'peak_rss': peak_rss(),
+        })
+        return False
+
+
+class MemoryTracker:
+    """
+    Records per-stage tracemalloc deltas, RSS and DataFrame sizes
+
+    Disabled by default: stage() then returns a shared no-op context
+    manager and checkpoint() returns immediately, and tracemalloc is
+    never started.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stages = []
+        self.checkpoints = []
+        self._stack = []
+
+    def enable(self):
+        self.enabled = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        self.enabled = False
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def reset(self):
+        """Forget recorded stages and checkpoints"""
+        self.stages = []
+        self.checkpoints = []
+        self._stack = []
+
+    def stage(self, name):
+        """Context manager measuring memory used by a named stage"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def checkpoint(self, name, df=None):
+        """Record current memory and, optionally, a DataFrame's deep memory usage"""
+        if not self.enabled:
+            return
+        entry = {
+            'checkpoint': name,
+            'traced': tracemalloc.get_traced_memory()[0],
+            'rss': current_rss(),
+        }
+        if df is not None:
+            entry['rows'] = len(df)
+            entry['dataframe_bytes'] = int(df.memory_usage(deep=True).sum())
+        self.checkpoints.append(entry)
+
+    def summary(self):
+        """Return a JSON-serializable summary"""
+        return {
+            'peak_rss': peak_rss(),
+            'stages': list(self.stages),
+            'checkpoints': list(self.checkpoints),
+        }
+
+    def write_json(self, filename):
+        with open(filename, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+        print(f"Memory summary written to {filename}")
+
+    def print_report(self):
+        """Print per-stage and checkpoint tables"""
+        print("\n" + "=" * 78)
+        print(f"{'STAGE':28} {'ALLOC Δ':>11} {'ALLOC PEAK':>11} {'RSS AFTER':>11} {'PEAK RSS':>11}")
+        print("=" * 78)
+        for s in self.stages:
+            print(f"{s['stage'][:28]:28} {format_bytes(s['alloc_delta']):>11} "
+                  f"{format_bytes(s['alloc_peak']):>11} {format_bytes(s['rss_after']):>11} "
+                  f"{format_bytes(s['peak_rss']):>11}")
+        if self.checkpoints:
+            print("-" * 78)
+            for c in self.checkpoints:
+                df_info = (f"  DataFrame {c['rows']:,} rows, {format_bytes(c['dataframe_bytes'])}"
+                           if 'rows' in c else '')
+                print(f"{c['checkpoint'][:28]:28} traced {format_bytes(c['traced']):>11}{df_info}")
+        print("=" * 78)
+
+
+# Process-wide tracker, enabled by the analyzers' --memory flags
+memory = MemoryTracker()
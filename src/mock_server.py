@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+mock_server.py - Local stand-in for the public APIs, with record/replay and fault injection
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+
+def fixture_name(method, path, query=''):
+    """File name for a recorded request: readable slug plus a short hash"""
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', f"{method} {path}").strip('_')[:60]
+    digest = hashlib.sha1(f"{method} {path}?{query}".encode('utf-8')).hexdigest()[:8]
+    return f"{slug}-{digest}.json"
+
+
+# --- Synthetic responses ---------------------------------------------------
+
+def _synthetic_user(name):
+    """A user document satisfying both the GitHub and JSONPlaceholder clients"""
+    number = int(hashlib.md5(name.encode('utf-8')).hexdigest()[:6], 16)
+    return {
+        'id': number % 100000, 'login': name, 'name': f"User {name}",
+        'email': f"{name}@example.com", 'company': {'name': 'Example GmbH'},
+        'bio': 'Automation enthusiast', 'location': 'Innsbruck',
+        'public_repos': number % 40 + 1, 'followers': number % 500, 'following': number % 50,
+        'created_at': '2020-01-01T00:00:00Z',
+    }
+
+
+def _synthetic_repos(name, count):
+    languages = ['Python', 'JavaScript', 'Go', 'Rust', None]
+    return [
+        {'name': f"{name}-repo-{i}", 'full_name': f"{name}/{name}-repo-{i}",
+         'stargazers_count': (i * 7) % 50, 'forks_count': i % 5,
+         'language': languages[i % len(languages)], 'fork': i % 6 == 0,
+         'updated_at': '2025-10-01T00:00:00Z'}
+        for i in range(count)
+    ]
+
+
+def _synthetic_weather(city):
+    temp = 10 + len(city) % 15
+    return {
+        'current_condition': [{
+            'temp_C': str(temp), 'FeelsLikeC': str(temp - 2), 'humidity': '65',
+            'windspeedKmph': '12', 'winddir16Point': 'NW',
+            'weatherDesc': [{'value': 'Partly cloudy'}],
+        }],
+        'weather': [
+            {'date': f"2025-10-{20 + d:02d}", 'mintempC': str(temp - 5), 'maxtempC': str(temp + 4),
+             'hourly': [{'weatherDesc': [{'value': 'Sunny'}]}]}
+            for d in range(3)
+        ],
+    }
+
+
+def synthetic_response(path, query):
+    """
+    Built-in responses for the routes the repo's clients use
+
+    Returns:
+        JSON-serializable body, or None if the route is unknown
+    """
+    params = parse_qs(query)
+    parts = [p for p in path.split('/') if p]
+
+    if parts == ['large']:
+        items = int(params.get('items', ['10000'])[0])
+        return [{'id': i, 'name': f"Item {i}", 'value': i * 1.5, 'tags': ['a', 'b', 'c']}
+                for i in range(items)]
+    if len(parts) == 2 and parts[0] == 'users':
+        return _synthetic_user(parts[1])
+    if len(parts) == 3 and parts[0] == 'users' and parts[2] == 'repos':
+        return _synthetic_repos(parts[1], _synthetic_user(parts[1])['public_repos'])
+    if parts == ['posts']:
+        user_id = int(params.get('userId', ['1'])[0])
+        return [{'id': user_id * 10 + i, 'userId': user_id, 'title': f"Post {i}", 'body': '...'}
+                for i in range(10)]
+    if parts == ['comments']:
+        return [{'id': i, 'postId': i // 5, 'body': f"Comment {i}"} for i in range(500)]
+    if len(parts) == 1 and params.get('format') == ['j1']:
+        return _synthetic_weather(parts[0])
+    return None
+
+
+# --- Server ----------------------------------------------------------------
+
+class MockServer:
+    """
+    Threaded HTTP server replaying fixtures with injectable faults
+
+    Requests are answered from recorded fixtures first, then from the
+    built-in synthetic routes. In record mode, anything else is fetched
+    from the upstream API once and saved as a fixture.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, fixtures_dir=None, record_upstream=None,
+                 latency=0.0, jitter=0.0, error_rate=0.0, error_status=503,
+                 rate_limit=0.0, retry_after=1, seed=None):
+        """
+        Args:
+            host, port: Address to listen on (port 0 picks a free port)
+            fixtures_dir: Directory of recorded fixtures (JSON files)
+            record_upstream: Base URL to proxy and record unknown requests
+                from (needs fixtures_dir to save them in)
+            latency: Seconds added to every response
+            jitter: Extra random latency, uniformly up to this many seconds
+            error_rate: Fraction of requests answered with error_status
+            error_status: Status code for injected errors
+            rate_limit: Fraction of requests answered 429 with Retry-After
+            retry_after: Seconds sent in the Retry-After header
+            seed: Seed for reproducible fault injection
+
+        Raises:
+            ValueError: record_upstream is given without fixtures_dir
+        """
+        if record_upstream and not fixtures_dir:
+            raise ValueError("record_upstream needs a fixtures_dir to save recordings in")
+        self.fixtures_dir = Path(fixtures_dir) if fixtures_dir else None
+        self.record_upstream = record_upstream.rstrip('/') if record_upstream else None
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self.fixtures = {}
+        if self.fixtures_dir and self.fixtures_dir.is_dir():
+            for path in self.fixtures_dir.glob('*.json'):
+                self.fixtures[path.name] = json.loads(path.read_text())
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'   # Keep-alive, like the real APIs
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                server._handle(self, 'GET')
+
+            def do_POST(self):
+                server._handle(self, 'POST')
+
+        return Handler
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _roll(self):
+        with self._lock:
+            return self.random.random()
+
+    def _handle(self, handler, method):
+        parts = urlsplit(handler.path)
+        body = b''
+        if 'Content-Length' in handler.headers:
+            body = handler.rfile.read(int(handler.headers['Content-Length']))
+
+        # Control endpoints are never delayed or faulted
+        if parts.path == '/__stats':
+            with self._lock:
+                snapshot = dict(self.stats)
+            return self._send(handler, 200, snapshot)
+        if parts.path == '/__reset':
+            with self._lock:
+                self.stats.clear()
+            return self._send(handler, 200, {'reset': True})
+
+        self._count('requests')
+        delay = self.latency + (self.jitter * self._roll() if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        roll = self._roll()
+        if roll < self.rate_limit:
+            self._count('status_429')
+            return self._send(handler, 429, {'message': 'API rate limit exceeded'},
+                              {'Retry-After': str(self.retry_after)})
+        if roll < self.rate_limit + self.error_rate:
+            self._count(f'status_{self.error_status}')
+            return self._send(handler, self.error_status, {'message': 'Injected failure'})
+
+        if method == 'POST':
+            return self._handle_post(handler, body)
+
+        fixture = self.fixtures.get(fixture_name(method, parts.path, parts.query))
+        if fixture is None and self.record_upstream:
+            fixture = self._record(method, parts.path, parts.query, handler.headers)
+        if fixture is not None:
+            self._count(f"status_{fixture['status']}")
+            return self._send(handler, fixture['status'], fixture['body'], fixture.get('headers'))
+
+        data = synthetic_response(parts.path, parts.query)
+        if data is None:
+            self._count('status_404')
+            return self._send(handler, 404, {'message': 'Not Found'})
+        self._count('status_200')
+        return self._send(handler, 200, data)
+
+    def _handle_post(self, handler, body):
+        encoding = handler.headers.get('Content-Encoding')
+        if encoding == 'gzip':
+            body = gzip.decompress(body)
+        elif encoding == 'deflate':
+            body = zlib.decompress(body)
+        try:
+            data = json.loads(body or b'null')
+        except ValueError:
+            self._count('status_400')
+            return self._send(handler, 400, {'message': 'Invalid JSON'})
+        self._count('status_201')
+        if isinstance(data, list):
+            return self._send(handler, 201, {'received': len(data)})
+        return self._send(handler, 201, {**(data or {}), 'id': 101})
+
+    def _record(self, method, path, query, headers):
+        """Fetch from upstream once and save the response as a fixture"""
+        import requests
+
+        url = f"{self.record_upstream}{path}" + (f"?{query}" if query else '')
+        forwarded = {k: v for k, v in headers.items() if k.lower() in ('accept', 'authorization', 'user-agent')}
+        response = requests.get(url, headers=forwarded, timeout=30)
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+        fixture = {'method': method, 'path': path, 'query': query, 'status': response.status_code,
+                   'headers': {k: v for k, v in response.headers.items() if k in ('ETag', 'Link')},
+                   'body': body}
+        name = fixture_name(method, path, query)
+        self.fixtures[name] = fixture
+        self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+        (self.fixtures_dir / name).write_text(json.dumps(fixture, indent=2))
+        self._count('recorded')
+        return fixture
+
+    def _send(self, handler, status, data, headers=None):
+        payload = data.encode('utf-8') if isinstance(data, str) else json.dumps(data).encode('utf-8')
+        etag = f'"{hashlib.md5(payload).hexdigest()}"'
+        if status == 200 and handler.headers.get('If-None-Match') == etag:
+            handler.send_response(304)
+            handler.send_header('ETag', etag)
+            handler.send_header('Content-Length', '0')
+            handler.end_headers()
+            return
+
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        if status == 200:
+            handler.send_header('ETag', etag)
+        for name, value in (headers or {}).items():
+            if name != 'ETag':
+                handler.send_header(name, value)
+        if len(payload) > 1024 and 'gzip' in handler.headers.get('Accept-Encoding', ''):
+            payload = gzip.compress(payload, compresslevel=1)
+            handler.send_header('Content-Encoding', 'gzip')
+        handler.send_header('Content-Length', str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def start(self):
+        """Serve in a background thread; returns self"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+
+def main(argv=None):
+    """Main function with command-line argument handling"""
+    parser = argparse.ArgumentParser(description="Local mock for the GitHub, wttr.in and JSONPlaceholder APIs")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--fixtures', default='data/fixtures', help="Recorded fixture directory")
+    parser.add_argument('--record', metavar='UPSTREAM', help="Record unknown requests from this base URL")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Extra random latency (seconds)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of 5xx responses")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="Fraction of 429 responses")
+    parser.add_argument('--retry-after', type=int, default=1, help="Retry-After seconds on 429")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+    if args.record and not args.fixtures:
+        parser.error("--record needs a --fixtures directory")
+
+    server = MockServer(host=args.host, port=args.port, fixtures_dir=args.fixtures,
+                        record_upstream=args.record, latency=args.latency, jitter=args.jitter,
+                        error_rate=args.error_rate, error_status=args.error_status,
+                        rate_limit=args.rate_limit, retry_after=args.retry_after, seed=args.seed)
+    print(f"Mock API listening on {server.url} ({len(server.fixtures)} fixtures)")
+    print(f"  export API_BASE_URL={server.url} GITHUB_API_URL={server.url} WTTR_BASE_URL={server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping mock server")
+    finally:
+        server.httpd.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+profiling.py - Nestable named spans with aggregation and trace export
+"""
+
+import functools
+import json
+import os
+import random
+import threading
+import time
+from contextlib import nullcontext
+
+from context_managers import Timer
+
+MAX_SAMPLES = 10_000        # Per-span reservoir used for percentiles
+MAX_TRACE_EVENTS = 100_000  # Chrome trace events kept in memory
+
+_NULL_SPAN = nullcontext()
+
+
+class SpanStats:
+    """Aggregated timings for one span path"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.first_start_ns = None
+        self.samples = []
+
+    def add(self, start_ns, duration_ns):
+        if self.first_start_ns is None:
+            self.first_start_ns = start_ns
+        self.count += 1
+        self.total_ns += duration_ns
+        self.min_ns = duration_ns if self.min_ns is None else min(self.min_ns, duration_ns)
+        self.max_ns = max(self.max_ns, duration_ns)
+        # Reservoir sampling keeps percentiles unbiased with bounded memory
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(duration_ns)
+        else:
+            slot = random.randrange(self.count)
+            if slot < MAX_SAMPLES:
+                self.samples[slot] = duration_ns
+
+    def percentile(self, q):
+        if not self.samples:
+            return 0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+class Span(Timer):
+    """Timer that reports into a Profiler and tracks its parent span"""
+
+    def __init__(self, profiler, name):
+        super().__init__(name=name, verbose=False)
+        self.profiler = profiler
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        self.path = stack[-1].path + (self.name,) if stack else (self.name,)
+        stack.append(self)
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        super().__exit__(exc_type, exc_val, exc_tb)
+        self.profiler._stack().pop()
+        self.profiler._record(self)
+        return False
+
+
+class Profiler:
+    """
+    Collects nested span timings
+
+    When disabled, span() returns a shared no-op context manager and
+    profiled functions call straight through, so instrumented code pays
+    one attribute check per span.
+    """
+
+    def __init__(self, enabled=False, trace=False):
+        self.enabled = enabled
+        self.trace = trace
+        self.stats = {}
+        self.events = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+
+    def enable(self, trace=False):
+        self.enabled = True
+        self.trace = trace
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+            self.events.clear()
+            self._local = threading.local()  # Drops spans left open by an interrupted run
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, span):
+        with self._lock:
+            stats = self.stats.get(span.path)
+            if stats is None:
+                stats = self.stats[span.path] = SpanStats()
+            stats.add(span.start_ns, span.duration_ns)
+            if self.trace and len(self.events) < MAX_TRACE_EVENTS:
+                self.events.append({
+                    'name': span.name,
+                    'ph': 'X',
+                    'ts': (span.start_ns - self._origin_ns) / 1000,
+                    'dur': span.duration_ns / 1000,
+                    'pid': os.getpid(),
+                    'tid': threading.get_ident(),
+                })
+
+    def span(self, name):
+        """Context manager timing a named stage nested under the current span"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name)
+
+    def profiled(self, name=None):
+        """Decorator timing every call of a function as a span"""
+        def decorator(fn):
+            span_name = name or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with Span(self, span_name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def summary(self):
+        """Return {'a/b': {count, total_ms, mean_ms, min_ms, max_ms, p50_ms, p95_ms, p99_ms}}"""
+        with self._lock:
+            return {
+                '/'.join(path): {
+                    'count': s.count,
+                    'total_ms': s.total_ns / 1e6,
+                    'mean_ms': s.total_ns / s.count / 1e6,
+                    'min_ms': s.min_ns / 1e6,
+                    'max_ms': s.max_ns / 1e6,
+                    'p50_ms': s.percentile(50) / 1e6,
+                    'p95_ms': s.percentile(95) / 1e6,
+                    'p99_ms': s.percentile(99) / 1e6,
+                }
+                for path, s in self.stats.items()
+            }
+
+    def report(self):
+        """Return the span tree as indented text"""
+        with self._lock:
+            stats = dict(self.stats)
+        # Depth-first order, siblings in the order they first ran. A parent
+        # still open when reporting has no stats yet, so fall back to the child's.
+        paths = sorted(stats, key=lambda path: [stats.get(path[:i + 1], stats[path]).first_start_ns
+                                                for i in range(len(path))])
+
+        lines = [f"{'SPAN':36} {'CALLS':>7} {'TOTAL ms':>10} {'MEAN ms':>9} "
+                 f"{'p95 ms':>9} {'MAX ms':>9} {'%PARENT':>8}",
+                 "=" * 94]
+        for path in paths:
+            s = stats[path]
+            parent = stats.get(path[:-1])
+            share = f"{s.total_ns / parent.total_ns * 100:7.1f}%" if parent and parent.total_ns else ''
+            label = '  ' * (len(path) - 1) + path[-1]
+            lines.append(f"{label[:36]:36} {s.count:7} {s.total_ns / 1e6:10.2f} "
+                         f"{s.total_ns / s.count / 1e6:9.3f} {s.percentile(95) / 1e6:9.3f} "
+                         f"{s.max_ns / 1e6:9.3f} {share:>8}")
+        return '\n'.join(lines)
+
+    def print_report(self):
+        print("\n" + self.report())
+
+    def write_chrome_trace(self, filename):
+        """Write recorded spans as Chrome trace-event JSON (chrome://tracing, Perfetto)"""
+        with self._lock:
+            events = list(self.events)
+        with open(filename, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        print(f"Trace written to {filename} ({len(events)} spans)")
+
+
+# Process-wide profiler; enable with PROFILE=1 or profiler.enable()
+profiler = Profiler(enabled=os.getenv('PROFILE') == '1')
+span = profiler.span
+profiled = profiler.profiled
+
+
+# Overhead check: disabled vs enabled spans
+if __name__ == "__main__":
+    n_spans = 200_000
+    demo = Profiler()
+
+    @demo.profiled('work')
+    def work():
+        with demo.span('inner'):
+            pass
+
+    for enabled in (False, True):
+        demo.enabled = enabled
+        start = time.perf_counter()
+        for _ in range(n_spans):
+            with demo.span('outer'):
+                pass
+        elapsed = time.perf_counter() - start
+        print(f"span() {'enabled ' if enabled else 'disabled'}: {elapsed / n_spans * 1e9:7.0f} ns/span")
+
+    demo.reset()
+    demo.enable(trace=True)
+    with demo.span('main'):
+        for _ in range(1000):
+            work()
+    demo.print_report()
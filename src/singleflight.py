@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+singleflight.py - Coalesce concurrent identical calls into one execution
+"""
+
+import threading
+from typing import Callable, Dict, Hashable
+
+
+class _Call:
+    """One in-flight execution that followers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time; concurrent callers with the
+    same key wait for that call and share its result or exception
+
+    Shared results are the same object for every caller, so treat them
+    as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0   # Calls that actually ran
+        self.coalesced = 0  # Calls served by another caller's execution
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """
+        Execute fn(*args, **kwargs) unless a call with the same key is
+        already in flight, in which case wait for and reuse its outcome
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Return executed/coalesced counters"""
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+            }
+
+
+def request_key(method: str, url: str, params=None, headers=None) -> tuple:
+    """Build a hashable key from method, URL, query params and auth header"""
+    if isinstance(params, dict):
+        params = tuple(sorted((str(k), str(v)) for k, v in params.items()))
+    elif params is not None:
+        params = tuple(params)
+    auth = (headers or {}).get('Authorization')
+    return (method.upper(), url, params, auth)
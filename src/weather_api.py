@@ -3,29 +3,161 @@
 weather_api.py - Get weather data from free API
 """
 
+import argparse
 import requests
 import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from urllib.parse import quote, urlsplit
+
+from http_transport import get_transport
+from singleflight import SingleFlight
+
+class RateLimiter:
+    """Token bucket rate limiter, one bucket per host"""
+
+    def __init__(self, rate: float = 10.0, burst: int = 10):
+        """
+        Args:
+            rate: Requests per second allowed per host
+            burst: Requests allowed back to back before throttling
+        """
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets = {}  # host -> (tokens, last refill time)
+
+    def acquire(self, host: str):
+        """Block until a request to host is allowed"""
+        while True:
+            with self._lock:
+                tokens, last = self._buckets.get(host, (self.burst, time.monotonic()))
+                now = time.monotonic()
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+
+class WeatherService:
+    """
+    Fetch each city's wttr.in 'j1' document once and serve current
+    conditions and forecast from the same cached payload
+    """
+
+    def __init__(self, base_url: str = None, ttl: float = 600,
+                 transport=None, rate_per_host: float = 10.0, max_workers: int = 32):
+        """
+        Args:
+            base_url: wttr.in compatible service URL (default: $WTTR_BASE_URL
+                or https://wttr.in)
+            ttl: Seconds a fetched document stays fresh
+            transport: Pooled transport (defaults to the shared one)
+            rate_per_host: Maximum requests per second to one host
+            max_workers: Concurrent fetches when polling many cities
+        """
+        self.base_url = (base_url or os.getenv('WTTR_BASE_URL', "https://wttr.in")).rstrip('/')
+        self.ttl = ttl
+        self.transport = transport or get_transport()
+        self.limiter = RateLimiter(rate=rate_per_host, burst=max(1, int(rate_per_host)))
+        self.max_workers = max_workers
+        self.inflight = SingleFlight()
+        self._cache = {}  # city key -> (expires_at, data)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _download(self, city: str):
+        url = f"{self.base_url}/{quote(city)}?format=j1"
+        self.limiter.acquire(urlsplit(url).netloc)
+        response = self.transport.get(url)  # Transport applies its default timeout
+        response.raise_for_status()
+        return response.json()
+
+    def fetch(self, city: str):
+        """Return the parsed j1 document for city, from cache when still fresh"""
+        key = city.strip().lower()
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] > now:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        data = self.inflight.do(key, self._download, city)
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.ttl, data)
+        return data
+
+    def current(self, city: str):
+        """Return the current_condition entry for city"""
+        return self.fetch(city)['current_condition'][0]
+
+    def forecast(self, city: str, days: int = 3):
+        """Return a list of daily forecast summaries for city"""
+        return [
+            {
+                'date': day['date'],
+                'min_temp': day['mintempC'],
+                'max_temp': day['maxtempC'],
+                'description': day['hourly'][0]['weatherDesc'][0]['value'],
+            }
+            for day in self.fetch(city)['weather'][:days]
+        ]
+
+    def poll(self, cities):
+        """
+        Fetch many cities concurrently over the pooled session
+
+        Yields:
+            (city, data, error) tuples in completion order; data is None
+            when the fetch failed
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.fetch, city): city for city in dict.fromkeys(cities)}
+            for future in as_completed(futures):
+                city = futures[future]
+                try:
+                    yield city, future.result(), None
+                except Exception as e:
+                    yield city, None, e
+
+    def clear(self):
+        """Drop all cached documents"""
+        with self._lock:
+            self._cache.clear()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_service():
+    """Return the module-wide weather service used by get_weather/get_forecast"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = WeatherService()
+    return _service
 
 def get_weather(city="Innsbruck"):
     """
     Get weather data for a city using wttr.in API
     (No API key required!)
     """
-    # API endpoint
-    url = f"http://wttr.in/{city}?format=j1"
-
     print(f"🌤️  Fetching weather data for {city}...")
 
     try:
-        # Make GET request
-        response = requests.get(url, timeout=10)
-
-        # Check if request was successful
-        response.raise_for_status()
-
-        # Parse JSON response
-        data = response.json()
+        # Fetch (or reuse) the parsed j1 document
+        data = get_service().fetch(city)
 
         # Extract current conditions
         current = data['current_condition'][0]
@@ -39,58 +171,84 @@ def get_weather(city="Innsbruck"):
         print(f"Humidity: {current['humidity']}%")
         print(f"Wind: {current['windspeedKmph']} km/h {current['winddir16Point']}")
         print(f"{'='*50}")
-        
+
         return data
-    
+
     except requests.exceptions.Timeout:
         print("❌ Error: Request timed out")
         return None
-        
+
     except requests.exceptions.ConnectionError:
         print("❌ Error: Could not connect to API")
         return None
-        
+
     except requests.exceptions.HTTPError as e:
         print(f"❌ HTTP Error: {e}")
         return None
-        
+
     except json.JSONDecodeError:
         print("❌ Error: Invalid JSON response")
         return None
-        
+
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
         return None
-    
-def get_forecast(city="Innsbruck", days=3):
-    """Get weather forecast"""
-    url = f"https://wttr.in/{city}?format=j1"
 
+def get_forecast(city="Innsbruck", days=3):
+    """Get weather forecast (reuses the document fetched by get_weather)"""
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        forecast = get_service().forecast(city, days)
 
         print(f"\n{days}-DAY FORECAST: {city}")
         print("=" * 50)
 
-        for day in data['weather'][:days]:
-            date = day['date']
-            max_temp = day['maxtempC']
-            min_temp = day['mintempC']
-            desc = day['hourly'][0]['weatherDesc'][0]['value']
-            
-            print(f"{date}: {min_temp}°C - {max_temp}°C | {desc}")
+        for day in forecast:
+            print(f"{day['date']}: {day['min_temp']}°C - {day['max_temp']}°C | {day['description']}")
 
         print("=" * 50)
-    
+
     except Exception as e:
         print(f"❌ Error fetching forecast: {e}")
 
-if __name__ == "__main__":
-    # Get current weather
-    weather = get_weather()
+def main():
+    """Main function with command-line argument handling"""
+    parser = argparse.ArgumentParser(description="Current weather and forecast from wttr.in")
+    parser.add_argument('cities', nargs='*', help="City names (default: Innsbruck)")
+    parser.add_argument('--file', help="File with one city per line")
+    parser.add_argument('--days', type=int, default=3, help="Forecast days")
+    parser.add_argument('--rate', type=float, default=10.0, help="Requests per second per host")
+    parser.add_argument('--base-url', help="Service URL (default: $WTTR_BASE_URL or https://wttr.in)")
+    args = parser.parse_args()
+
+    global _service
+    _service = WeatherService(base_url=args.base_url, rate_per_host=args.rate)
 
-    # Get forecast if current weather succeeded
-    if weather:
-        get_forecast("Innsbruck", days=3)
\ No newline at end of file
+    cities = list(args.cities)
+    if args.file:
+        with open(args.file, 'r') as f:
+            cities += [line.strip() for line in f if line.strip()]
+    elif not cities:
+        cities = ["Innsbruck"]
+
+    # Single city: full report plus forecast from the same document
+    if len(cities) == 1:
+        weather = get_weather(cities[0])
+        if weather:
+            get_forecast(cities[0], days=args.days)
+        return 0 if weather else 1
+
+    # Many cities: poll concurrently, one line per city
+    failed = 0
+    for city, data, error in _service.poll(cities):
+        if error is not None:
+            failed += 1
+            print(f"❌ {city}: {error}")
+            continue
+        current = data['current_condition'][0]
+        print(f"✅ {city:20} {current['temp_C']:>4}°C  {current['humidity']:>3}%  "
+              f"{current['weatherDesc'][0]['value']}")
+    print(f"\nPolled {len(set(cities))} cities ({failed} failed)")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
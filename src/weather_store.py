@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+weather_store.py - Compact append-only time-series store for weather observations
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+# One observation: 12 bytes. wttr.in reports whole numbers for these fields.
+RECORD_DTYPE = np.dtype([
+    ('ts', '<u4'),         # Unix time, seconds (UTC)
+    ('temp', '<i2'),       # temp_C
+    ('feels', '<i2'),      # FeelsLikeC
+    ('humidity', '<i2'),   # humidity (%)
+    ('wind', '<i2'),       # windspeedKmph
+])
+FIELDS = ('temp', 'feels', 'humidity', 'wind')
+SOURCE_FIELDS = {'temp': 'temp_C', 'feels': 'FeelsLikeC',
+                 'humidity': 'humidity', 'wind': 'windspeedKmph'}
+BUCKETS = {'hour': 3600, 'day': 86400}
+
+
+def _city_key(city):
+    """
+    Filesystem-safe key for a city name
+
+    A short ASCII slug for readability plus a hash of the normalized name,
+    so names that slug alike ('Zürich' / 'Z rich', or non-Latin names
+    with no ASCII letters at all) still get distinct keys. Case and
+    surrounding whitespace do not matter.
+    """
+    name = unicodedata.normalize('NFC', city.strip()).casefold()
+    ascii_name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode()
+    slug = re.sub(r'[^a-z0-9]+', '_', ascii_name).strip('_')[:32]
+    digest = hashlib.sha1(name.encode('utf-8')).hexdigest()[:12]
+    return f"{slug}-{digest}" if slug else digest
+
+
+def _month_start(ts):
+    """Unix time of the first second of ts's UTC month"""
+    dt = datetime.fromtimestamp(ts, tz=timezone.utc)
+    return int(datetime(dt.year, dt.month, 1, tzinfo=timezone.utc).timestamp())
+
+
+class WeatherStore:
+    """
+    Per-city append-only binary logs plus compressed monthly segments
+
+    New observations are appended to '<city>.log' (fixed 12-byte records,
+    memory-mapped for reads). compact() moves whole past months into
+    delta-encoded, zlib-compressed '<city>/<YYYYMM>.npz' segments, which
+    is what keeps a year of 10-minute data for hundreds of sites small.
+    """
+
+    def __init__(self, root='data/weather_store'):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / 'index.json'
+        if self.index_path.exists():
+            with open(self.index_path, 'r') as f:
+                self.index = json.load(f)
+        else:
+            self.index = {}
+
+    def _save_index(self):
+        tmp = self.index_path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp, self.index_path)
+
+    def _entry(self, city, create=False):
+        """
+        (key, index entry) for city
+
+        Readers get an empty entry for unknown cities; only writers
+        (create=True) add it to the index.
+        """
+        key = _city_key(city)
+        if key in self.index:
+            return key, self.index[key]
+        entry = {'name': city, 'segments': []}
+        if create:
+            self.index[key] = entry
+            self._save_index()
+        return key, entry
+
+    def _log(self, key):
+        """Memory-map the city's append log (empty array if none)"""
+        path = self.root / f"{key}.log"
+        if not path.exists() or path.stat().st_size == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.memmap(path, dtype=RECORD_DTYPE, mode='r')
+
+    def last_ts(self, city):
+        """Timestamp of the newest stored observation (0 if none)"""
+        key, entry = self._entry(city)
+        log = self._log(key)
+        if len(log):
+            return int(log['ts'][-1])
+        return entry['segments'][-1]['last'] if entry['segments'] else 0
+
+    def append(self, city, records):
+        """
+        Append observations for city
+
+        Args:
+            records: Structured array with RECORD_DTYPE, sorted by ts;
+                records not newer than the last stored one are skipped
+
+        Returns:
+            Number of records written
+        """
+        records = np.asarray(records, dtype=RECORD_DTYPE)
+        records = records[records['ts'] > self.last_ts(city)]
+        if len(records) and np.any(np.diff(records['ts'].astype(np.int64)) <= 0):
+            raise ValueError("Records must be strictly increasing in time")
+
+        key, _ = self._entry(city, create=True)
+        with open(self.root / f"{key}.log", 'ab') as f:
+            f.write(records.tobytes())
+        return len(records)
+
+    def append_observation(self, city, ts, temp, feels, humidity, wind):
+        """Append a single observation"""
+        record = np.array([(ts, temp, feels, humidity, wind)], dtype=RECORD_DTYPE)
+        return self.append(city, record)
+
+    def compact(self, before=None):
+        """
+        Move log records from complete months into compressed segments
+
+        Args:
+            before: Unix time; records older than the start of its month
+                are compacted (defaults to now)
+        """
+        cutoff = _month_start(int(before or time.time()))
+        for key, entry in self.index.items():
+            log = np.array(self._log(key))  # Copy: the file is rewritten below
+            old = log[log['ts'] < cutoff]
+            if len(old) == 0:
+                continue
+
+            (self.root / key).mkdir(exist_ok=True)
+            months = (old['ts'].astype('datetime64[s]').astype('datetime64[M]')
+                      .astype('datetime64[s]').astype(np.int64))
+            for month in np.unique(months):
+                chunk = old[months == month]
+                name = datetime.fromtimestamp(int(month), tz=timezone.utc).strftime('%Y%m')
+                path = self.root / key / f"{name}.npz"
+                if path.exists():  # Month partially compacted earlier
+                    chunk = np.concatenate([self._read_segment(path), chunk])
+                    entry['segments'] = [s for s in entry['segments'] if s['file'] != path.name]
+                self._write_segment(path, chunk)
+                entry['segments'].append({'file': path.name, 'first': int(chunk['ts'][0]),
+                                          'last': int(chunk['ts'][-1]), 'count': len(chunk)})
+            entry['segments'].sort(key=lambda s: s['first'])
+
+            tmp = self.root / f"{key}.log.tmp"
+            log[log['ts'] >= cutoff].tofile(tmp)
+            os.replace(tmp, self.root / f"{key}.log")
+        self._save_index()
+
+    @staticmethod
+    def _write_segment(path, records):
+        """Delta-encode each column and store compressed"""
+        columns = {'ts': np.diff(records['ts'].astype(np.int64), prepend=0)}
+        for field in FIELDS:
+            columns[field] = np.diff(records[field].astype(np.int32), prepend=0).astype(np.int16)
+        columns['ts'] = columns['ts'].astype(np.int64 if columns['ts'][0] > 2**31 - 1 else np.int32)
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, **columns)
+
+    @staticmethod
+    def _read_segment(path):
+        with np.load(path) as data:
+            records = np.empty(len(data['ts']), dtype=RECORD_DTYPE)
+            records['ts'] = np.cumsum(data['ts'].astype(np.int64))
+            for field in FIELDS:
+                records[field] = np.cumsum(data[field].astype(np.int32))
+        return records
+
+    def query(self, city, start=0, end=2**32 - 1):
+        """
+        Return observations with start <= ts < end as a structured array
+
+        Only segments overlapping the range are decompressed.
+        """
+        key, entry = self._entry(city)
+        parts = [
+            self._read_segment(self.root / key / seg['file'])
+            for seg in entry['segments']
+            if seg['last'] >= start and seg['first'] < end
+        ]
+        parts.append(self._log(key))
+
+        result = []
+        for part in parts:
+            ts = part['ts']
+            lo, hi = np.searchsorted(ts, start), np.searchsorted(ts, end)
+            if hi > lo:
+                result.append(np.asarray(part[lo:hi]))
+        if not result:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.concatenate(result)
+
+    def downsample(self, city, start=0, end=2**32 - 1, bucket='hour'):
+        """
+        Aggregate observations into hourly or daily min/max/mean
+
+        Returns:
+            Dictionary with 'ts' (bucket start), 'count' and, per field,
+            '<field>_min', '<field>_max' and '<field>_mean' arrays
+        """
+        records = self.query(city, start, end)
+        width = BUCKETS[bucket]
+        if len(records) == 0:
+            return {'ts': np.empty(0, dtype=np.int64), 'count': np.empty(0, dtype=np.int64)}
+
+        bucket_ts = records['ts'].astype(np.int64) // width * width
+        starts = np.flatnonzero(np.r_[True, bucket_ts[1:] != bucket_ts[:-1]])
+        counts = np.diff(np.r_[starts, len(records)])
+
+        result = {'ts': bucket_ts[starts], 'count': counts}
+        for field in FIELDS:
+            values = records[field].astype(np.float64)
+            result[f"{field}_min"] = np.minimum.reduceat(values, starts)
+            result[f"{field}_max"] = np.maximum.reduceat(values, starts)
+            result[f"{field}_mean"] = np.add.reduceat(values, starts) / counts
+        return result
+
+    def size_bytes(self):
+        """Total size of all store files on disk"""
+        return sum(p.stat().st_size for p in self.root.rglob('*') if p.is_file())
+
+
+class WeatherRecorder:
+    """Poll cities through a WeatherService and append numeric fields to a store"""
+
+    def __init__(self, store, service):
+        self.store = store
+        self.service = service
+
+    def record(self, cities, ts=None):
+        """
+        Poll all cities once and store one observation per city
+
+        Returns:
+            (recorded, failed) counts
+        """
+        ts = int(ts or time.time())
+        recorded = failed = 0
+        for city, data, error in self.service.poll(cities):
+            if error is not None:
+                print(f"❌ {city}: {error}")
+                failed += 1
+                continue
+            current = data['current_condition'][0]
+            values = [int(float(current[SOURCE_FIELDS[field]])) for field in FIELDS]
+            recorded += self.store.append_observation(city, ts, *values)
+        return recorded, failed
+
+
+# Demo: one simulated year of 10-minute observations for many sites
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    sites = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    root = tempfile.mkdtemp(prefix='weather_store_')
+    store = WeatherStore(root)
+
+    year_start = int(datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp())
+    ts = np.arange(year_start, year_start + 365 * 86400, 600, dtype=np.int64)
+    rng = np.random.default_rng(0)
+    day = (ts - year_start) / 86400
+
+    started = time.perf_counter()
+    for site in range(sites):
+        temp = 8 + 12 * np.sin((day - 100) / 365 * 2 * np.pi) + 5 * np.sin(day * 2 * np.pi)
+        records = np.empty(len(ts), dtype=RECORD_DTYPE)
+        records['ts'] = ts
+        records['temp'] = np.round(temp + rng.normal(0, 0.5, len(ts)))
+        records['feels'] = records['temp'] - 2
+        records['humidity'] = np.clip(np.round(70 + 10 * np.sin(day) + rng.normal(0, 2, len(ts))), 0, 100)
+        records['wind'] = np.abs(np.round(rng.normal(10, 4, len(ts))))
+        store.append(f"Site {site}", records)
+    store.compact(before=year_start + 366 * 86400)
+    elapsed = time.perf_counter() - started
+
+    size = store.size_bytes()
+    print(f"Sites: {sites}, observations: {sites * len(ts):,}")
+    print(f"Ingest + compaction: {elapsed:.2f}s")
+    print(f"Store size: {size / 1e6:.2f} MB ({size / (sites * len(ts)):.2f} bytes/observation, "
+          f"~{size / sites * 300 / 1e6:.0f} MB for 300 sites)")
+
+    start = time.perf_counter()
+    march = store.query("Site 0", year_start + 59 * 86400, year_start + 90 * 86400)
+    print(f"Range query (March, {len(march)} rows): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    daily = store.downsample("Site 0", bucket='day')
+    print(f"Daily downsample ({len(daily['ts'])} days): {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(f"Warmest day mean: {daily['temp_mean'].max():.1f}°C")
+
+    shutil.rmtree(root)
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The scripts in src/ import each other as top-level modules
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(SRC_DIR))
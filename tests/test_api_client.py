@@ -0,0 +1,179 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from api_client import APIClient
+from http_transport import HTTPTransport
+from instrumentation import Instrumentation
+
+
+class ListSink:
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+
+@pytest.fixture
+def flaky_server():
+    """Server answering the first `failures` requests with 503"""
+    state = {'requests': 0, 'failures': 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            state['requests'] += 1
+            status = 503 if state['requests'] <= state['failures'] else 200
+            body = json.dumps([{'id': 1}, {'id': 2}] if status == 200 else {}).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", state
+    server.shutdown()
+    server.server_close()
+
+
+def instrumented_client(url):
+    sink = ListSink()
+    client = APIClient(url, transport=HTTPTransport(retries=2),
+                       instrumentation=Instrumentation([sink]))
+    return client, sink
+
+
+def batching_client(replies=None):
+    """Client whose POSTs are recorded instead of sent"""
+    client = APIClient('http://api.invalid')
+    posted = []
+
+    def post_body(endpoint, body, headers, retries):
+        posted.append((time.monotonic(), json.loads(body)))
+        return replies.pop(0) if replies else None
+
+    client._post_body = post_body
+    return client, posted
+
+
+def test_partial_batch_flushed_while_generator_is_slow():
+    client, posted = batching_client()
+    second_record_at = []
+
+    def records():
+        yield {'id': 1}
+        threading.Event().wait(0.5)
+        second_record_at.append(time.monotonic())
+        yield {'id': 2}
+
+    result = client.post_batched('/items', records(), max_batch=10, max_delay=0.05)
+
+    assert result['sent'] == 2
+    assert [batch for _, batch in posted] == [[{'id': 1}], [{'id': 2}]]
+    assert posted[0][0] < second_record_at[0]
+
+
+def test_full_batches_and_indices():
+    client, posted = batching_client()
+    result = client.post_batched('/items', ({'id': i} for i in range(5)), max_batch=2)
+
+    assert [len(batch) for _, batch in posted] == [2, 2, 1]
+    assert result == {'sent': 5, 'failed': [], 'requests': 3, 'bytes': result['bytes']}
+
+
+def test_repeated_error_index_counts_once():
+    reply = {'errors': [{'index': 1, 'error': 'bad'}, {'index': 1, 'error': 'again'},
+                        {'index': 7, 'error': 'out of range'}]}
+    client, _ = batching_client([reply])
+    result = client.post_batched('/items', [{'id': i} for i in range(3)])
+
+    assert result['sent'] == 2
+    assert result['failed'] == [{'index': 1, 'error': 'bad'}]
+
+
+def test_generator_error_raised_after_sending_records_read():
+    client, posted = batching_client()
+
+    def records():
+        yield {'id': 1}
+        raise RuntimeError('source broke')
+
+    with pytest.raises(RuntimeError, match='source broke'):
+        client.post_batched('/items', records())
+    assert [batch for _, batch in posted] == [[{'id': 1}]]
+
+
+@pytest.mark.parametrize('reply', [
+    {'errors': [{'index': 'one', 'error': 'bad'}]},
+    {'errors': [{'error': 'no index'}]},
+    {'errors': 'everything failed'},
+    {'errors': ['bad']},
+])
+def test_malformed_error_reply_fails_whole_batch(reply):
+    client, posted = batching_client([reply, None])
+    result = client.post_batched('/items', ({'id': i} for i in range(5)), max_batch=3)
+
+    assert len(posted) == 2
+    assert result['sent'] == 2
+    assert [failure['index'] for failure in result['failed']] == [0, 1, 2]
+    assert 'Malformed error reply' in result['failed'][0]['error']
+
+
+def reader_threads():
+    return [t for t in threading.enumerate() if t.name == 'post_batched-reader']
+
+
+def test_reader_stopped_when_sending_raises():
+    client, _ = batching_client()
+    produced = []
+
+    def records():
+        for i in range(1000):
+            produced.append(i)
+            yield {'id': i, 'when': object() if i == 2 else None}  # Record 2 cannot be encoded
+
+    with pytest.raises(TypeError):
+        client.post_batched('/items', records(), max_batch=3)
+
+    deadline = time.monotonic() + 5
+    while reader_threads() and time.monotonic() < deadline:
+        threading.Event().wait(0.01)
+    assert not reader_threads()
+    assert len(produced) < 1000  # The reader stopped pulling records
+
+
+def test_stream_items_is_instrumented(flaky_server):
+    url, _ = flaky_server
+    client, sink = instrumented_client(url)
+
+    assert list(client.stream_items('/items', fast=False)) == [{'id': 1}, {'id': 2}]
+    requests_seen = [event for event in sink.events if event['event'] == 'request']
+    assert len(requests_seen) == 1
+    assert requests_seen[0]['status'] == 200
+    assert requests_seen[0]['endpoint'] == '/items'
+    client.transport.close()
+
+
+def test_transport_retries_are_counted(flaky_server):
+    url, state = flaky_server
+    state['failures'] = 1
+    client, sink = instrumented_client(url)
+
+    assert client.get('/items') == [{'id': 1}, {'id': 2}]
+    assert state['requests'] == 2
+    retries = [event for event in sink.events if event['event'] == 'retry']
+    assert len(retries) == 1
+    assert retries[0]['layer'] == 'transport'
+    assert retries[0]['status'] == 503
+    client.transport.close()
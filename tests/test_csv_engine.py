@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+import csv_engine
+from csv_engine import ENGINES, choose_engine, read_csv
+from expense_analyzer_robust import read_expenses_safe
+
+CSV = '''Date,Category,Description,Amount,Receipt
+2025-10-01,Food,"Lunch, team",85.50,101
+2025-10-02,NA,Taxi,N/A,102
+2025-10-03,,Coffee,12.5,
+2025-10-04,Office,null,15.75,104
+
+2025-10-05,Travel,Hotel,not a number,105
+'''
+
+
+@pytest.fixture
+def expenses(tmp_path):
+    path = tmp_path / 'expenses.csv'
+    path.write_text(CSV)
+    return path
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+def test_engines_return_identical_frames(expenses, engine):
+    expected = read_csv(expenses, engine='c')
+    pd.testing.assert_frame_equal(read_csv(expenses, engine=engine), expected)
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+def test_amount_and_date_typed_other_fields_text(expenses, engine):
+    df = read_csv(expenses, engine=engine)
+    assert df['Amount'].dtype == 'float64'
+    assert pd.api.types.is_datetime64_any_dtype(df['Date'])
+    assert df['Amount'].tolist()[:3:2] == [85.5, 12.5]
+    assert df['Amount'].isna().tolist() == [False, True, False, False, True]  # 'N/A', 'not a number'
+    assert df.loc[4, 'Date'] == pd.Timestamp('2025-10-05')
+    assert all(df[name].dtype == object for name in ['Category', 'Description', 'Receipt'])
+
+
+def test_default_na_markers_missing(expenses):
+    df = read_csv(expenses, engine='python')
+    assert df['Category'].isna().tolist() == [False, True, True, False, False]
+    assert pd.isna(df.loc[3, 'Description'])
+    assert df.loc[0, 'Description'] == 'Lunch, team'
+    assert df['Receipt'].tolist()[0] == '101'
+
+
+def test_safe_reader_converts_and_drops_bad_values(expenses, capsys):
+    df = read_expenses_safe(expenses, engine='python')
+    assert df['Amount'].dtype == 'float64'
+    assert pd.api.types.is_datetime64_any_dtype(df['Date'])
+    assert len(df) == 3  # 'N/A' and 'not a number' amounts are dropped
+    assert "2 rows with invalid amounts" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+def test_unparseable_dates_become_missing(tmp_path, engine):
+    path = tmp_path / 'dates.csv'
+    path.write_text('Date,Amount\n2025-10-01,1\nsoon,2\n2025-10-03,3\n')
+    df = read_csv(path, engine=engine)
+    assert df['Date'].isna().tolist() == [False, True, False]
+    assert df['Amount'].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_unknown_engine_rejected(expenses):
+    with pytest.raises(ValueError):
+        read_csv(expenses, engine='nope')
+
+
+def test_auto_engine_by_size(expenses, monkeypatch):
+    assert choose_engine(expenses) == 'python'
+    monkeypatch.setattr(csv_engine, 'SMALL_FILE', 0)
+    assert choose_engine(expenses) == 'c'
@@ -0,0 +1,108 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import currency
+from currency import _base_rate_asof, _cache_path, _rates_asof, convert, load_rates
+
+RATES = '''Date,Currency,Rate
+2025-10-01,USD,1.10
+2025-10-01,GBP,0.80
+2025-10-03,USD,1.20
+2025-10-05,GBP,0.90
+2025-10-05,USD,bad
+'''
+
+
+@pytest.fixture
+def rates_csv(tmp_path):
+    path = tmp_path / 'rates.csv'
+    path.write_text(RATES)
+    return path
+
+
+@pytest.fixture
+def rates(rates_csv):
+    return load_rates(rates_csv)
+
+
+def expenses(rows):
+    return pd.DataFrame({
+        'Date': pd.to_datetime([row[0] for row in rows]),
+        'Currency': [row[1] for row in rows],
+        'Amount': [row[2] for row in rows],
+    })
+
+
+def test_load_rates_sorted_and_cleaned(rates):
+    assert rates['Currency'].dtype == 'category'
+    assert rates['Date'].is_monotonic_increasing
+    assert len(rates) == 4  # The unparseable rate is dropped
+
+
+def test_rates_asof_before_between_and_after(rates):
+    dates = pd.to_datetime(['2025-09-30', '2025-10-01', '2025-10-02', '2025-10-04', '2025-12-31',
+                            '2025-10-02']).to_numpy()
+    found = _rates_asof(dates, np.array(['USD', 'USD', 'USD', 'USD', 'USD', 'XYZ']), rates)
+    np.testing.assert_array_equal(found, [np.nan, 1.10, 1.10, 1.20, 1.20, np.nan])
+
+    gbp = _base_rate_asof(dates[:5], 'GBP', rates)
+    np.testing.assert_array_equal(gbp, [np.nan, 0.80, 0.80, 0.80, 0.90])
+
+
+def test_convert_to_reference_currency(rates):
+    df = expenses([
+        ('2025-10-02', 'usd ', 110.0),
+        ('2025-10-06', 'GBP', 90.0),
+        ('2025-10-02', None, 5.0),     # Taken to be EUR
+        ('2025-09-01', 'USD', 10.0),   # Before the first USD rate
+        ('2025-10-02', 'XYZ', 10.0),   # No rates at all
+    ])
+    result = convert(df, rates)
+
+    np.testing.assert_allclose(result['Amount'], [100.0, 100.0, 5.0, np.nan, np.nan])
+    assert result['OriginalCurrency'].tolist() == ['USD', 'GBP', 'EUR', 'USD', 'XYZ']
+    assert result['OriginalAmount'].tolist() == df['Amount'].tolist()
+    assert (result['Currency'] == 'EUR').all()
+
+
+def test_convert_to_other_base(rates):
+    df = expenses([
+        ('2025-10-04', 'EUR', 10.0),
+        ('2025-10-04', 'GBP', 8.0),
+        ('2025-10-04', 'USD', 7.0),
+    ])
+    result = convert(df, rates, base='USD')
+    np.testing.assert_allclose(result['Amount'], [12.0, 12.0, 7.0])
+    assert (result['Currency'] == 'USD').all()
+
+
+def test_convert_without_rates(rates):
+    df = expenses([('2025-10-04', 'EUR', 10.0), ('2025-10-04', 'USD', 7.0)])
+    assert convert(df.iloc[:1])['Amount'].tolist() == [10.0]
+    assert np.isnan(convert(df)['Amount'].iloc[1])
+
+
+def test_cache_reused_until_csv_changes(rates_csv):
+    first = load_rates(rates_csv)
+    assert _cache_path(rates_csv).exists()
+    pd.testing.assert_frame_equal(load_rates(rates_csv), first)
+
+    rates_csv.write_text(RATES.replace('1.20', '1.25'))
+    stat = os.stat(rates_csv)
+    os.utime(rates_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert load_rates(rates_csv)['Rate'].tolist() == [1.10, 0.80, 1.25, 0.90]
+
+
+def test_unwritable_cache_is_logged_and_skipped(rates_csv, monkeypatch, caplog):
+    def fail(src, dst):
+        raise PermissionError(13, 'Permission denied', str(dst))
+
+    monkeypatch.setattr(currency.os, 'replace', fail)
+    rates = load_rates(rates_csv)
+
+    assert len(rates) == 4
+    assert 'Could not write rate cache' in caplog.text
+    assert list(rates_csv.parent.iterdir()) == [rates_csv]  # No cache or temp file left
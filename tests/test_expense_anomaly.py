@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from expense_anomaly import MIN_RELATIVE_SPREAD, StreamingDetector, rolling_scores
+
+
+@pytest.fixture
+def expenses():
+    rng = np.random.default_rng(3)
+    n = 400
+    dates = pd.Timestamp('2025-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 120 * 24, n)), unit='h')
+    df = pd.DataFrame({
+        'Date': dates,
+        'Category': rng.choice(['Food', 'Transport', 'Office', None], n),
+        'Amount': rng.gamma(4.0, 10.0, n).round(2),
+    })
+    df.loc[[50, 200, 350], 'Amount'] = 900.0  # Clear outliers
+    # Shuffled, with a repeated index, to check results map back to the right rows
+    return df.sample(frac=1, random_state=1).set_axis(np.arange(n) % 50)
+
+
+def brute_force(df, window, method, min_periods):
+    """Baseline and spread of each row from its category's earlier rows in the window"""
+    window = pd.Timedelta(window)
+    baseline, spread = [], []
+    for date, category in zip(df['Date'], df['Category']):
+        same = df['Category'].isna() if category is None else df['Category'] == category
+        prior = df.loc[same & (df['Date'] >= date - window) & (df['Date'] < date), 'Amount']
+        if len(prior) < min_periods:
+            baseline.append(np.nan)
+            spread.append(np.nan)
+        elif method == 'zscore':
+            baseline.append(prior.mean())
+            spread.append(prior.std())
+        else:
+            baseline.append(prior.median())
+            spread.append(np.nan)
+    return np.array(baseline), np.array(spread)
+
+
+def test_zscore_matches_brute_force(expenses):
+    scores = rolling_scores(expenses, window='14D', min_periods=3)
+    baseline, spread = brute_force(expenses, '14D', 'zscore', 3)
+
+    np.testing.assert_allclose(scores['baseline'].to_numpy(), baseline, rtol=1e-9)
+    np.testing.assert_allclose(scores['spread'].to_numpy(), spread, rtol=1e-6)
+    floor = np.maximum(np.abs(baseline) * MIN_RELATIVE_SPREAD, 0.01)
+    expected = (expenses['Amount'].to_numpy() - baseline) / np.maximum(spread, floor)
+    np.testing.assert_allclose(scores['score'].to_numpy(), expected, rtol=1e-6)
+
+
+def test_mad_baseline_is_the_rolling_median(expenses):
+    scores = rolling_scores(expenses, window='14D', method='mad', min_periods=3)
+    baseline, _ = brute_force(expenses, '14D', 'mad', 3)
+    np.testing.assert_allclose(scores['baseline'].to_numpy(), baseline)
+
+
+@pytest.mark.parametrize('method', ['zscore', 'mad'])
+def test_outliers_flagged(expenses, method):
+    scores = rolling_scores(expenses, window='30D', method=method)
+    flagged = expenses.loc[scores['anomaly'].to_numpy(), 'Amount']
+    assert (flagged == 900.0).sum() >= 2
+    assert scores.index.equals(expenses.index)
+
+
+def test_same_timestamp_rows_do_not_see_each_other():
+    df = pd.DataFrame({
+        'Date': pd.to_datetime(['2025-01-01'] * 3 + ['2025-01-02']),
+        'Category': 'Food',
+        'Amount': [10.0, 20.0, 30.0, 40.0],
+    })
+    scores = rolling_scores(df, min_periods=1)
+    assert scores['baseline'].isna().tolist() == [True, True, True, False]
+    assert scores['baseline'].iloc[3] == pytest.approx(20.0)
+
+
+def test_streaming_detector_matches_batch_zscore(expenses):
+    ordered = expenses.sort_values('Date', kind='stable')
+    batch = rolling_scores(ordered, window='14D', min_periods=3)['score']
+    streamed = StreamingDetector(window='14D', min_periods=3).process(ordered)
+    np.testing.assert_allclose(streamed.to_numpy(), batch.to_numpy(), rtol=1e-6)
+
+
+def test_invalid_arguments_rejected(expenses):
+    with pytest.raises(ValueError):
+        rolling_scores(expenses, method='iqr')
+    with pytest.raises(ValueError):
+        rolling_scores(expenses, window='fortnight')
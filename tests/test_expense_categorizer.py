@@ -0,0 +1,84 @@
+import random
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from expense_categorizer import (DEFAULT_RULES, UNMATCHED, Categorizer, _trie_pattern,
+                                 apply_categories)
+
+
+def reference_match(keywords, description):
+    """Leftmost, then longest, whole-word keyword by brute force"""
+    text = description.lower()
+    best = None
+    for word, category in keywords.items():
+        for found in re.finditer(re.escape(word), text):
+            start, end = found.span()
+            if (start > 0 and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum()):
+                continue
+            candidate = (start, -len(word), category)
+            if best is None or candidate < best:
+                best = candidate
+    return best[2] if best else None
+
+
+@pytest.mark.parametrize('description, category', [
+    ('Bus to Munich', 'Transport'),
+    ('Business Lunch', 'Food'),            # 'bus' is not a whole word here
+    ('CAR RENTAL Vienna', 'Transport'),
+    ('Hotel booking.com', 'Travel'),
+    ('Coffee and printer paper', 'Food'),  # Leftmost keyword wins
+    ('Taxi_2 receipt', 'Transport'),       # Only letters and digits join words
+    ('', None),
+])
+def test_default_rules(description, category):
+    assert Categorizer(DEFAULT_RULES).match(description) == category
+
+
+def test_longest_keyword_wins_at_the_same_position():
+    categorizer = Categorizer({'Short': ['car'], 'Long': ['car rental', 'car rent']})
+    assert categorizer.match('Car rental at airport') == 'Long'
+    assert categorizer.match('Car rent') == 'Long'
+    assert categorizer.match('Car wash') == 'Short'
+
+
+def test_trie_pattern_matches_exactly_its_words():
+    words = ['a', 'ab', 'abc', 'abd', 'b', 'bcd', 'x.y', 'x+y']
+    pattern = re.compile(f"(?:{_trie_pattern(words)})\\Z")
+    for word in words:
+        assert pattern.match(word)
+    for other in ['', 'ac', 'abcd', 'bc', 'xy', 'x.', 'xay']:
+        assert not pattern.match(other)
+
+
+def test_trie_matches_brute_force_on_random_rules():
+    rng = random.Random(7)
+    alphabet = 'abc '
+    keywords = {}
+    for i in range(60):
+        word = ''.join(rng.choice('abc') for _ in range(rng.randint(1, 4)))
+        keywords.setdefault(word, f"C{i % 5}")
+    categorizer = Categorizer({category: [w for w, c in keywords.items() if c == category]
+                               for category in set(keywords.values())})
+    for _ in range(500):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        assert categorizer.match(text) == reference_match(keywords, text), text
+
+
+def test_apply_categories_fills_only_generic_rows():
+    df = pd.DataFrame({
+        'Category': ['', 'Misc', 'Office', np.nan, ' other '],
+        'Description': ['Uber home', 'Team lunch', 'Taxi', 'Gift', np.nan],
+    })
+    result, filled = apply_categories(df, Categorizer(DEFAULT_RULES))
+
+    assert result['Category'].tolist() == ['Transport', 'Food', 'Office', UNMATCHED, UNMATCHED]
+    assert filled == 2
+    assert df['Category'].tolist()[:3] == ['', 'Misc', 'Office']  # Input left untouched
+
+
+def test_no_rules_rejected():
+    with pytest.raises(ValueError):
+        Categorizer({'Food': ['  ']})
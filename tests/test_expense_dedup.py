@@ -0,0 +1,65 @@
+import pandas as pd
+
+from expense_dedup import HashIndex, drop_duplicates, find_duplicates, row_hashes
+
+
+def frame(rows, columns=('Date', 'Category', 'Description', 'Amount')):
+    return pd.DataFrame(rows, columns=list(columns))
+
+
+def test_exact_duplicates_ignore_formatting():
+    df = frame([
+        ('2025-10-01', 'Food', 'Grocery Shopping', 85.5),
+        ('2025-10-01', 'food', '  GROCERY   shopping ', '85.50'),
+        ('2025-10-02', 'Food', 'Grocery Shopping', 85.5),
+    ])
+    assert find_duplicates(df).tolist() == [None, 'exact', None]
+
+
+def test_currency_is_part_of_the_exact_key():
+    df = frame([
+        ('2025-10-01', 'Food', 'Dinner', 50.0, 'EUR'),
+        ('2025-10-01', 'Food', 'Dinner', 50.0, 'USD'),
+        ('2025-10-01', 'Food', 'Dinner', 50.0, ''),
+    ], columns=('Date', 'Category', 'Description', 'Amount', 'Currency'))
+    assert find_duplicates(df).tolist() == [None, None, 'exact']
+
+
+def test_reference_currency_hashes_match_files_without_currency():
+    plain = frame([('2025-10-01', 'Food', 'Dinner', 50.0)])
+    with_currency = plain.assign(Currency='EUR')
+    assert row_hashes(plain)[0] == row_hashes(with_currency)[0]
+
+
+def test_fuzzy_groups_anchor_on_first_row_instead_of_chaining():
+    df = frame([
+        ('2025-10-01', 'Transport', 'Train Ticket', 60.0),
+        ('2025-10-02', 'Transport', 'Train Ticket', 60.0),
+        ('2025-10-03', 'Transport', 'Train Ticket', 60.0),
+        ('2025-10-04', 'Transport', 'Train Ticket', 60.0),
+    ])
+    kinds = find_duplicates(df, fuzzy_days=1)
+    assert kinds.tolist() == [None, 'fuzzy', None, 'fuzzy']
+
+
+def test_fuzzy_needs_matching_category_or_description():
+    df = frame([
+        ('2025-10-01', 'Food', 'Business Lunch', 45.0),
+        ('2025-10-02', 'Office', 'Printer Toner', 45.0),     # Nothing in common but the amount
+        ('2025-10-02', 'Food', 'LUNCH ACME CORP', 45.0),     # Same category, posted a day later
+        ('2025-10-01', 'Travel', 'Business Lunch', 45.0),    # Same description
+    ])
+    kinds = find_duplicates(df, fuzzy_days=2)
+    assert kinds.tolist() == [None, None, 'fuzzy', 'fuzzy']
+
+
+def test_drop_uses_index_across_runs(tmp_path):
+    first = frame([('2025-10-01', 'Food', 'Dinner', 50.0)])
+    index = HashIndex(tmp_path / 'seen.npy')
+    index.add(row_hashes(first))
+    index.save()
+
+    second = frame([('2025-10-01', 'Food', 'Dinner', 50.0), ('2025-10-03', 'Food', 'Dinner', 50.0)])
+    kinds = find_duplicates(second, index=HashIndex(tmp_path / 'seen.npy'))
+    assert kinds.tolist() == ['exact', None]
+    assert len(drop_duplicates(second, kinds)) == 1
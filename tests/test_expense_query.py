@@ -0,0 +1,83 @@
+import warnings
+
+import pandas as pd
+import pytest
+
+from expense_query import ExpenseQuery, build_cache, run_query
+
+CSV = """Date,Category,Description,Amount
+2025-10-01 09:15,Food,Grocery Shopping,85.50
+2025-10-01 18:40,Food,Dinner,30.00
+2025-10-02 08:00,Transport,Taxi to Client,25.00
+2025-10-03 12:00,,Unknown vendor,40.00
+2025-10-05 10:30,Office,Printer Paper,15.75
+2025-11-02 07:45,Transport,Train Ticket,60.00
+"""
+
+
+@pytest.fixture
+def expenses(tmp_path):
+    path = tmp_path / 'expenses.csv'
+    path.write_text(CSV)
+    return path
+
+
+@pytest.mark.parametrize('group_by', [None, 'day', 'month', 'category'])
+def test_cached_results_match_csv(expenses, group_by):
+    query = ExpenseQuery(group_by=group_by, aggs=('sum', 'count', 'min', 'max'))
+    from_csv, info = run_query(expenses, query, use_cache=False)
+    assert info['source'] == 'csv'
+
+    build_cache(expenses)
+    from_rollup, info = run_query(expenses, query)
+    assert info['source'] == 'rollup'
+    pd.testing.assert_frame_equal(from_rollup, from_csv, check_dtype=False, check_index_type=False)
+
+
+def test_blank_category_counted_in_totals(expenses):
+    build_cache(expenses)
+    result, _ = run_query(expenses, ExpenseQuery())
+    assert result['count'].iloc[0] == 6
+    assert result['sum'].iloc[0] == pytest.approx(256.25)
+
+
+def test_rollup_has_one_row_per_day_and_category(expenses):
+    build_cache(expenses)
+    result, info = run_query(expenses, ExpenseQuery(start='2025-10-01', end='2025-10-01'))
+    assert info['rows_scanned'] == 1
+    assert result['count'].iloc[0] == 2
+
+
+def test_columnar_cache_groups_without_warnings(expenses):
+    build_cache(expenses)
+    query = ExpenseQuery(group_by='category', min_amount=20)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        result, info = run_query(expenses, query)
+    assert info['source'] == 'columnar'
+    assert result.loc['Food', 'count'] == 2
+
+
+@pytest.mark.parametrize('query', [
+    ExpenseQuery(),
+    ExpenseQuery(group_by='category'),
+    ExpenseQuery(min_amount=10),
+    ExpenseQuery(categories=['Food'], aggs=('sum', 'count', 'mean')),
+], ids=['total', 'category', 'columnar', 'filtered'])
+def test_unparseable_dates_dropped_with_and_without_cache(tmp_path, query):
+    path = tmp_path / 'expenses.csv'
+    path.write_text(CSV + 'notadate,Food,B,20\n')
+    without_cache, _ = run_query(path, query, use_cache=False)
+
+    build_cache(path)
+    with_cache, info = run_query(path, query)
+    assert info['source'] != 'csv'
+    pd.testing.assert_frame_equal(with_cache, without_cache, check_dtype=False, check_index_type=False)
+
+
+def test_unparseable_date_not_counted_without_cache(tmp_path):
+    path = tmp_path / 'expenses.csv'
+    path.write_text(CSV + 'notadate,Food,B,20\n')
+    result, _ = run_query(path, ExpenseQuery(), use_cache=False)
+    assert result['count'].iloc[0] == 6
+    assert result['sum'].iloc[0] == pytest.approx(256.25)
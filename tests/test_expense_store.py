@@ -0,0 +1,85 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+import expense_store
+from expense_analyzer_robust import read_expenses_safe
+from expense_store import ExpenseStore, file_version
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+CSV = '''Date,Category,Description,Amount
+2025-10-01,Food,Groceries,85.50
+2025-10-02,Transport,Taxi,25.00
+2025-10-02,Food,Lunch,12.00
+'''
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ExpenseStore(tmp_path / 'expenses.db')
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def expenses(tmp_path):
+    path = tmp_path / 'expenses.csv'
+    path.write_text(CSV)
+    return path
+
+
+def ingest(store, path):
+    stat = os.stat(path)
+    return store.ingest(read_expenses_safe(path), path, stat=stat)
+
+
+def test_ingest_twice_changes_nothing(store, expenses):
+    assert ingest(store, expenses) == {'inserted': 3, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+    assert store.is_current(expenses)
+    assert ingest(store, expenses) == {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 3}
+    assert store.stats()['total'] == pytest.approx(122.5)
+    assert store.totals('day')['count'].tolist() == [1, 2]
+
+
+def test_edited_and_removed_rows(store, expenses):
+    ingest(store, expenses)
+    expenses.write_text(CSV.replace('25.00', '30.00').replace('2025-10-02,Food,Lunch,12.00\n', ''))
+
+    assert not store.is_current(expenses)
+    assert ingest(store, expenses) == {'inserted': 0, 'updated': 1, 'deleted': 1, 'unchanged': 1}
+    assert store.stats()['total'] == pytest.approx(115.5)
+    assert store.totals('day')['count'].tolist() == [1, 1]
+
+
+def test_write_during_read_leaves_source_out_of_date(store, expenses):
+    stat = os.stat(expenses)
+    df = read_expenses_safe(expenses)
+    expenses.write_text(CSV + '2025-10-03,Food,Dinner,40.00\n')  # Lands after the read
+    store.ingest(df, expenses, stat=stat)
+
+    assert not store.is_current(expenses)
+
+
+def test_changed_rates_make_source_out_of_date(store, tmp_path):
+    rates = tmp_path / 'rates.csv'
+    shutil.copy(DATA_DIR / 'exchange_rates.csv', rates)
+    foreign = tmp_path / 'foreign.csv'
+    shutil.copy(DATA_DIR / 'expenses_foreign.csv', foreign)
+
+    assert expense_store.main(['ingest', str(foreign), '--db', str(tmp_path / 'expenses.db'),
+                               '--rates', str(rates)]) == 0
+    assert store.is_current(foreign, rates=file_version(rates))
+    assert not store.is_current(foreign)  # Ingested with rates, asked without
+
+    os.utime(rates, ns=(0, os.stat(rates).st_mtime_ns + 10**9))
+    assert not store.is_current(foreign, rates=file_version(rates))
+
+
+def test_cli_skips_unchanged_files(tmp_path, expenses, capsys):
+    db = str(tmp_path / 'expenses.db')
+    assert expense_store.main(['ingest', str(expenses), '--db', db]) == 0
+    assert expense_store.main(['ingest', str(expenses), '--db', db]) == 0
+    assert 'unchanged since last ingest' in capsys.readouterr().out
@@ -0,0 +1,82 @@
+import pytest
+
+from github_mirror import REPOS_PER_PAGE, GitHubMirror
+
+
+class FakeAPI:
+    """fetch_conditional over in-memory users; any known ETag answers 304"""
+
+    base_url = 'https://api.test'
+
+    def __init__(self, users):
+        self.users = users  # {login: {'public_repos': n, 'repos': [names]}}
+        self.calls = []
+
+    def _lookup(self, login):
+        for name, user in self.users.items():
+            if name.lower() == login.lower():
+                return name, user
+        raise KeyError(login)
+
+    def fetch_conditional(self, url, etag=None):
+        self.calls.append((url, etag))
+        path = url[len(self.base_url):].split('?')[0].strip('/').split('/')
+        name, user = self._lookup(path[1])
+        if len(path) == 2:
+            data = {'login': name, 'name': name.title(), 'public_repos': len(user['repos']),
+                    'followers': 1, 'following': 1, 'created_at': '2020-01-01T00:00:00Z',
+                    'updated_at': '2020-01-01T00:00:00Z'}
+            tag = f'"user-{name}"'
+        else:
+            data = [{'full_name': f"{name}/{repo}", 'name': repo, 'stargazers_count': 1,
+                     'forks_count': 0, 'language': 'Python', 'updated_at': user['repos_updated']}
+                    for repo in user['repos']]
+            tag = f'"repos-{name}-{user["repos"][0]}"'  # Depends on the first page only
+        if etag == tag:
+            return None, etag
+        return data, tag
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    def make(users):
+        return GitHubMirror(str(tmp_path / 'mirror.db'), api=FakeAPI(users))
+    return make
+
+
+def repo_names(mirror, owner):
+    return {row['name'] for row in mirror.conn.execute("SELECT name FROM repos WHERE owner = ?", (owner,))}
+
+
+def test_repos_beyond_first_page_are_refreshed(mirror):
+    repos = [f"repo{i:03d}" for i in range(REPOS_PER_PAGE + 20)]
+    m = mirror({'octocat': {'repos': repos, 'repos_updated': 'v1'}})
+    m.refresh(['octocat'])
+    assert len(repo_names(m, 'octocat')) == len(repos)
+
+    m.api.users['octocat']['repos'] = repos + ['repo999']  # Change on the last page
+    m.api.calls.clear()
+    m.refresh(['octocat'])
+    repos_calls = [etag for url, etag in m.api.calls if '/repos' in url]
+    assert repos_calls == [None]
+    assert 'repo999' in repo_names(m, 'octocat')
+    m.close()
+
+
+def test_single_page_users_use_conditional_requests(mirror):
+    m = mirror({'octocat': {'repos': ['hello'], 'repos_updated': 'v1'}})
+    m.refresh(['octocat'])
+    counts = m.refresh(['octocat'])
+    assert counts['users_unchanged'] == 1
+    assert all(etag is not None for _, etag in m.api.calls[-2:])
+    m.close()
+
+
+def test_login_spellings_share_one_row(mirror):
+    m = mirror({'octocat': {'repos': ['hello'], 'repos_updated': 'v1'}})
+    m.refresh(['Octocat'])
+    m.refresh(['octocat', 'OCTOCAT'])
+    logins = [row['login'] for row in m.conn.execute("SELECT login FROM users")]
+    assert logins == ['octocat']
+    assert repo_names(m, 'octocat') == {'hello'}
+    m.close()
@@ -0,0 +1,59 @@
+import requests
+
+from github_stats import GitHubAPI, OrgRollup
+
+
+class FakeGitHubAPI(GitHubAPI):
+    """GitHubAPI answering from in-memory users (logins are case-insensitive)"""
+
+    def __init__(self, users):
+        super().__init__(base_url='https://api.test')
+        self.users = users  # {login: [repo names]}
+        self.lookups = []
+
+    def _login(self, username):
+        self.lookups.append(username)
+        for login in self.users:
+            if login.lower() == username.lower():
+                return login
+        raise requests.exceptions.HTTPError(f"404 Not Found: {username}")
+
+    def fetch_user(self, username):
+        login = self._login(username)
+        return {'login': login, 'name': login.title(), 'public_repos': len(self.users[login]),
+                'followers': 0, 'following': 0, 'created_at': '2020-01-01T00:00:00Z'}
+
+    def fetch_repos(self, username):
+        login = self._login(username)
+        return [{'full_name': f"{login}/{name}", 'name': name, 'stargazers_count': 2,
+                 'forks_count': 1, 'language': 'Python'} for name in self.users[login]]
+
+
+def test_success_and_error_rows_use_the_requested_username():
+    api = FakeGitHubAPI({'OctoCat': ['hello-world']})
+    rows = {row['username']: row for row in api.collect_many(['octocat', 'ghost'], max_workers=2)}
+
+    assert set(rows) == {'octocat', 'ghost'}
+    assert rows['octocat']['login'] == 'OctoCat'
+    assert rows['octocat']['total_stars'] == 2
+    assert 'error' in rows['ghost']
+
+
+def test_usernames_differing_in_case_are_fetched_once():
+    api = FakeGitHubAPI({'OctoCat': ['hello-world', 'spoon-knife']})
+    rollup = OrgRollup()
+    for row in api.collect_many(['OctoCat', 'octocat', 'OCTOCAT']):
+        rollup.add(row)
+
+    summary = rollup.summary()
+    assert summary['users'] == 1
+    assert summary['total_stars'] == 4
+    assert sorted(api.lookups) == ['OctoCat', 'OctoCat']
+
+
+def test_failed_users_listed_by_requested_name():
+    api = FakeGitHubAPI({})
+    rollup = OrgRollup()
+    for row in api.collect_many(['Nobody']):
+        rollup.add(row)
+    assert rollup.summary()['failed'] == ['Nobody']
@@ -0,0 +1,139 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import api_client
+from api_client import APIClient
+from http_transport import BACKENDS, HTTPTransport
+from instrumentation import Instrumentation
+
+
+class ListSink:
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+
+@pytest.fixture
+def slow_server():
+    """Server whose first `slow` responses take longer than the client timeout"""
+    state = {'requests': 0, 'slow': 1, 'delay': 1.0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            if self.path.startswith('/missing'):
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            state['requests'] += 1
+            if state['requests'] <= state['slow']:
+                threading.Event().wait(state['delay'])  # time.sleep is patched in some tests
+            body = json.dumps({'ok': True}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", state
+    server.shutdown()
+    server.server_close()
+
+
+def test_read_timeout_reaches_caller_as_timeout(slow_server):
+    url, _ = slow_server
+    transport = HTTPTransport(timeout=0.2)
+    with pytest.raises(requests.exceptions.Timeout):
+        transport.get(f"{url}/slow")
+    transport.close()
+
+
+def test_client_retries_get_after_read_timeout(slow_server, monkeypatch):
+    url, state = slow_server
+    monkeypatch.setattr(api_client.time, 'sleep', lambda seconds: None)
+    sink = ListSink()
+    client = APIClient(url, transport=HTTPTransport(timeout=0.2),
+                       instrumentation=Instrumentation([sink]))
+
+    assert client.get('/users/1') == {'ok': True}
+    assert state['requests'] == 2
+    kinds = [event['event'] for event in sink.events]
+    assert kinds.count('timeout') == 1
+    assert kinds.count('retry') == 1
+    client.transport.close()
+
+
+def test_client_gives_up_after_repeated_timeouts(slow_server, monkeypatch):
+    url, state = slow_server
+    state['slow'] = 10
+    monkeypatch.setattr(api_client.time, 'sleep', lambda seconds: None)
+    client = APIClient(url, transport=HTTPTransport(timeout=0.2))
+
+    assert client.get('/users/1', retries=2) is None
+    assert state['requests'] == 2
+    client.transport.close()
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        HTTPTransport(backend='nope')
+
+
+needs_httpx = pytest.mark.skipif('httpx' not in BACKENDS, reason="httpx is not installed")
+
+
+@needs_httpx
+def test_httpx_backend_speaks_requests(slow_server):
+    url, state = slow_server
+    state['slow'] = 0
+    transport = HTTPTransport(backend='httpx', timeout=2)
+
+    response = transport.get(f"{url}/ok", params={'q': 1})
+    response.raise_for_status()
+    assert response.status_code == 200
+    assert response.json() == {'ok': True}
+    assert response.headers['Content-Type'] == 'application/json'
+
+    with pytest.raises(requests.exceptions.HTTPError) as e:
+        transport.get(f"{url}/missing").raise_for_status()
+    assert e.value.response.status_code == 404
+    transport.close()
+
+
+@needs_httpx
+def test_httpx_backend_maps_timeouts_and_connection_errors(slow_server):
+    url, _ = slow_server
+    transport = HTTPTransport(backend='httpx', timeout=0.2, retries=0)
+    with pytest.raises(requests.exceptions.Timeout):
+        transport.get(f"{url}/slow")
+    with pytest.raises(requests.exceptions.ConnectionError):
+        transport.get('http://127.0.0.1:1/')
+    transport.close()
+
+
+@needs_httpx
+def test_client_retries_on_httpx_backend(slow_server, monkeypatch):
+    url, state = slow_server
+    monkeypatch.setattr(api_client.time, 'sleep', lambda seconds: None)
+    sink = ListSink()
+    client = APIClient(url, transport=HTTPTransport(backend='httpx', timeout=0.2),
+                       instrumentation=Instrumentation([sink]))
+
+    assert client.get('/users/1') == {'ok': True}
+    assert state['requests'] == 2
+    assert [event['status'] for event in sink.events if event['event'] == 'request'] == [200]
+    client.transport.close()
@@ -0,0 +1,113 @@
+import json
+import signal
+import textwrap
+import time
+import tracemalloc
+
+import pytest
+
+import job_runner
+from job_runner import JOB_DEFAULTS, _run_job
+
+
+@pytest.fixture
+def worker(tmp_path, monkeypatch):
+    """Run jobs in this process the way a pool worker would"""
+    saved = {sig: signal.getsignal(sig) for sig in (signal.SIGALRM, signal.SIGXCPU)}
+    job_runner._init_worker([])
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def run(name, source, **options):
+        (tmp_path / f"{name}.py").write_text(textwrap.dedent(source))
+        job = {**JOB_DEFAULTS, 'name': name, 'module': name, **options}
+        return _run_job(job, tmp_path)
+
+    yield run
+    for sig, handler in saved.items():
+        signal.signal(sig, handler)
+
+
+def test_timeout_not_swallowed_by_broad_except(worker):
+    result = worker('swallowing_job', """
+        import time
+
+        def main():
+            try:
+                time.sleep(5)
+            except Exception:
+                print("swallowed")
+            return 0
+    """, timeout=0.3)
+    assert result['outcome'] == 'timeout'
+    assert result['duration'] < 2
+
+
+def test_ok_and_failed_exit_codes(worker):
+    assert worker('good_job', "def main():\n    return 0\n")['outcome'] == 'ok'
+    result = worker('bad_job', "import sys\n\ndef main():\n    sys.exit(3)\n")
+    assert result['outcome'] == 'failed'
+    assert result['exit_code'] == 3
+
+
+def test_module_state_reset_between_jobs(worker):
+    result = worker('stateful_job', """
+        from memory_profile import memory
+        from profiling import profiler, span
+
+        def main():
+            memory.enable()
+            profiler.enable()
+            with memory.stage('load'), span('load'):
+                data = list(range(1000))
+            return 0
+    """)
+    assert result['outcome'] == 'ok'
+
+    from memory_profile import memory
+    from profiling import profiler
+    assert not memory.enabled
+    assert memory.stages == []
+    assert not tracemalloc.is_tracing()
+    assert not profiler.enabled
+    assert profiler.stats == {}
+
+
+def process_gone(pid):
+    """True once pid has exited (a zombie awaiting its parent's wait counts)"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(')', 1)[1].split()[0] == 'Z'
+    except FileNotFoundError:
+        return True
+
+
+def test_hung_worker_is_killed(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(job_runner, 'HANG_GRACE', 0.5)
+    pid_file = tmp_path / 'pid'
+    (tmp_path / 'stuck_job.py').write_text(textwrap.dedent(f"""
+        import os
+        import signal
+        import time
+
+        def main():
+            signal.signal(signal.SIGALRM, signal.SIG_IGN)  # Like a job stuck in C code
+            with open({str(pid_file)!r}, 'w') as f:
+                f.write(str(os.getpid()))
+            time.sleep(60)
+    """))
+    spec = tmp_path / 'jobs.json'
+    spec.write_text(json.dumps({'preload': [], 'jobs': [
+        {'name': 'stuck', 'module': 'stuck_job', 'timeout': 0.5}]}))
+    runner = job_runner.JobRunner(spec, log_file=tmp_path / 'runs.jsonl', log_dir=tmp_path / 'logs')
+
+    try:
+        assert [r['outcome'] for r in runner.run_cycle()] == ['hung']
+        assert runner.pool is None
+        pid = int(pid_file.read_text())
+        deadline = time.monotonic() + 5
+        while not process_gone(pid) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert process_gone(pid)
+    finally:
+        runner.close()
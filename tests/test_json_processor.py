@@ -0,0 +1,151 @@
+import json
+import os
+
+import pytest
+
+import json_processor
+from json_processor import SERIALIZERS, detect_format, iter_clients, load_json, save_json
+
+
+CLIENTS = [
+    {'client_id': 'A1', 'name': 'Alpha', 'projects': [
+        {'name': 'Invoices', 'status': 'active', 'budget': 1000, 'hours_saved_weekly': 2}]},
+    {'client_id': 'B2', 'name': 'Beta', 'projects': []},
+]
+
+
+@pytest.fixture(params=[True, False], ids=['fast', 'plain'])
+def fast(request):
+    return request.param
+
+
+@pytest.mark.parametrize('text', [
+    '\n\n' + json.dumps(CLIENTS),
+    '\n  \n' + json.dumps(CLIENTS, indent=2),
+    '\n\n' + '\n'.join(json.dumps(client) for client in CLIENTS) + '\n\n',
+], ids=['array', 'pretty-array', 'jsonl'])
+def test_leading_blank_lines_before_clients(tmp_path, fast, text):
+    path = tmp_path / 'clients.json'
+    path.write_text(text)
+    assert list(iter_clients(path, fast=fast)) == CLIENTS
+
+
+def test_pretty_printed_single_client(tmp_path, fast):
+    path = tmp_path / 'client.json'
+    path.write_text('\n' + json.dumps(CLIENTS[0], indent=2))
+    assert list(iter_clients(path, fast=fast)) == [CLIENTS[0]]
+
+
+def test_blank_file_has_no_clients(tmp_path, fast):
+    path = tmp_path / 'empty.json'
+    path.write_text('\n \n')
+    assert list(iter_clients(path, fast=fast)) == []
+
+
+def test_stream_summary_counts_every_client(tmp_path):
+    path = tmp_path / 'clients.jsonl'
+    path.write_text('\n'.join(json.dumps(client) for client in CLIENTS))
+    summary = json_processor.analyze_client_stream(path)
+    assert summary['clients'] == 2
+    assert summary['projects'] == 1
+    assert summary['total_budget'] == 1000
+
+
+def test_malformed_client_leaves_totals_untouched():
+    accumulator = json_processor.ROIAccumulator()
+    accumulator.add(CLIENTS[0])
+    before = accumulator.summary()
+    bad = {'projects': [
+        {'status': 'active', 'budget': 500, 'hours_saved_weekly': 1},
+        {'budget': 100, 'hours_saved_weekly': 1},  # No status
+    ]}
+    with pytest.raises(KeyError):
+        accumulator.add(bad)
+    assert accumulator.summary() == before
+
+
+def test_file_failing_partway_contributes_only_its_error(tmp_path):
+    good = tmp_path / 'a.jsonl'
+    good.write_text(json.dumps(CLIENTS[0]) + '\n')
+    broken = tmp_path / 'b.jsonl'
+    broken.write_text(json.dumps(CLIENTS[0]) + '\n' + json.dumps(CLIENTS[1]) + '\n{"truncated": \n')
+
+    summary = json_processor.portfolio_rollup(tmp_path, workers=1)
+    assert summary['files'] == 2
+    assert summary['clients'] == 1
+    assert summary['total_budget'] == 1000
+    assert len(summary['errors']) == 1 and 'b.jsonl' in summary['errors'][0]
+
+
+@pytest.mark.parametrize('files, workers, expected', [
+    (3, 8, 16),
+    (10_000, 8, 313),
+    (10_000, 1, 2500),
+])
+def test_batch_size_follows_file_count_and_workers(files, workers, expected):
+    assert json_processor._batch_size(files, workers) == expected
+
+
+def available_formats():
+    return [name for name in SERIALIZERS if name != 'msgpack' or json_processor.msgpack is not None]
+
+
+@pytest.mark.parametrize('file_format', available_formats())
+def test_save_load_round_trip(tmp_path, file_format):
+    path = tmp_path / 'clients.dat'
+    data = {'clients': CLIENTS, 'note': 'Ünïcode ✓', 'ratio': 0.5}
+    save_json(data, path, format=file_format)
+    assert load_json(path, allow_pickle=True) == data
+
+
+def test_pickle_needs_opt_in(tmp_path):
+    path = tmp_path / 'clients.dat'
+    save_json(CLIENTS, path, format='pickle')
+    with pytest.raises(ValueError):
+        load_json(path)
+
+
+@pytest.mark.parametrize('payload, expected', [
+    (b'{"a": 1}', 'json'),
+    (b'  [1, 2]', 'json'),
+    (b'\x80\x05\x95', 'pickle'),
+    (b'\x81\xa1a\x01', 'msgpack'),  # fixmap {'a': 1}
+    (b'\xdc\x00\x01\x01', 'msgpack'),  # array16 [1]
+])
+def test_detect_format_by_content(payload, expected):
+    assert detect_format(payload) == expected
+    assert detect_format(payload, 'data.bin') == expected
+
+
+@pytest.mark.parametrize('filename, expected', [
+    ('clients.json', 'json'),
+    ('clients.MSGPACK', 'msgpack'),
+    ('clients.mpk', 'msgpack'),
+    ('cache.pkl', 'pickle'),
+    ('cache.pickle', 'pickle'),
+])
+def test_detect_format_by_extension(filename, expected):
+    assert detect_format(b'\xa5hello', filename) == expected  # Content alone reads as JSON
+
+
+def test_failed_write_keeps_original_file(tmp_path, monkeypatch, capsys):
+    path = tmp_path / 'client.json'
+    save_json(CLIENTS[0], path)
+    original = path.read_bytes()
+
+    def fail(src, dst):
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setattr(json_processor.os, 'replace', fail)
+    with pytest.raises(OSError):
+        save_json(CLIENTS, path)
+    with pytest.raises(TypeError):
+        save_json({'when': object()}, path)  # Not serializable: fails before writing
+
+    assert path.read_bytes() == original
+    assert os.listdir(tmp_path) == ['client.json']  # No temporary file left behind
+
+
+def test_unknown_format_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        save_json(CLIENTS, tmp_path / 'clients.json', format='yaml')
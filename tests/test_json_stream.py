@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from json_stream import iter_array_items
+
+DOCUMENT = json.dumps({
+    'meta': {'page': 1, 'tags': ['a', ']', '[{']},
+    'data': {
+        'skipped': [1, {'nested': [2, 3]}],
+        'items': [
+            {'id': 1, 'name': 'Quote " and \\ backslash', 'value': 12345},
+            {'id': 2, 'name': 'Ünïcode ✓', 'value': -6.5e3},
+            {'id': 3, 'name': None, 'value': True},
+            [1, [2, [3]]],
+            'plain string',
+            1234567890123,
+        ],
+    },
+})
+ITEMS = json.loads(DOCUMENT)['data']['items']
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 1 << 20])
+def test_items_decoded_across_any_chunk_boundary(size):
+    assert list(iter_array_items(chunked(DOCUMENT, size), 'data.items')) == ITEMS
+
+
+@pytest.mark.parametrize('size', [1, 2, 5])
+def test_number_split_across_chunks(size):
+    assert list(iter_array_items(chunked('[12345, 6.5e3, 7]', size))) == [12345, 6500.0, 7]
+
+
+def test_top_level_array_with_whitespace_and_empty_chunks():
+    chunks = ['', '  \n[', '', ' {"a": 1} ', ',', '', '{"a"', ': 2}\n', ']', '']
+    assert list(iter_array_items(chunks)) == [{'a': 1}, {'a': 2}]
+
+
+@pytest.mark.parametrize('text', ['[]', ' [ ] ', '{"data": []}'])
+def test_empty_arrays(text):
+    path = 'data' if text.startswith('{') else ''
+    assert list(iter_array_items(chunked(text, 1), path)) == []
+
+
+def test_missing_key_raises():
+    with pytest.raises(KeyError):
+        list(iter_array_items([DOCUMENT], 'data.missing'))
+
+
+@pytest.mark.parametrize('text', ['[1, 2', '[1 2]', '{"items": 1}'])
+def test_malformed_input_raises(text):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_array_items(chunked(text, 2), 'items' if text.startswith('{') else ''))
+
+
+def test_items_yielded_before_the_document_ends():
+    def chunks():
+        yield '[{"id": 1}, '
+        raise RuntimeError('stream should not be read further yet')
+
+    items = iter_array_items(chunks())
+    assert next(items) == {'id': 1}
@@ -0,0 +1,32 @@
+import pytest
+import requests
+
+import mock_server
+from mock_server import MockServer
+
+
+def test_record_without_fixtures_dir_rejected():
+    with pytest.raises(ValueError):
+        MockServer(record_upstream='http://upstream.invalid')
+
+
+def test_cli_record_without_fixtures_dir_rejected():
+    with pytest.raises(SystemExit):
+        mock_server.main(['--record', 'http://upstream.invalid', '--fixtures', ''])
+
+
+def test_record_saves_and_replays_fixture(tmp_path):
+    with MockServer() as upstream:
+        with MockServer(fixtures_dir=tmp_path, record_upstream=upstream.url) as recorder:
+            first = requests.get(f"{recorder.url}/custom/users/1", timeout=5)
+            assert first.status_code == 404  # Unknown upstream route, recorded as is
+            users = requests.get(f"{recorder.url}/posts?userId=2", timeout=5)
+            assert users.json()[0]['userId'] == 2
+            assert recorder.stats['recorded'] == 2
+
+        saved = sorted(path.name for path in tmp_path.glob('*.json'))
+        assert len(saved) == 2
+
+    replay = MockServer(fixtures_dir=tmp_path)
+    assert len(replay.fixtures) == 2
+    replay.httpd.server_close()
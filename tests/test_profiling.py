@@ -0,0 +1,43 @@
+import pytest
+
+from context_managers import Timer
+from expense_analyzer_robust import read_expenses_safe
+from memory_profile import memory
+from profiling import profiler
+
+
+def test_timer_keeps_start_and_end_aliases():
+    with Timer(verbose=False) as timer:
+        sum(range(1000))
+    assert timer.start == timer.start_ns / 1e9
+    assert timer.end == timer.end_ns / 1e9
+    assert timer.end - timer.start == pytest.approx(timer.duration)
+
+
+@pytest.fixture
+def profiling():
+    profiler.reset()
+    profiler.enable()
+    memory.enable()
+    yield
+    profiler.disable()
+    profiler.reset()
+    memory.disable()
+    memory.reset()
+
+
+def test_read_stages_are_profiled(tmp_path, profiling):
+    path = tmp_path / 'expenses.csv'
+    path.write_text('Date,Category,Description,Amount\n'
+                    '2025-10-01,Food,Lunch,12.50\n'
+                    'soon,Food,Dinner,30\n'
+                    '2025-10-02,Food,Snack,oops\n')
+
+    df = read_expenses_safe(path, engine='python')
+
+    assert len(df) == 1
+    assert 'read' in profiler.summary()
+    assert 'read/parse:python' in profiler.summary()
+    assert 'read/validate' in profiler.summary()
+    stages = {stage['stage'] for stage in memory.summary()['stages']}
+    assert {'read_csv', 'to_numeric', 'dropna_amount', 'to_datetime', 'dropna_date'} <= stages
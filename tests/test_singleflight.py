@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight, request_key
+
+CALLERS = 8
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for callers"
+        threading.Event().wait(0.001)
+
+
+def run_concurrently(flight, key, fn):
+    """Start CALLERS threads calling flight.do(key, fn); return (threads, outcomes)"""
+    outcomes = [None] * CALLERS
+
+    def caller(i):
+        try:
+            outcomes[i] = ('ok', flight.do(key, fn))
+        except Exception as e:
+            outcomes[i] = ('error', e)
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {'id': 1}
+
+    threads, outcomes = run_concurrently(flight, 'user:1', fetch)
+    wait_for(lambda: flight.stats()['coalesced'] == CALLERS - 1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    results = [value for kind, value in outcomes]
+    assert all(kind == 'ok' for kind, _ in outcomes)
+    assert all(result is results[0] for result in results)  # The same shared object
+    assert flight.stats() == {'executed': 1, 'coalesced': CALLERS - 1, 'in_flight': 0}
+
+
+def test_exception_reaches_every_waiter():
+    flight = SingleFlight()
+    release = threading.Event()
+    error = ConnectionError('upstream down')
+
+    def fetch():
+        release.wait(5)
+        raise error
+
+    threads, outcomes = run_concurrently(flight, 'user:1', fetch)
+    wait_for(lambda: flight.stats()['coalesced'] == CALLERS - 1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert outcomes == [('error', error)] * CALLERS
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_key_released_after_completion():
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ValueError('first call fails')
+        return len(calls)
+
+    with pytest.raises(ValueError):
+        flight.do('user:1', fetch)
+    assert flight.do('user:1', fetch) == 2
+    assert flight.do('user:1', fetch) == 3
+    assert flight.stats() == {'executed': 3, 'coalesced': 0, 'in_flight': 0}
+
+
+def test_different_keys_run_independently():
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 'a') == 'a'
+    assert flight.do('b', lambda x: x * 2, 'b') == 'bb'
+    assert flight.stats()['executed'] == 2
+
+
+def test_request_key_normalizes_params_and_auth():
+    key = request_key('get', 'https://api.test/users', {'page': 2, 'q': 'x'},
+                      {'Authorization': 'token A', 'Accept': 'json'})
+    assert key == request_key('GET', 'https://api.test/users', {'q': 'x', 'page': '2'},
+                              {'Authorization': 'token A'})
+    assert key != request_key('GET', 'https://api.test/users', {'q': 'x', 'page': 2},
+                              {'Authorization': 'token B'})
@@ -0,0 +1,172 @@
+import threading
+import time
+
+import pytest
+
+import weather_api
+from weather_api import RateLimiter, WeatherService
+
+
+CURRENT = {'current_condition': [{
+    'temp_C': '5', 'FeelsLikeC': '3', 'humidity': '70',
+    'weatherDesc': [{'value': 'Clear'}],
+    'windspeedKmph': '10', 'winddir16Point': 'N',
+}], 'weather': []}
+
+
+def run_main(monkeypatch, argv):
+    fetched = []
+
+    def fetch(self, city):
+        fetched.append(city)
+        return CURRENT
+
+    monkeypatch.setattr(weather_api.WeatherService, 'fetch', fetch)
+    monkeypatch.setattr('sys.argv', ['weather_api.py', *argv])
+    monkeypatch.setattr(weather_api, '_service', None)
+    assert weather_api.main() == 0
+    return sorted(set(fetched))
+
+
+def test_file_alone_does_not_fetch_default_city(monkeypatch, tmp_path):
+    cities = tmp_path / 'cities.txt'
+    cities.write_text('Vienna\n\nGraz\n')
+    assert run_main(monkeypatch, ['--file', str(cities)]) == ['Graz', 'Vienna']
+
+
+def test_default_city_without_arguments(monkeypatch):
+    assert run_main(monkeypatch, []) == ['Innsbruck']
+
+
+def test_positional_cities_and_file_are_combined(monkeypatch, tmp_path):
+    cities = tmp_path / 'cities.txt'
+    cities.write_text('Graz\n')
+    assert run_main(monkeypatch, ['Linz', '--file', str(cities)]) == ['Graz', 'Linz']
+
+
+def test_get_service_creates_one_instance_across_threads(monkeypatch):
+    created = []
+
+    class SlowService:
+        def __init__(self):
+            threading.Event().wait(0.05)
+            created.append(self)
+
+    monkeypatch.setattr(weather_api, 'WeatherService', SlowService)
+    monkeypatch.setattr(weather_api, '_service', None)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(weather_api.get_service()))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(created) == 1
+    assert all(service is created[0] for service in results)
+
+
+class FakeClock:
+    """Stands in for the time module in weather_api: sleeping advances the clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class FakeTransport:
+    """Answers every GET with CURRENT, optionally holding it until released"""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        self.release.wait(5)
+        return FakeResponse(CURRENT)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(weather_api, 'time', clock)
+    return clock
+
+
+def test_download_uses_transport_default_timeout():
+    transport = FakeTransport()
+    WeatherService(base_url='http://weather.test', transport=transport).fetch('Graz')
+    assert transport.calls == [('http://weather.test/Graz?format=j1', {})]
+
+
+def test_cached_document_expires_after_ttl(clock):
+    transport = FakeTransport()
+    service = WeatherService(base_url='http://weather.test', ttl=600, transport=transport)
+
+    assert service.current('Graz')['temp_C'] == '5'
+    clock.now += 599
+    service.forecast(' graz ')
+    assert len(transport.calls) == 1
+    assert (service.hits, service.misses) == (1, 1)
+
+    clock.now += 2
+    service.fetch('Graz')
+    assert len(transport.calls) == 2
+    assert (service.hits, service.misses) == (1, 2)
+
+
+def test_concurrent_fetches_of_one_city_coalesce():
+    transport = FakeTransport()
+    transport.release.clear()
+    service = WeatherService(base_url='http://weather.test', transport=transport)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.fetch('Vienna')))
+               for _ in range(6)]
+    for t in threads:
+        t.start()
+
+    deadline = time.monotonic() + 5
+    while service.inflight.stats()['coalesced'] < 5 and time.monotonic() < deadline:
+        threading.Event().wait(0.001)
+    transport.release.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(transport.calls) == 1
+    assert len(results) == 6 and all(result is CURRENT for result in results)
+
+
+def test_rate_limiter_paces_each_host(clock):
+    limiter = RateLimiter(rate=2.0, burst=2)
+    granted = []
+    for _ in range(5):
+        limiter.acquire('a.test')
+        granted.append(clock.now - 1000.0)
+    assert granted == pytest.approx([0.0, 0.0, 0.5, 1.0, 1.5])
+
+    limiter.acquire('b.test')  # Another host has its own full bucket
+    assert clock.now - 1000.0 == pytest.approx(1.5)
+
+    clock.now += 10  # Idle time refills up to the burst, no further
+    for _ in range(3):
+        limiter.acquire('a.test')
+    assert clock.now - 1000.0 == pytest.approx(12.0)
@@ -0,0 +1,103 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from weather_store import RECORD_DTYPE, WeatherStore, _city_key
+
+JAN = int(datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp())
+FEB = int(datetime(2025, 2, 1, tzinfo=timezone.utc).timestamp())
+MAR = int(datetime(2025, 3, 1, tzinfo=timezone.utc).timestamp())
+
+
+def observations(start, end, step=3600):
+    ts = np.arange(start, end, step)
+    records = np.empty(len(ts), dtype=RECORD_DTYPE)
+    records['ts'] = ts
+    records['temp'] = (ts // step) % 30 - 10
+    records['feels'] = records['temp'] - 2
+    records['humidity'] = (ts // step) % 100
+    records['wind'] = (ts // step) % 40
+    return records
+
+
+@pytest.fixture
+def store(tmp_path):
+    return WeatherStore(tmp_path / 'store')
+
+
+def test_append_query_round_trip(store):
+    records = observations(JAN, MAR)
+    assert store.append('Vienna', records) == len(records)
+    assert store.last_ts('Vienna') == int(records['ts'][-1])
+
+    np.testing.assert_array_equal(store.query('Vienna'), records)
+    np.testing.assert_array_equal(store.query(' VIENNA ', FEB, FEB + 86400),
+                                  records[(records['ts'] >= FEB) & (records['ts'] < FEB + 86400)])
+
+
+def test_old_and_unordered_records(store):
+    records = observations(JAN, FEB)
+    store.append('Vienna', records)
+    assert store.append('Vienna', records[:10]) == 0  # Nothing newer than stored
+    with pytest.raises(ValueError):
+        store.append('Vienna', observations(FEB, FEB + 7200)[::-1])
+
+
+def test_compaction_keeps_data_and_moves_past_months(tmp_path, store):
+    records = observations(JAN, MAR + 5 * 86400)
+    store.append('Vienna', records)
+    store.compact(before=MAR + 86400)
+
+    entry = store.index[_city_key('Vienna')]
+    assert [s['file'] for s in entry['segments']] == ['202501.npz', '202502.npz']
+    assert sum(s['count'] for s in entry['segments']) == np.sum(records['ts'] < MAR)
+    np.testing.assert_array_equal(store.query('Vienna'), records)
+    np.testing.assert_array_equal(store.query('Vienna', FEB - 3600, FEB + 3600),
+                                  records[(records['ts'] >= FEB - 3600) & (records['ts'] < FEB + 3600)])
+
+    # A reopened store reads the same data and keeps appending after it
+    reopened = WeatherStore(tmp_path / 'store')
+    assert reopened.last_ts('Vienna') == int(records['ts'][-1])
+    more = observations(MAR + 5 * 86400, MAR + 6 * 86400)
+    reopened.append('Vienna', more)
+    np.testing.assert_array_equal(reopened.query('Vienna'), np.concatenate([records, more]))
+
+
+def test_partially_compacted_month_is_merged(store):
+    records = observations(JAN, FEB)
+    store.append('Vienna', records[:100])
+    store.compact(before=FEB)
+    store.append('Vienna', records[100:])
+    store.compact(before=FEB)
+
+    entry = store.index[_city_key('Vienna')]
+    assert [(s['file'], s['count']) for s in entry['segments']] == [('202501.npz', len(records))]
+    np.testing.assert_array_equal(store.query('Vienna'), records)
+
+
+@pytest.mark.parametrize('a, b', [
+    ('Zürich', 'Z rich'),
+    ('Москва', '北京'),
+    ('São Paulo', 'Sao Paulo'),
+])
+def test_distinct_names_get_distinct_keys(store, a, b):
+    assert _city_key(a) != _city_key(b)
+    store.append(a, observations(JAN, JAN + 7200))
+    store.append(b, observations(JAN, JAN + 3600))
+    assert len(store.query(a)) == 2
+    assert len(store.query(b)) == 1
+    assert sorted(entry['name'] for entry in store.index.values()) == sorted([a, b])
+
+
+def test_key_ignores_case_and_whitespace():
+    assert _city_key('  zürich ') == _city_key('ZÜRICH')
+    assert _city_key('Москва') != ''
+    assert _city_key('Zürich').startswith('zurich-')
+
+
+def test_reads_do_not_write_the_index(store):
+    assert store.last_ts('Nowhere') == 0
+    assert len(store.query('Nowhere')) == 0
+    assert store.index == {}
+    assert not store.index_path.exists()